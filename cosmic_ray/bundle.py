@@ -0,0 +1,298 @@
+"""Compiling mutants ahead of time.
+
+Some mutants don't compile, e.g. because an operator replaced `break` with
+`continue` somewhere `continue` isn't allowed. Running such a mutant costs a
+worker process and a test-suite start-up just to find that out. With
+`cosmic-ray init --prefilter`, every mutant is made and compiled once when the
+session is initialized, in parallel, and those which don't compile are
+reported as incompetent straight away, so that no worker is ever started for
+them.
+
+Prefiltering also compares the mutants' code (see `code_digest()`). A mutant
+which compiles to the same code as the unmutated module, e.g. `-0` mutated to
+`+0`, is *equivalent*: no test can kill it, so it's reported as such without
+being run and doesn't count towards the survival rate. Mutants of a module
+which compile to the same code as each other are *duplicates*: only the first
+of them is run, and its results are copied to the others (see
+`WorkDB.update_work_item()`).
+
+Before it can run any tests, a worker also has to import the module under
+test, parse it, mutate it, unparse it for the diff and compile the mutant.
+`cosmic-ray init --bundle` does the prefiltering and also stores each compiled
+mutant, along with its diff, in a *bundle* next to the session file. The
+worker for a mutant then just reads it from the bundle (see `load_entry()`).
+
+A bundle is a directory of entries, each named by the SHA-256 digest of its
+contents, so identical mutants share an entry and an entry's name changes
+whenever its contents do. An entry is the interpreter's magic number (as in a
+`.pyc` file) followed by the marshalled `(code, diff)` pair. Marshalled code
+can only be loaded by the version of Python which wrote it, so workers
+running any other version mutate the module the usual way.
+"""
+
+import concurrent.futures
+import hashlib
+import importlib
+import importlib.util
+import logging
+import marshal
+import os
+import sys
+import traceback
+import types
+import warnings
+
+from .importing import preserve_modules
+from .parsing import get_ast
+from .plugins import get_operator
+from .testing.test_runner import TestOutcome
+from .worker import WorkerOutcome, mutate_module
+
+log = logging.getLogger()
+
+
+def bundle_dir(session_file):
+    "The name of the bundle directory for the session in `session_file`."
+    return os.path.splitext(session_file)[0] + '.bundle'
+
+
+def _write_entry(directory, code, diff):
+    """Write the entry for `code` and `diff` into the bundle in `directory`.
+
+    Returns: The absolute path of the entry.
+    """
+    contents = importlib.util.MAGIC_NUMBER + marshal.dumps((code, diff))
+    path = os.path.abspath(os.path.join(
+        directory, hashlib.sha256(contents).hexdigest()))
+    if not os.path.exists(path):
+        # Write to a temporary file first so that a reader never sees a
+        # partial entry.
+        temp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp_path, 'wb') as handle:
+            handle.write(contents)
+        os.replace(temp_path, path)
+    return path
+
+
+def load_entry(path):
+    """Load a bundle entry.
+
+    Returns: A tuple `(code, diff)`, or `None` if the entry is missing,
+        corrupt or was written by a different version of Python.
+    """
+    try:
+        with open(path, 'rb') as handle:
+            contents = handle.read()
+    except OSError:
+        return None
+
+    magic = importlib.util.MAGIC_NUMBER
+    if not contents.startswith(magic):
+        return None
+    try:
+        return marshal.loads(contents[len(magic):])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def _normalize_constant(value):
+    "A comparable form of the constant `value` from a code object."
+    if isinstance(value, types.CodeType):
+        return _normalize_code(value)
+    if isinstance(value, tuple):
+        return ('tuple', tuple(_normalize_constant(item) for item in value))
+    if isinstance(value, frozenset):
+        # The iteration order of a set depends on its history.
+        return ('frozenset', tuple(sorted(
+            repr(_normalize_constant(item)) for item in value)))
+    # The type distinguishes e.g. 1, 1.0 and True, which compare equal.
+    return (type(value).__name__, repr(value))
+
+
+def _normalize_code(code):
+    """A comparable form of `code` which ignores where the code came from,
+    i.e. its file name and line numbers.
+    """
+    return (
+        code.co_name,
+        code.co_code,
+        tuple(_normalize_constant(value) for value in code.co_consts),
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars,
+        code.co_cellvars,
+        code.co_flags,
+        code.co_argcount,
+        code.co_posonlyargcount,
+        code.co_kwonlyargcount,
+        # The exception table (Python 3.11 and later) is part of the control
+        # flow.
+        getattr(code, 'co_exceptiontable', None),
+    )
+
+
+def code_digest(code):
+    """Calculate a digest of the compiled module `code`.
+
+    Two code objects have the same digest if they have the same bytecode,
+    constants and names, i.e. if they behave the same, even if they were
+    compiled from different source lines.
+
+    Returns: The SHA-256 digest, as a hex string.
+    """
+    return hashlib.sha256(
+        repr(_normalize_code(code)).encode('utf-8')).hexdigest()
+
+
+def _compile_module_mutants(directory, module_name, mutants):
+    """Compile the mutants of one module.
+
+    This is run in a separate process for each module.
+
+    Args:
+      directory: The bundle directory in which to store the compiled mutants,
+        or `None` to just compile them.
+      module_name: The name of the module.
+      mutants: A list of `(job_id, operator name, occurrence)` tuples.
+
+    Returns: A tuple `(digest, results)`, where `digest` is the `code_digest()`
+        of the unmutated module and `results` is a list of `(job_id, entry
+        path, error, digest, diff)` tuples. The error is the formatted
+        traceback of the compilation error, or `None` if the mutant compiled.
+        The entry path is `None` unless the mutant compiled and `directory`
+        was given, and the digest is `None` unless the mutant compiled. The
+        diff is the mutant's diff. Mutants which can't be made aren't listed.
+    """
+    # Import the module once, rather than once per mutant.
+    module = importlib.import_module(module_name)
+    original = code_digest(compile(get_ast(module), module_name, 'exec'))
+
+    results = []
+    for job_id, operator_name, occurrence in mutants:
+        try:
+            with preserve_modules():
+                core, module_ast, diff = mutate_module(
+                    module_name, get_operator(operator_name), occurrence)
+        except Exception:  # noqa # pylint: disable=broad-except
+            # Leave it to the worker to report this.
+            log.warning('Failed to mutate %s with %s at occurrence %s',
+                        module_name, operator_name, occurrence,
+                        exc_info=True)
+            continue
+        if not core.activation_record:
+            continue
+
+        try:
+            with warnings.catch_warnings():
+                # e.g. "is" with a literal
+                warnings.simplefilter('ignore', SyntaxWarning)
+                code = compile(module_ast, module_name, 'exec')
+        except Exception:  # noqa # pylint: disable=broad-except
+            results.append(
+                (job_id, None, traceback.format_exc(), None, diff))
+        else:
+            entry = None
+            if directory is not None:
+                entry = _write_entry(directory, code, diff)
+            results.append((job_id, entry, None, code_digest(code), diff))
+    return original, results
+
+
+def _set_path(path):
+    "Initializer for the processes which compile mutants."
+    sys.path[:] = path
+
+
+def compile_mutants(work_items, directory=None, num_workers=None):
+    """Compile the mutants for `work_items`, optionally into a bundle.
+
+    The mutants are compiled in up to `num_workers` processes, by default one
+    per CPU. Work items whose mutants don't compile are given their results:
+    they're incompetent and don't need to be run. So are those whose mutants
+    are equivalent to the unmutated module. Work items whose mutants are
+    duplicates of an earlier work item's get its `job_id` as their
+    `duplicate_of`, and their own diff since they're never run. If
+    `directory` is given, each of the compiled work items
+    gets the path of its mutant's entry in the bundle there as its
+    `bundle_entry`.
+
+    Work items which already have a `worker_outcome` (e.g. because no test
+    executes their code) are left alone.
+
+    Args:
+      work_items: A sequence of `WorkItem`s.
+      directory: The bundle directory, or `None` for no bundle. The directory
+        is created if need be.
+      num_workers: The number of processes to use.
+
+    Returns: The list of work items.
+    """
+    work_items = list(work_items)
+    by_job_id = {work_item.job_id: work_item for work_item in work_items}
+
+    by_module = {}
+    for work_item in work_items:
+        if work_item.worker_outcome is None:
+            by_module.setdefault(work_item.module, []).append(
+                (work_item.job_id, work_item.operator,
+                 int(work_item.occurrence)))
+    if not by_module:
+        return work_items
+
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers or os.cpu_count() or 1,
+            initializer=_set_path,
+            initargs=(list(sys.path),)) as executor:
+        futures = [
+            executor.submit(
+                _compile_module_mutants, directory, module, mutants)
+            for module, mutants in sorted(by_module.items())]
+
+        # The first work item for each (module, digest) of a mutant.
+        representatives = {}
+        for future in concurrent.futures.as_completed(futures):
+            original, results = future.result()
+            for job_id, entry, error, digest, diff in results:
+                work_item = by_job_id[job_id]
+                if error is not None:
+                    log.info('Mutant %s %s %s does not compile',
+                             work_item.module, work_item.operator,
+                             work_item.occurrence)
+                    work_item.worker_outcome = WorkerOutcome.SKIPPED
+                    work_item.test_outcome = TestOutcome.INCOMPETENT
+                    work_item.data = [error]
+                elif digest == original:
+                    log.info('Mutant %s %s %s is equivalent',
+                             work_item.module, work_item.operator,
+                             work_item.occurrence)
+                    work_item.worker_outcome = WorkerOutcome.SKIPPED
+                    work_item.test_outcome = TestOutcome.EQUIVALENT
+                    work_item.data = [
+                        'The mutant compiles to the same code as the '
+                        'unmutated module.']
+                else:
+                    work_item.bundle_entry = entry
+                    representative = representatives.setdefault(
+                        (work_item.module, digest), work_item)
+                    if representative is not work_item:
+                        work_item.duplicate_of = representative.job_id
+                        work_item.diff = diff
+
+    return work_items
+
+
+def prune_bundle(directory, entries):
+    """Remove the entries from the bundle in `directory` which aren't among
+    the paths in `entries`.
+    """
+    if not os.path.isdir(directory):
+        return
+
+    keep = {os.path.abspath(entry) for entry in entries if entry}
+    for name in os.listdir(directory):
+        path = os.path.abspath(os.path.join(directory, name))
+        if path not in keep:
+            os.remove(path)
@@ -0,0 +1,365 @@
+"""Make mutants by patching compiled code objects.
+
+The usual way of making a mutant is to parse the module, mutate the AST,
+unparse it for the diff, and compile it again. But many mutations change a
+single bytecode instruction: `a < b` becomes `a <= b`, `a + b` becomes
+`a - b`, `1` becomes `2`, and so on. For these, `mutate_code()` loads the
+module's compiled code (from its cached `.pyc` file, if there is one),
+rewrites the instructions in place, and rebuilds the affected code objects.
+
+The instructions for a mutation site are found by the source positions which
+`cosmic-ray init` records for it (see `counting.mutation_sites()`), using
+`co_positions()`. The new instructions are taken from tiny templates compiled
+by the running interpreter, e.g. `lambda a0, a1: (a0 <= a1)`, so nothing here
+depends on the details of any version's instruction set. A mutant is only
+made this way if the patch is unambiguous and fits in the space of the
+original instructions (any left over is filled with `NOP`s). Otherwise, e.g.
+when the compiler folded a constant expression or turned `if not x` into a
+jump, `mutate_code()` returns `None` and the mutant has to be made the usual
+way.
+
+This needs Python 3.11 or later, for `co_positions()`.
+"""
+
+import ast
+import copy
+import dis
+import difflib
+import functools
+import importlib.machinery
+import importlib.util
+import itertools
+import types
+
+from .importing import preserve_modules, using_code
+from .worker import exception_result, operator_result
+
+# The opcodes which can implement each type of operator node.
+_OPERATOR_OPNAMES = {
+    ast.Compare: {'COMPARE_OP', 'IS_OP', 'CONTAINS_OP'},
+    ast.BinOp: {'BINARY_OP'},
+    ast.UnaryOp: {'UNARY_NEGATIVE', 'UNARY_POSITIVE', 'UNARY_INVERT',
+                  'UNARY_NOT', 'CALL_INTRINSIC_1', 'TO_BOOL'},
+}
+
+# The contexts in which templates are compiled. Some instructions are
+# compiled differently when their result is only used as a condition.
+_VALUE_CONTEXT = 'lambda {args}: (\n{expr}\n)'
+_CONDITION_CONTEXT = 'lambda {args}: 1 if (\n{expr}\n) else 0'
+
+_NOP = bytes([dis.opmap['NOP'], 0])
+
+
+class _Unpatchable(Exception):
+    "The mutation can't be made by patching instructions."
+
+
+def _operands(node):
+    "The operand nodes of the operator node `node`."
+    if isinstance(node, ast.Compare):
+        return [node.left] + node.comparators
+    if isinstance(node, ast.BinOp):
+        return [node.left, node.right]
+    return [node.operand]
+
+
+def _skeleton(node):
+    "The source of `node` with its operands replaced by `a0`, `a1`, etc."
+    names = (ast.Name(id='a{}'.format(idx), ctx=ast.Load())
+             for idx in itertools.count())
+    node = copy.copy(node)
+    if isinstance(node, ast.Compare):
+        node.left = next(names)
+        node.comparators = [next(names) for _ in node.comparators]
+    elif isinstance(node, ast.BinOp):
+        node.left, node.right = next(names), next(names)
+    else:
+        node.operand = next(names)
+    return ast.unparse(node)
+
+
+def _instructions(code):
+    """The instructions of `code`, each paired with the offset of the next.
+
+    The difference is the size of the instruction, including any inline
+    cache entries.
+    """
+    instructions = list(dis.get_instructions(code))
+    ends = [ins.offset for ins in instructions[1:]] + [len(code.co_code)]
+    return list(zip(instructions, ends))
+
+
+def _at(instructions, span, opnames):
+    "The `(instruction, end)` pairs at `span` with one of `opnames`."
+    return [(ins, end) for ins, end in instructions
+            if ins.opname in opnames and tuple(ins.positions) == span]
+
+
+@functools.lru_cache(maxsize=None)
+def _template(context, num_args, expr, opnames):
+    """The operator instructions of `expr` compiled in `context`.
+
+    Returns: A tuple of `((opcode, arg), raw bytes)` pairs.
+    """
+    source = context.format(
+        args=', '.join('a{}'.format(i) for i in range(num_args)),
+        expr=expr)
+    code = next(const for const in compile(source, '<template>', 'eval')
+                .co_consts if isinstance(const, types.CodeType))
+    span = (2, 2, 0, len(expr.encode()))
+    return tuple(((ins.opcode, ins.arg), code.co_code[ins.offset:end])
+                 for ins, end in _at(_instructions(code), span, opnames))
+
+
+class _OperatorPatch:
+    """Replaces the instructions of a compare, binary or unary operator.
+
+    Each context gives a way in which the original operator may have been
+    compiled, and its replacement. Instructions at the site are matched
+    against these in turn. A chained comparison or an expression in a
+    `finally` block may give several groups of instructions for one site.
+    """
+
+    def __init__(self, original, mutated):
+        operands = [ast.dump(operand) for operand in _operands(original)]
+        if isinstance(mutated, type(original)) and \
+                [ast.dump(operand) for operand in _operands(mutated)] \
+                == operands:
+            mutated_expr = _skeleton(mutated)
+        elif isinstance(original, ast.UnaryOp) and \
+                ast.dump(mutated) == operands[0]:
+            # The operator was deleted.
+            mutated_expr = 'a0'
+        else:
+            raise _Unpatchable('Not a change of operator')
+
+        self.opnames = frozenset(_OPERATOR_OPNAMES[type(original)])
+        self._contexts = []
+        for context in (_VALUE_CONTEXT, _CONDITION_CONTEXT):
+            before, after = (
+                _template(context, len(operands), expr, self.opnames)
+                for expr in (_skeleton(original), mutated_expr))
+            if not before:
+                continue
+            if len(after) == len(before):
+                self._contexts.append(
+                    (before, tuple(raw for _, raw in after)))
+            elif not after and context is _VALUE_CONTEXT:
+                # Deleting the operator's instructions is only safe where
+                # its value isn't also converted for a jump.
+                self._contexts.append((before, (b'',) * len(before)))
+
+    def apply(self, code, instructions, co_code,
+              consts):  # pylint: disable=unused-argument
+        """Patch `instructions` (the site's instructions in `code`) into
+        `co_code`.
+        """
+        idx = 0
+        while idx < len(instructions):
+            # Prefer the longest match. Where contexts disagree about the
+            # replacement of the same instructions, we can't tell which is
+            # right.
+            matches = {}
+            for before, after in self._contexts:
+                found = [ins.opcode == opcode and ins.arg == arg
+                         for (ins, _), ((opcode, arg), _)
+                         in zip(instructions[idx:], before)]
+                if len(found) == len(before) and all(found):
+                    matches.setdefault(len(before), set()).add(after)
+            if not matches:
+                raise _Unpatchable('Unexpected instructions in {}'.format(
+                    code.co_name))
+            length = max(matches)
+            if len(matches[length]) > 1:
+                raise _Unpatchable('Ambiguous instructions in {}'.format(
+                    code.co_name))
+
+            after, = matches[length]
+            for (ins, end), raw in zip(instructions[idx:], after):
+                _replace(co_code, ins.offset, end, raw)
+            idx += length
+
+
+class _ConstantPatch:
+    "Replaces the constant loaded by a `LOAD_CONST`."
+
+    opnames = frozenset({'LOAD_CONST'})
+
+    def __init__(self, original, mutated):
+        if not isinstance(mutated, ast.Constant) or \
+                type(mutated.value) not in (int, float, bool):
+            raise _Unpatchable('Not a change of constant')
+        self._original = original.value
+        self._mutated = mutated.value
+
+    @staticmethod
+    def _index(consts, value):
+        "The index of `value` in the list `consts`, adding it if need be."
+        for idx, const in enumerate(consts):
+            # Note that 1 == 1.0 == True.
+            if type(const) is type(value) and const == value:
+                return idx
+        consts.append(value)
+        return len(consts) - 1
+
+    def apply(self, code, instructions, co_code, consts):
+        "Patch `instructions` into `co_code`, adding to `consts` if need be."
+        for ins, end in instructions:
+            if type(ins.argval) is not type(self._original) or \
+                    ins.argval != self._original:
+                raise _Unpatchable('Unexpected constant in {}'.format(
+                    code.co_name))
+            idx = self._index(consts, self._mutated)
+            if ins.arg > 255 or idx > 255:
+                raise _Unpatchable('Too many constants in {}'.format(
+                    code.co_name))
+            _replace(co_code, ins.offset, end, bytes([ins.opcode, idx]))
+
+
+def _replace(co_code, start, end, raw):
+    "Replace `co_code[start:end]` with `raw`, padded with `NOP`s."
+    if len(raw) > end - start:
+        raise _Unpatchable('No room for the new instruction')
+    co_code[start:end] = raw + _NOP * ((end - start - len(raw)) // 2)
+
+
+def _patch(code, span, patch):
+    """Apply `patch` at `span` in `code` and the code objects nested in it.
+
+    Returns: A tuple `(new code, number of groups of instructions patched)`.
+    """
+    consts = list(code.co_consts)
+    patched = 0
+    for idx, const in enumerate(consts):
+        if isinstance(const, types.CodeType):
+            consts[idx], count = _patch(const, span, patch)
+            patched += count
+
+    instructions = _at(_instructions(code), span, patch.opnames)
+    if instructions:
+        co_code = bytearray(code.co_code)
+        patch.apply(code, instructions, co_code, consts)
+        code = code.replace(co_code=bytes(co_code))
+        patched += 1
+
+    if patched:
+        code = code.replace(co_consts=tuple(consts))
+    return code, patched
+
+
+def _source_segment(lines, span):
+    """The source in `lines` at `span`, along with the text before and after
+    it on its first and last lines.
+
+    Column offsets count UTF-8 bytes, as in the AST.
+    """
+    line, end_line, col, end_col = span
+    first = lines[line - 1].encode()
+    last = lines[end_line - 1].encode()
+    if line == end_line:
+        segment = first[col:end_col].decode()
+    else:
+        segment = '\n'.join(
+            [first[col:].decode()] + lines[line:end_line - 1] +
+            [last[:end_col].decode()])
+    return first[:col].decode(), segment, last[end_col:].decode()
+
+
+def _diff(lines, span, replacement, source_file):
+    """A diff of the mutation, made by pasting `replacement` into the source
+    rather than by unparsing the module.
+    """
+    before, _, after = _source_segment(lines, span)
+    mutated_lines = lines[:span[0] - 1] + \
+        (before + replacement + after).split('\n') + lines[span[1]:]
+
+    module_diff = ["--- mutation diff ---"]
+    module_diff.extend(difflib.unified_diff(lines,
+                                            mutated_lines,
+                                            fromfile="a" + source_file,
+                                            tofile="b" + source_file,
+                                            lineterm=""))
+    return module_diff
+
+
+def mutate_code(work_item):
+    """Make the mutant for `work_item` by patching its module's code.
+
+    This needs the source position (`line_number`, `col_offset`,
+    `end_line_number` and `end_col_offset`) and the `replacement` of the
+    mutation site, as recorded by `cosmic-ray init`. Finding the module may
+    import its parent packages, so you may want to call this within
+    `preserve_modules()`.
+
+    Returns: A tuple `(code, diff)` of the mutated code for the whole module
+        and a diff of the mutation, or `None` if this mutation can't be made
+        by patching the code.
+    """
+    span = (work_item.line_number, work_item.end_line_number,
+            work_item.col_offset, work_item.end_col_offset)
+    if not hasattr(types.CodeType, 'co_positions') or \
+            None in span or work_item.replacement is None:
+        return None
+
+    spec = importlib.util.find_spec(work_item.module)
+    if spec is None or \
+            not isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+        return None
+
+    with open(spec.origin, 'rb') as handle:
+        lines = importlib.util.decode_source(handle.read()).splitlines()
+
+    try:
+        original = ast.parse(
+            '(' + _source_segment(lines, span)[1] + ')', mode='eval').body
+        mutated = ast.parse(work_item.replacement, mode='eval').body
+    except (SyntaxError, IndexError, UnicodeDecodeError):
+        return None
+
+    try:
+        if isinstance(original, ast.Constant):
+            patch = _ConstantPatch(original, mutated)
+        elif type(original) in _OPERATOR_OPNAMES:
+            patch = _OperatorPatch(original, mutated)
+        else:
+            return None
+        code, patched = _patch(
+            spec.loader.get_code(work_item.module), span, patch)
+    except _Unpatchable:
+        return None
+
+    if not patched:
+        return None
+
+    return code, _diff(lines, span, work_item.replacement, spec.origin)
+
+
+def bytecode_worker(work_item, operator_class, test_runner):
+    """Run the tests against the mutant for `work_item`, made by patching
+    bytecode.
+
+    This is `worker.worker()` for mutants made by `mutate_code()`.
+
+    Returns: a WorkItem, or `None` if the mutant can't be made by patching
+        bytecode. In that case, use `worker.worker()` instead.
+
+    Raises: This will generally not raise any exceptions. Rather, exceptions
+        will be reported using the 'exception' result-type in the return value.
+    """
+    try:
+        with preserve_modules():
+            mutant = mutate_code(work_item)
+        if mutant is None:
+            return None
+
+        code, module_diff = mutant
+        with using_code(work_item.module, code):
+            rec = test_runner()
+
+        return operator_result(rec, operator_class,
+                               int(work_item.occurrence),
+                               diff=module_diff,
+                               line_number=work_item.line_number)
+
+    except Exception:  # noqa # pylint: disable=broad-except
+        return exception_result()
@@ -3,6 +3,7 @@
 Here we manage command-line parsing and launching of the internal
 machinery that does mutation testing.
 """
+import contextlib
 import itertools
 import json
 import logging
@@ -11,6 +12,7 @@ import pprint
 import signal
 import subprocess
 import sys
+import tempfile
 
 import docopt
 import docopt_subcommands as dsc
@@ -20,12 +22,19 @@ import cosmic_ray.counting
 import cosmic_ray.modules
 import cosmic_ray.plugins
 import cosmic_ray.worker
-from cosmic_ray.config import ConfigError, get_db_name, load_config
+from cosmic_ray.bundle import bundle_dir
+from cosmic_ray.config import (ConfigError, get_db_name, get_operator_set,
+                               load_config)
+from cosmic_ray.coverage_map import (CoverageTracer, coverage_from_json,
+                                     module_roots)
+from cosmic_ray.infection import InfectionTracer, infection_from_json
+from cosmic_ray.kill_model import KillModel
 from cosmic_ray.progress import report_progress
 from cosmic_ray.testing.test_runner import TestOutcome
-from cosmic_ray.timing import Timer
+from cosmic_ray.timing import TestTimer, Timeouts, Timer
+from cosmic_ray.type_profile import TypeProfiler, type_profile_from_json
 from cosmic_ray.util import redirect_stdout
-from cosmic_ray.work_db import use_db, WorkDB
+from cosmic_ray.work_db import use_db, SessionFormatError, WorkDB
 from cosmic_ray.version import __version__
 
 log = logging.getLogger()
@@ -33,12 +42,33 @@ log = logging.getLogger()
 
 @dsc.command()
 def handle_baseline(args):
-    """usage: cosmic-ray baseline <config-file>
+    """usage: cosmic-ray baseline [options] <config-file>
 
     Run an un-mutated baseline of the specific configuration. This is
     largely like running a "worker" process, with the difference that
     a baseline run doesn't mutate the code.
 
+    The report is a JSON object. Its "durations" maps each test ID to
+    the seconds the test took. With `--trace-coverage` it also has a
+    "coverage" map; see `cosmic_ray.coverage_map`. With
+    `--profile-types` it has a "types" map of the operators which the
+    operands of each binary and unary operation support; see
+    `cosmic_ray.type_profile`. With `--trace-infection` it has an
+    "infection" map of the replacements of each binary, unary and
+    comparison operation which would change its value; see
+    `cosmic_ray.infection`. Tracing and profiling slow the tests down,
+    so durations from such a run are not representative.
+
+    options:
+      --report=<report-file>  Write a JSON report of the run to <report-file>
+      --trace-coverage        Record in the report which lines of the
+                              modules under test each test executes
+      --profile-types         Record in the report the types of the operands
+                              of the operators in the modules under test
+      --trace-infection       Record in the report which replacements of the
+                              operators in the modules under test would
+                              change their values
+
     """
     sys.path.insert(0, '')
 
@@ -47,7 +77,16 @@ def handle_baseline(args):
     test_runner = cosmic_ray.plugins.get_test_runner(
         config['test-runner']['name'],
         config['test-runner']['args'])
-    work_item = test_runner()
+
+    if args['--report']:
+        work_item, report = _run_baseline_tests(
+            test_runner, config, args['--trace-coverage'],
+            args['--profile-types'], args['--trace-infection'])
+        with open(args['--report'], mode='wt') as handle:
+            json.dump(report, handle)
+    else:
+        work_item = test_runner()
+
     # note: test_runner() results are meant to represent
     # status codes when executed against mutants.
     # SURVIVED means that the test suite executed without any error
@@ -64,6 +103,44 @@ def handle_baseline(args):
     return os.EX_OK
 
 
+def _run_baseline_tests(test_runner, config, trace_coverage,
+                        profile_types=False, trace_infection=False):
+    """Run `test_runner`, collecting the details for a baseline report.
+
+    Returns: A tuple `(work_item, report)` of the test runner's results and
+      the report.
+    """
+    test_timer = TestTimer()
+    test_runner.add_listener(test_timer)
+
+    report = {}
+    roots = None
+    if trace_coverage or profile_types or trace_infection:
+        roots = module_roots(
+            cosmic_ray.modules.fixup_module_name(config['module']))
+
+    with contextlib.ExitStack() as stack:
+        if trace_coverage:
+            tracer = CoverageTracer(roots)
+            test_runner.add_listener(tracer)
+            stack.enter_context(tracer)
+        # An `InfectionTracer` profiles the types of operands too.
+        if trace_infection:
+            profiler = stack.enter_context(InfectionTracer(roots))
+        elif profile_types:
+            profiler = stack.enter_context(TypeProfiler(roots))
+        work_item = test_runner()
+
+    if trace_coverage:
+        report['coverage'] = tracer.to_json()
+    if profile_types:
+        report['types'] = profiler.to_json()
+    if trace_infection:
+        report['infection'] = profiler.infection_to_json()
+    report['durations'] = test_timer.durations
+    return work_item, report
+
+
 @dsc.command()
 def handle_new_config(args):
     """usage: cosmic-ray new-config <config-file>
@@ -79,7 +156,7 @@ def handle_new_config(args):
 
 @dsc.command()
 def handle_init(args):
-    """usage: cosmic-ray init <config-file> <session-file>
+    """usage: cosmic-ray init [options] <config-file> <session-file>
 
     Initialize a mutation testing session from a configuration. This
     primarily creates a session - a database of "work to be done" -
@@ -94,6 +171,42 @@ def handle_init(args):
 
     The `session-file` is the filename for the database in which the
     work order will be stored.
+
+    With `--incremental`, an existing session keeps the work items and
+    results for each module whose source and tests haven't changed since
+    the session was last initialized. Only the other modules are
+    scheduled for mutation testing. If the configuration has changed, or
+    the session was last initialized without `--incremental`, the entire
+    session is re-initialized.
+
+    With `--prefilter`, every mutant is compiled when the session is
+    initialized, and those which don't compile are reported as
+    incompetent straight away. Mutants which compile to the same code as
+    the unmutated module are reported as equivalent, and of the mutants
+    which compile to the same code as each other, only one is run. With
+    `--bundle`, the compiled mutants are
+    also stored in a bundle directory next to the session file (e.g.
+    "session.bundle" for "session.json"), so that workers don't have to
+    make the mutants themselves.
+
+    With `--kill-model`, each work item gets the probability that its
+    mutant is killed as predicted by a model made with `cosmic-ray
+    train-kill-model`, and the mutants whose prediction is least certain
+    are run first. With `--sample-killed` as well, only the given
+    fraction of the mutants which are confidently predicted to be killed
+    are run, and the others are reported as killed.
+
+    options:
+      --incremental            Keep the results for unchanged modules
+      --prefilter              Report mutants which don't compile or are
+                               equivalent without running them
+      --bundle                 Compile every mutant into a bundle ahead of
+                               time
+      --kill-model=<file>      Predict which mutants are killed with this
+                               model
+      --sample-killed=<rate>   Only run this fraction of the mutants which
+                               are predicted to be killed
+
     """
     # This lets us import modules from the current directory. Should
     # probably be optional, and needs to also be applied to workers!
@@ -103,31 +216,8 @@ def handle_init(args):
 
     config = load_config(config_file)
 
-    if 'timeout' in config:
-        timeout = float(config['timeout'])
-    elif 'baseline' in config:
-        try:
-            baseline_mult = float(config['baseline'])
-            if baseline_mult <= 0:
-                raise ValueError()
-        except (ValueError, TypeError):
-            raise ConfigError(
-                'Baseline multiplier must be a positive number, not {}'.format(
-                    config['baseline']))
-
-        command = 'cosmic-ray baseline {}'.format(
-            args['<config-file>'])
-
-        # We run the baseline in a subprocess to more closely emulate the
-        # runtime of a worker subprocess.
-        with Timer() as timer:
-            subprocess.check_call(command.split())
-
-        timeout = baseline_mult * timer.elapsed.total_seconds()
-    else:
-        raise ConfigError(
-            "Config must specify either baseline or timeout")
-
+    kill_model, sample_rate = _kill_model_options(args)
+    timeout, timeouts = _timeouts(config, config_file)
     log.info('timeout = %f seconds', timeout)
 
     modules = set(
@@ -139,12 +229,191 @@ def handle_init(args):
 
     db_name = get_db_name(args['<session-file>'])
 
+    options = cosmic_ray.commands.InitOptions(
+        incremental=args['--incremental'],
+        timeouts=timeouts,
+        prefilter=args['--prefilter'],
+        kill_model=kill_model,
+        sample_rate=sample_rate,
+        loop_timeout=_loop_timeout(config),
+        bundle=bundle_dir(db_name) if args['--bundle'] else None,
+        **_baseline_maps(config, config_file))
+
     with use_db(db_name) as database:
         cosmic_ray.commands.init(
             modules,
             database,
             config,
-            timeout)
+            timeout,
+            options)
+
+    return os.EX_OK
+
+
+def _kill_model_options(args):
+    """Get the kill model and sample rate for `cosmic-ray init`.
+
+    Returns: A `(kill_model, sample_rate)` tuple, either of which may be
+      `None`.
+
+    Raises:
+      docopt.DocoptExit: If the options are invalid.
+    """
+    kill_model = None
+    if args['--kill-model']:
+        kill_model = KillModel.load(args['--kill-model'])
+
+    sample_rate = None
+    if args['--sample-killed'] is not None:
+        if kill_model is None:
+            raise docopt.DocoptExit(
+                '--sample-killed requires --kill-model')
+        try:
+            sample_rate = float(args['--sample-killed'])
+            if not 0 <= sample_rate <= 1:
+                raise ValueError()
+        except ValueError:
+            raise docopt.DocoptExit(
+                'Sample rate must be a number from 0 to 1, not {}'.format(
+                    args['--sample-killed']))
+
+    return kill_model, sample_rate
+
+
+def _timeouts(config, config_file):
+    """Get the timeout of a new session from its configuration, running the
+    baseline to time the tests if need be.
+
+    Returns: A `(timeout, timeouts)` tuple, where `timeouts` is the
+      `Timeouts` for the test suite, or `None` if the baseline wasn't run.
+
+    Raises:
+      ConfigError: If the configuration doesn't give a valid timeout.
+    """
+    if 'timeout' in config:
+        return float(config['timeout']), None
+
+    if 'baseline' not in config:
+        raise ConfigError(
+            "Config must specify either baseline or timeout")
+
+    try:
+        baseline_mult = float(config['baseline'])
+        if baseline_mult <= 0:
+            raise ValueError()
+    except (ValueError, TypeError):
+        raise ConfigError(
+            'Baseline multiplier must be a positive number, not {}'.format(
+                config['baseline']))
+
+    try:
+        timeout_floor = float(config.get('timeout-floor', 1))
+    except (ValueError, TypeError):
+        raise ConfigError(
+            'Timeout floor must be a number, not {}'.format(
+                config['timeout-floor']))
+
+    # We run the baseline in a subprocess to more closely emulate the
+    # runtime of a worker subprocess.
+    with Timer() as timer:
+        report = _run_baseline(config_file)
+
+    elapsed = timer.elapsed.total_seconds()
+
+    # Time spent outside of the tests, e.g. starting up and discovering
+    # tests, is paid by every worker regardless of which tests it runs.
+    durations = report['durations']
+    timeouts = Timeouts(
+        durations,
+        max(0.0, elapsed - sum(durations.values())),
+        baseline_mult,
+        timeout_floor)
+    return baseline_mult * elapsed, timeouts
+
+
+def _loop_timeout(config):
+    """Get the timeout for mutants which may loop forever from `config`, or
+    `None` if it doesn't give one.
+
+    Raises:
+      ConfigError: If the timeout isn't a positive number.
+    """
+    if 'loop-timeout' not in config:
+        return None
+    try:
+        loop_timeout = float(config['loop-timeout'])
+        if loop_timeout <= 0:
+            raise ValueError()
+    except (ValueError, TypeError):
+        raise ConfigError(
+            'Loop timeout must be a positive number, not {}'.format(
+                config['loop-timeout']))
+    return loop_timeout
+
+
+def _baseline_maps(config, config_file):
+    """Run the baseline to make the coverage map, type profile and infection
+    map which `config` asks for.
+
+    Returns: A dict of the `InitOptions` keyword arguments for the maps that
+      were made.
+    """
+    baseline_options = []
+    if config.get('coverage', False):
+        baseline_options.append('--trace-coverage')
+    if config.get('profile-types', False):
+        baseline_options.append('--profile-types')
+    if config.get('weak-mutation', False):
+        baseline_options.append('--trace-infection')
+    if not baseline_options:
+        return {}
+
+    report = _run_baseline(config_file, *baseline_options)
+    maps = {}
+    if 'coverage' in report:
+        maps['coverage'] = coverage_from_json(report['coverage'])
+    if 'types' in report:
+        maps['type_profile'] = type_profile_from_json(report['types'])
+    if 'infection' in report:
+        maps['infection'] = infection_from_json(report['infection'])
+    return maps
+
+
+def _run_baseline(config_file, *options):
+    """Run `cosmic-ray baseline` with `options` in a subprocess.
+
+    Returns: The baseline's report. See `handle_baseline()`.
+    """
+    handle, report_file = tempfile.mkstemp(suffix='.json')
+    os.close(handle)
+    try:
+        subprocess.check_call(
+            ['cosmic-ray', 'baseline', '--report={}'.format(report_file)] +
+            list(options) + [config_file])
+        with open(report_file, mode='rt') as report:
+            return json.load(report)
+    finally:
+        os.remove(report_file)
+
+
+@dsc.command()
+def handle_train_kill_model(args):
+    """usage: cosmic-ray train-kill-model <model-file> <session-file>...
+
+    Train a model which predicts whether the tests kill a mutant on the
+    results in the sessions, and write it to the model file. See `init
+    --kill-model`.
+
+    Only the mutants whose tests were run are used, so the sessions may
+    be incomplete.
+    """
+    model = KillModel()
+    for session_file in args['<session-file>']:
+        with use_db(get_db_name(session_file), WorkDB.Mode.open) as database:
+            model.train(database.iter_work_items())
+    model.save(args['<model-file>'])
+
+    log.info('Trained on %s mutants', model.num_samples)
 
     return os.EX_OK
 
@@ -181,15 +450,29 @@ def handle_exec(args):
 
 @dsc.command()
 def handle_dump(args):
-    """usage: cosmic-ray dump <session-file>
+    """usage: cosmic-ray dump [options] <session-file>
 
     JSON dump of session data. This output is typically run through
     other programs to produce reports.
+
+    Each work item is written as a JSON object on its own line. Items
+    are read from the session one at a time, so this works for sessions
+    of any size.
+
+    options:
+      --fields=<fields>  Only dump these comma-separated WorkItem fields
+
     """
     session_file = get_db_name(args['<session-file>'])
 
+    fields = None
+    if args['--fields']:
+        fields = [field.strip() for field in args['--fields'].split(',')]
+
     with use_db(session_file, WorkDB.Mode.open) as database:
-        for record in database.work_items:
+        for record in database.iter_work_items(fields):
+            if fields is not None:
+                record = {field: record[field] for field in fields}
             print(json.dumps(record))
 
     return os.EX_OK
@@ -211,7 +494,7 @@ def handle_counts(args):
         cosmic_ray.modules.fixup_module_name(config['module']),
         config.get('exclude-modules', []))
 
-    operators = cosmic_ray.plugins.operator_names()
+    operators = cosmic_ray.plugins.operator_names(get_operator_set(config))
 
     counts = cosmic_ray.counting.count_mutants(modules, operators)
 
@@ -348,6 +631,9 @@ def main(argv=None):
     except ConfigError as exc:
         print(exc, file=sys.stderr)
         return os.EX_CONFIG
+    except SessionFormatError as exc:
+        print(exc, file=sys.stderr)
+        return os.EX_DATAERR
 
 
 if __name__ == '__main__':
@@ -6,5 +6,5 @@ justify a separate module.
 """
 
 from .execute import execute  # NOQA
-from .init import init  # NOQA
+from .init import InitOptions, init  # NOQA
 from .new_config import new_config  # NOQA
@@ -1,6 +1,7 @@
 "Implementation of the 'execute' command."
 import os
 
+from cosmic_ray.kill_history import KillHistory
 from cosmic_ray.progress import reports_progress
 from cosmic_ray.work_db import use_db, WorkDB
 from cosmic_ray.plugins import get_execution_engine
@@ -33,6 +34,9 @@ def execute(db_name):
 
     This looks for any work in `db_name` which has no results, schedules it to
     be executed, and records any results that arrive.
+
+    Each work item is told which tests killed mutants of the same code so far
+    (see `KillHistory`), so that the worker can run those tests first.
     """
     try:
         with use_db(db_name, mode=WorkDB.Mode.open) as work_db:
@@ -40,12 +44,16 @@ def execute(db_name):
             config, timeout = work_db.get_config()
             engine_config = config['execution-engine']
             executor = get_execution_engine(engine_config['name'])
+            history = KillHistory(work_db.iter_work_items(
+                KillHistory.fields))
             work_items = executor(timeout,
-                                  work_db.pending_work_items,
+                                  history.prioritize(
+                                      work_db.pending_work_items),
                                   config)
 
             for work_item in work_items:
                 work_db.update_work_item(work_item)
+                history.record(work_item)
                 _update_progress(work_db)
     except FileNotFoundError as exc:
         raise FileNotFoundError(str(exc).replace(
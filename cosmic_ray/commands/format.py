@@ -1,35 +1,75 @@
 "Implementation of various formatting commands."
 
 import json
+import shutil
 import sys
+import tempfile
 import xml.etree.ElementTree
+from xml.sax.saxutils import quoteattr
 
 import docopt
 
-from cosmic_ray.reporting import create_report, is_killed, survival_rate
+from cosmic_ray.config import get_db_name
+from cosmic_ray.reporting import create_report, is_equivalent, is_killed, \
+    is_not_infected, survival_rate
 from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_db import use_db, WorkDB
 from cosmic_ray.work_item import WorkItem
 from cosmic_ray.worker import WorkerOutcome
 
+# The WorkItem fields used by each of the reports.
+_RATE_FIELDS = ('worker_outcome', 'test_outcome')
+_REPORT_FIELDS = _RATE_FIELDS + (
+    'job_id', 'module', 'line_number', 'replacement', 'command_line', 'data',
+    'diff')
+_XML_FIELDS = _RATE_FIELDS + (
+    'job_id', 'module', 'line_number', 'command_line', 'data', 'diff')
+
+
+def _read_work_items(session_file, fields):
+    """Generate the work items to report on.
+
+    The items are read one at a time, either from the session in
+    `session_file` or, if that is `None`, from JSON records (as written by
+    `cosmic-ray dump`) on stdin.
+
+    Args:
+      session_file: The session file to read, or `None`.
+      fields: The `WorkItem` fields needed for the report. When reading a
+        session file, only these fields are read.
+    """
+    if session_file is None:
+        for line in sys.stdin:
+            yield WorkItem(json.loads(line))
+    else:
+        with use_db(get_db_name(session_file), WorkDB.Mode.open) as database:
+            yield from database.iter_work_items(fields)
+
 
 def format_survival_rate():
     """cr-rate
 
-Usage: cr-rate
+Usage: cr-rate [<session-file>]
 
-Read JSON work-records from stdin and print the survival rate.
+Print the survival rate of the work-records in <session-file> or, if no
+session is given, of the JSON work-records on stdin.
 """
-    records = (WorkItem(json.loads(line)) for line in sys.stdin)
+    arguments = docopt.docopt(format_survival_rate.__doc__,
+                              version='cr-format 0.1')
+    records = _read_work_items(arguments['<session-file>'], _RATE_FIELDS)
     print('{:.2f}'.format(survival_rate(records)))
 
 
 def report():
     """cr-report
 
-Usage: cr-report [--full-report] [--show-pending]
+Usage: cr-report [--full-report] [--show-pending] [<session-file>]
 
 Print a nicely formatted report of test results and some basic statistics.
 
+The results are read from <session-file> or, if no session is given, from the
+JSON work-records on stdin.
+
 options:
     --full-report   Show test output and mutation diff for killed mutants
     --show-pending  Display results for incomplete tasks
@@ -38,7 +78,7 @@ options:
     arguments = docopt.docopt(report.__doc__, version='cr-format 0.1')
     full_report = arguments['--full-report']
     show_pending = arguments['--show-pending']
-    records = (WorkItem(json.loads(line)) for line in sys.stdin)
+    records = _read_work_items(arguments['<session-file>'], _REPORT_FIELDS)
     for line in create_report(records, show_pending, full_report):
         print(line)
 
@@ -66,6 +106,19 @@ def _create_element_from_item(work_item):
         failure_elem = xml.etree.ElementTree.SubElement(sub_elem, 'failure')
         failure_elem.set('message', "Mutant has survived your unit tests")
         failure_elem.text = str(data) + "\n".join(work_item.diff)
+    elif outcome == WorkerOutcome.SKIPPED and \
+            work_item.test_outcome == TestOutcome.SURVIVED:
+        failure_elem = xml.etree.ElementTree.SubElement(sub_elem, 'failure')
+        failure_elem.set('message', "Mutant has survived your unit tests")
+        failure_elem.text = str(data)
+    elif is_not_infected(work_item):
+        failure_elem = xml.etree.ElementTree.SubElement(sub_elem, 'failure')
+        failure_elem.set('message',
+                         "Mutant never changed the state in your unit tests")
+        failure_elem.text = str(data)
+    elif is_equivalent(work_item):
+        skipped_elem = xml.etree.ElementTree.SubElement(sub_elem, 'skipped')
+        skipped_elem.set('message', "Mutant is equivalent to the original")
 
     return sub_elem
 
@@ -76,35 +129,54 @@ def _evaluation_success(outcome, work_item):
                                       TestOutcome.INCOMPETENT]
 
 
-def _create_xml_report(records):
+def _write_xml_report(records, stream):
+    """Write an XML report on `records` to the binary file `stream`.
+
+    The summary counts are attributes of the root element, so they have to be
+    written before any of the testcase elements. Rather than keeping all of
+    the elements in memory until the counts are known, we spool them to a
+    temporary file.
+    """
     total_jobs = 0
     errors = 0
     failed = 0
-    root_elem = xml.etree.ElementTree.Element('testsuite')
-    for item in records:
-        total_jobs += 1
-        if item.worker_outcome is None:
-            errors += 1
-        if is_killed(item):
-            failed += 1
-        if item.worker_outcome is not None:
-            subelement = _create_element_from_item(item)
-            root_elem.append(subelement)
-
-    root_elem.set('errors', str(errors))
-    root_elem.set('failures', str(failed))
-    root_elem.set('skips', str(0))
-    root_elem.set('tests', str(total_jobs))
-    return xml.etree.ElementTree.ElementTree(root_elem)
+    skipped = 0
+    with tempfile.TemporaryFile() as testcases:
+        for item in records:
+            total_jobs += 1
+            if item.worker_outcome is None:
+                errors += 1
+            if is_killed(item):
+                failed += 1
+            if is_equivalent(item):
+                skipped += 1
+            if item.worker_outcome is not None:
+                testcases.write(xml.etree.ElementTree.tostring(
+                    _create_element_from_item(item), encoding='utf-8'))
+
+        attrs = (('errors', errors),
+                 ('failures', failed),
+                 ('skips', skipped),
+                 ('tests', total_jobs))
+        stream.write("<?xml version='1.0' encoding='utf-8'?>\n".encode())
+        stream.write('<testsuite {}>'.format(' '.join(
+            '{}={}'.format(name, quoteattr(str(value)))
+            for name, value in attrs)).encode())
+        testcases.seek(0)
+        shutil.copyfileobj(testcases, stream)
+        stream.write(b'</testsuite>')
 
 
 def report_xml():
     """cr-xml
 
-Usage: cr-xml
+Usage: cr-xml [<session-file>]
 
 Print an XML formatted report of test results for continuos integration systems
+
+The results are read from <session-file> or, if no session is given, from the
+JSON work-records on stdin.
 """
-    records = (WorkItem(json.loads(line)) for line in sys.stdin)
-    xml_elem = _create_xml_report(records)
-    xml_elem.write(sys.stdout.buffer, encoding='utf-8', xml_declaration=True)
+    arguments = docopt.docopt(report_xml.__doc__, version='cr-format 0.1')
+    records = _read_work_items(arguments['<session-file>'], _XML_FIELDS)
+    _write_xml_report(records, sys.stdout.buffer)
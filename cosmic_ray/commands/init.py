@@ -1,43 +1,472 @@
 "Implementation of the 'init' command."
+import inspect
 import logging
+import os
 import uuid
 
-import cosmic_ray.modules
+import cosmic_ray.counting
+import cosmic_ray.plugins
+from cosmic_ray.bundle import compile_mutants, prune_bundle
+from cosmic_ray.config import get_operator_set
+from cosmic_ray.coverage_map import covering_tests
+from cosmic_ray.digests import module_digest, test_suite_digest
+from cosmic_ray.infection import replacement_name
+from cosmic_ray.kill_model import (CONFIDENT, block_spans, is_sampled,
+                                   nesting_depth)
+from cosmic_ray.loop_exits import LOOP_LANE, LoopSites
+from cosmic_ray.parsing import get_ast
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.type_profile import replacement_operator
 from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
 
 log = logging.getLogger()
 
 
-def init(modules,
-         work_db,
-         config,
-         timeout):
+def _module_parts(modules, file_map):
+    """Get the parts of `file_map`, a dict keyed by source filename like a
+    coverage map, for each of `modules`, keyed by module name.
+    """
+    return {
+        module.__name__: file_map.get(
+            os.path.realpath(inspect.getsourcefile(module)), {})
+        for module in modules
+    }
+
+
+def _select_tests(work_item, line_coverage):
+    """Restrict `work_item` to the tests which execute the code it mutates.
+
+    If no test executes that code then the work item is marked as surviving,
+    since no test could possibly kill it.
+
+    Args:
+      work_item: The `WorkItem` to update.
+      line_coverage: A dict mapping line numbers in the work item's module to
+        the IDs of the tests which execute them.
+
+    Returns: `work_item`.
+    """
+    first_line = work_item.line_number
+    if first_line is None:
+        return work_item
+
+    work_item.covering_tests = covering_tests(
+        line_coverage,
+        first_line,
+        work_item.end_line_number or first_line)
+
+    if work_item.covering_tests == []:
+        work_item.worker_outcome = WorkerOutcome.SKIPPED
+        work_item.test_outcome = TestOutcome.SURVIVED
+        work_item.data = ['No tests execute the mutated code.']
+
+    return work_item
+
+
+def _prune_type_errors(work_item, site_types):
+    """Mark `work_item` as incompetent if its mutant replaces an operator with
+    one which none of the operand types recorded at its site supports.
+
+    Args:
+      work_item: The `WorkItem` to update.
+      site_types: The part of a type profile for the work item's module, i.e.
+        a dict mapping the span of each executed operation to the names of
+        the operators its operands support.
+
+    Returns: `work_item`.
+    """
+    if work_item.worker_outcome is not None:
+        return work_item
+
+    supported = site_types.get((
+        work_item.line_number, work_item.col_offset,
+        work_item.end_line_number, work_item.end_col_offset))
+    if supported is None:
+        return work_item
+
+    to_op = replacement_operator(work_item.node_type, work_item.replacement)
+    if to_op is not None and to_op not in supported:
+        work_item.worker_outcome = WorkerOutcome.SKIPPED
+        work_item.test_outcome = TestOutcome.INCOMPETENT
+        work_item.data = [
+            'No operands seen here in the baseline support {}.'.format(
+                to_op)]
+
+    return work_item
+
+
+def _prune_uninfected(work_item, site_infection):
+    """Mark `work_item` as surviving if its mutant never changed the value of
+    the expression it mutates.
+
+    Args:
+      work_item: The `WorkItem` to update.
+      site_infection: The part of an infection map for the work item's
+        module, i.e. a dict mapping the span of each executed operation to the
+        names of the replacements which changed its value.
+
+    Returns: `work_item`.
+    """
+    if work_item.worker_outcome is not None:
+        return work_item
+
+    infected = site_infection.get((
+        work_item.line_number, work_item.col_offset,
+        work_item.end_line_number, work_item.end_col_offset))
+    if infected is None:
+        return work_item
+
+    name = replacement_name(work_item.node_type, work_item.replacement)
+    if name is not None and name not in infected:
+        work_item.worker_outcome = WorkerOutcome.SKIPPED
+        work_item.test_outcome = TestOutcome.NOT_INFECTED
+        work_item.data = [
+            'The mutated expression never had a different value.']
+
+    return work_item
+
+
+def _predict(work_item, kill_model, sample_rate):
+    """Set the `kill_probability` of `work_item` from `kill_model`.
+
+    If `sample_rate` isn't `None`, a pending work item whose mutant is
+    confidently predicted to be killed is reported as killed without being
+    run, unless it's among the fraction `sample_rate` of such work items which
+    are run anyway.
+
+    Returns: `work_item`.
+    """
+    probability = kill_model.kill_probability(work_item)
+    work_item.kill_probability = probability
+    if sample_rate is not None and \
+            work_item.worker_outcome is None and \
+            probability is not None and \
+            probability >= CONFIDENT and \
+            not is_sampled(work_item, sample_rate):
+        work_item.worker_outcome = WorkerOutcome.SKIPPED
+        work_item.test_outcome = TestOutcome.KILLED
+        work_item.data = [
+            'Predicted to be killed with probability {:.3f}.'.format(
+                probability)]
+    return work_item
+
+
+def _set_timeout(work_item, timeouts):
+    """Set the timeout of `work_item` from the tests it will run.
+
+    Returns: `work_item`.
+    """
+    if work_item.worker_outcome is None:
+        work_item.timeout = timeouts(work_item.covering_tests)
+    return work_item
+
+
+def _isolate_loop(work_item, loop_sites, loop_timeout, timeout):
+    """Put `work_item` in the `LOOP_LANE` lane if its mutant may make a loop
+    run forever, i.e. if it's at one of `loop_sites`.
+
+    If `loop_timeout` isn't `None`, such a work item's timeout is cut to at
+    most `loop_timeout`. `timeout` is the session's timeout.
+
+    Returns: `work_item`.
+    """
+    if work_item.worker_outcome is None and work_item in loop_sites:
+        work_item.lane = LOOP_LANE
+        if loop_timeout is not None:
+            work_item.timeout = min(work_item.timeout or timeout,
+                                    loop_timeout)
+    return work_item
+
+
+def _unchanged_modules(work_db, config, digests):
+    """Find the modules whose work items in `work_db` are still valid.
+
+    Args:
+      work_db: The `WorkDB` being re-initialized.
+      config: The new configuration for the session.
+      digests: A dict mapping the names of the modules under test to their
+        current digests.
+
+    Returns: The set of names of modules whose digests are the same as when
+      `work_db` was last initialized. This is empty if the configuration has
+      changed.
+    """
+    try:
+        old_config, _ = work_db.get_config()
+    except ValueError:
+        return set()
+
+    if old_config != config:
+        log.info('Configuration has changed; re-initializing all modules')
+        return set()
+
+    old_digests = work_db.get_module_digests()
+    return {
+        name
+        for name, digest in digests.items()
+        if old_digests.get(name) == digest
+    }
+
+
+class InitOptions:  # pylint: disable=too-many-instance-attributes
+    """The optional parts of initializing a session with `init()`.
+
+    Args:
+      coverage: An optional coverage map for the modules, as described in
+        `cosmic_ray.coverage_map`. If this is provided, each work item only
+        runs the tests which execute the code it mutates, and work items for
+        code which no test executes are reported as survivors without running
+        any tests.
+      incremental: Whether to keep the work items for unchanged modules.
+      timeouts: An optional `cosmic_ray.timing.Timeouts` for the test suite.
+        If this is provided, each work item gets its own timeout for running
+        the tests it will actually run.
+      prefilter: Whether to compile the mutants for the new work items
+        ahead of time, so that those which don't compile are reported as
+        incompetent without being run. See `cosmic_ray.bundle`.
+      bundle: An optional bundle directory. If this is provided, the mutants
+        for the new work items are prefiltered and compiled into it ahead of
+        time.
+      type_profile: An optional type profile for the modules, as described in
+        `cosmic_ray.type_profile`. If this is provided, work items whose
+        mutants replace an operator with one which the operand types seen in
+        the baseline don't support are reported as incompetent without
+        running any tests.
+      infection: An optional infection map for the modules, as described in
+        `cosmic_ray.infection`. If this is provided, work items whose mutants
+        never changed the value of the expression they mutate while the tests
+        ran are reported as surviving without running any tests.
+      kill_model: An optional `cosmic_ray.kill_model.KillModel`. If this is
+        provided, each work item gets its predicted `kill_probability`.
+      sample_rate: The fraction of the work items which `kill_model`
+        confidently predicts to be killed which are run anyway. The others
+        are reported as killed. If this is `None`, they're all run.
+      loop_timeout: The timeout, in seconds, for the work items whose mutants
+        may make a loop run forever (see `cosmic_ray.loop_exits`), if it's
+        less than their usual timeout. These work items are put in their own
+        lane whether or not this is provided.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 coverage=None,
+                 incremental=False,
+                 timeouts=None,
+                 prefilter=False,
+                 bundle=None,
+                 type_profile=None,
+                 infection=None,
+                 kill_model=None,
+                 sample_rate=None,
+                 loop_timeout=None):
+        self.coverage = coverage
+        self.incremental = incremental
+        self.timeouts = timeouts
+        self.prefilter = prefilter
+        self.bundle = bundle
+        self.type_profile = type_profile
+        self.infection = infection
+        self.kill_model = kill_model
+        self.sample_rate = sample_rate
+        self.loop_timeout = loop_timeout
+
+
+class _Session:
+    """What the passes over the new work items of a session need to know.
+
+    Args:
+      modules: The modules under test.
+      config: The configuration for the session.
+      timeout: The timeout of the session.
+      options: The `InitOptions` of the session.
+    """
+
+    def __init__(self, modules, config, timeout, options):
+        self.modules = modules
+        self.config = config
+        self.timeout = timeout
+        self.options = options
+        self.coverage = {} if options.coverage is None else _module_parts(
+            modules, options.coverage)
+        self.loop_sites = {}
+
+    def parts(self, file_map):
+        """Get the parts of `file_map` for each of the modules, keyed by module
+        name. See `_module_parts()`.
+        """
+        return _module_parts(self.modules, file_map)
+
+
+# Each pass over the new work items of a session takes an iterable of them
+# and the `_Session`, and returns an iterable of the (updated) work items.
+
+
+def _coverage_pass(work_items, session):
+    "Run only the covering tests for each work item. See `_select_tests()`."
+    if session.options.coverage is None:
+        return work_items
+    return (_select_tests(work_item, session.coverage[work_item.module])
+            for work_item in work_items)
+
+
+def _type_profile_pass(work_items, session):
+    "Prune the type errors. See `_prune_type_errors()`."
+    if session.options.type_profile is None:
+        return work_items
+    module_types = session.parts(session.options.type_profile)
+    return (_prune_type_errors(work_item, module_types[work_item.module])
+            for work_item in work_items)
+
+
+def _infection_pass(work_items, session):
+    "Prune the mutants which don't infect. See `_prune_uninfected()`."
+    if session.options.infection is None:
+        return work_items
+    module_infection = session.parts(session.options.infection)
+    return (_prune_uninfected(work_item, module_infection[work_item.module])
+            for work_item in work_items)
+
+
+def _kill_model_pass(work_items, session):
+    "Predict which mutants are killed. See `_predict()`."
+    if session.options.kill_model is None:
+        return work_items
+    return (_predict(work_item, session.options.kill_model,
+                     session.options.sample_rate)
+            for work_item in work_items)
+
+
+def _timeouts_pass(work_items, session):
+    "Give each work item its own timeout. See `_set_timeout()`."
+    if session.options.timeouts is None:
+        return work_items
+    return (_set_timeout(work_item, session.options.timeouts)
+            for work_item in work_items)
+
+
+def _loop_pass(work_items, session):
+    "Isolate the mutants which may loop forever. See `_isolate_loop()`."
+    return (_isolate_loop(work_item, session.loop_sites[work_item.module],
+                          session.options.loop_timeout, session.timeout)
+            for work_item in work_items)
+
+
+def _compile_pass(work_items, session):
+    "Compile the mutants ahead of time. See `cosmic_ray.bundle`."
+    options = session.options
+    if not options.prefilter and options.bundle is None:
+        return work_items
+    return compile_mutants(
+        work_items, options.bundle,
+        session.config.get('execution-engine', {}).get('num-workers'))
+
+
+# The passes over the new work items of a session, in the order they're made.
+PASSES = [
+    _coverage_pass,
+    _type_profile_pass,
+    _infection_pass,
+    _kill_model_pass,
+    _timeouts_pass,
+    _loop_pass,
+    _compile_pass,
+]
+
+
+def _new_work_items(sites, spans):
+    """Make the work items for the mutation `sites` of each module, as found
+    by `cosmic_ray.counting.mutation_sites()`. `spans` are the
+    `block_spans()` of each module.
+    """
+    return (
+        WorkItem(
+            site,
+            job_id=uuid.uuid4().hex,
+            module=module.__name__,
+            operator=opname,
+            occurrence=occurrence,
+            nesting_depth=nesting_depth(
+                spans[module],
+                site['line_number'],
+                site['end_line_number'] or site['line_number']))
+        for module, ops in sites.items()
+        for opname, op_sites in ops.items()
+        for occurrence, site in enumerate(op_sites))
+
+
+def init(modules, work_db, config, timeout, options=None):
     """Clear and initialize a work-db with work items.
 
     Any existing data in the work-db will be cleared and replaced with entirely
     new work orders. In particular, this means that any results in the db are
     removed.
 
+    In incremental mode, the work items (and results) for modules whose source
+    and test suite are unchanged since `work_db` was last initialized are kept,
+    and only the other modules get new work items. Everything is re-initialized
+    if the configuration has changed, or if `work_db` was last initialized
+    without incremental mode, since the module digests are only recorded in
+    incremental mode.
+
+    The new work items go through each of `PASSES` in turn before they're
+    added to `work_db`.
+
     Args:
       modules: iterable of module names to be mutated.
       work_db: A `WorkDB` instance into which the work orders will be saved.
       config: The configuration for the new session.
       timeout: The timeout to apply to the work in the session.
+      options: The `InitOptions` for the session. By default, none of the
+        options are used.
     """
-    operators = cosmic_ray.plugins.operator_names()
-    counts = cosmic_ray.counting.count_mutants(modules, operators)
+    if options is None:
+        options = InitOptions()
+
+    session = _Session(list(modules), config, timeout, options)
+
+    # Only incremental sessions compare digests, so only they record them.
+    digests = {}
+    unchanged = set()
+    if options.incremental:
+        tests_digest = test_suite_digest(config['test-runner']['args'])
+        digests = {module.__name__: module_digest(module, tests_digest)
+                   for module in session.modules}
+        unchanged = _unchanged_modules(work_db, config, digests)
+        log.info('Unchanged modules: %s', sorted(unchanged))
+
+    if unchanged:
+        work_db.clear_work_items(
+            set(work_db.get_module_digests()) - unchanged)
+    else:
+        work_db.clear_work_items()
+
+    operators = cosmic_ray.plugins.operator_names(get_operator_set(config))
+    new_modules = [
+        module for module in session.modules
+        if module.__name__ not in unchanged]
+    module_asts = {module: get_ast(module) for module in new_modules}
+    sites = cosmic_ray.counting.mutation_sites(
+        new_modules, operators, module_asts)
+    spans = {
+        module: block_spans(module_ast)
+        for module, module_ast in module_asts.items()}
+    session.loop_sites = {
+        module.__name__: LoopSites(module_ast)
+        for module, module_ast in module_asts.items()}
     work_db.set_config(
         config=config,
         timeout=timeout)
+    work_db.set_module_digests(digests)
+    work_db.set_coverage(session.coverage)
 
-    work_db.clear_work_items()
+    work_items = _new_work_items(sites, spans)
+    for init_pass in PASSES:
+        work_items = init_pass(work_items, session)
 
-    work_db.add_work_items(
-        WorkItem(
-            job_id=uuid.uuid4().hex,
-            module=module.__name__,
-            operator=opname,
-            occurrence=occurrence)
-        for module, ops in counts.items()
-        for opname, count in ops.items()
-        for occurrence in range(count))
+    work_db.add_work_items(work_items)
+
+    if options.bundle is not None:
+        prune_bundle(options.bundle, (
+            work_item.bundle_entry
+            for work_item in work_db.iter_work_items(['bundle_entry'])))
@@ -1,7 +1,5 @@
 "Implementation of the 'new-config' command."
 
-import qprompt
-
 from cosmic_ray.plugins import (execution_engine_names,
                                 test_runner_names)
 
@@ -25,6 +23,10 @@ def new_config():
 
     Returns: A new configuration as a single string.
     """
+    # qprompt is slow to import and only needed here, so we defer importing it
+    # until it's actually needed.
+    import qprompt
+
     conf = {'module': qprompt.ask_str("Top-level module")}
 
     menu = qprompt.Menu()
@@ -52,6 +52,29 @@ def get_db_name(session_name):
     return '{}.json'.format(session_name)
 
 
+# The values of the `operator-set` option.
+OPERATOR_SETS = ('full', 'sufficient')
+
+
+def get_operator_set(config):
+    """Get the set of operators to use from a configuration.
+
+    With `operator-set: sufficient`, operators which have a variant making
+    only a sufficient subset of their mutants (see
+    `cosmic_ray.plugins.operator_names()`) are replaced by it. The default is
+    `full`.
+
+    Raises:
+      ConfigError: If the operator set is unknown.
+    """
+    operator_set = config.get('operator-set', 'full')
+    if operator_set not in OPERATOR_SETS:
+        raise ConfigError(
+            'Operator set must be one of {}, not {}'.format(
+                ', '.join(OPERATOR_SETS), operator_set))
+    return operator_set
+
+
 class ConfigError(Exception):
     """Errors loading configs or with values in a config."""
     pass
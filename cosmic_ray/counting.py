@@ -1,8 +1,14 @@
 """
 Facilities for counting how many mutants will be created in a
-cross-product of operators and modules.
+cross-product of operators and modules, and for indexing where and what
+those mutants are.
 """
 
+import ast
+import copy
+
+import astunparse
+
 from .parsing import get_ast
 from .plugins import get_operator
 
@@ -27,17 +33,144 @@ class _CountingCore:
         return []
 
 
-def _count(module_ast, op_name):
-    """Count mutants for a single module-operator pair."""
-    core = _CountingCore()
-    operator = get_operator(op_name)(core)
-    operator.visit(module_ast)
-    return core.count
+# Fields holding nested statements. We drop these before describing a mutated
+# node since, for compound statements, only the header is of interest.
+_BODY_FIELDS = ('body', 'orelse', 'finalbody', 'handlers')
+
+
+def _copy_node(node):
+    """Make a copy of `node` which `Operator.mutate()` can safely modify.
+
+    This copies `node` and its list-valued fields, but nothing deeper. That is
+    sufficient for all of the operators in Cosmic Ray, and far cheaper than a
+    deep copy for nodes like function definitions.
+    """
+    node = copy.copy(node)
+    for field, value in ast.iter_fields(node):
+        if isinstance(value, list):
+            setattr(node, field, list(value))
+    return node
+
+
+def _describe(node):
+    """Get a short source description of `node`.
+
+    For compound statements this is just the header, e.g. "if (not x):".
+    """
+    if node is None:
+        return None
+
+    node = copy.copy(node)
+    for field in _BODY_FIELDS:
+        if isinstance(getattr(node, field, None), list):
+            setattr(node, field, [])
+
+    lines = astunparse.unparse(node).strip().splitlines()
+    return '\n'.join(line.strip() for line in lines if line.strip())
+
+
+class _IndexingCore:
+    """
+    An operator core which records the location and nature of each mutation
+    an operator could make.
+
+    After visiting an AST, `sites` holds one dict per mutation, in occurrence
+    order. The keys of the dicts are `WorkItem` field names.
+    """
+
+    def __init__(self):
+        self.sites = []
+
+    def visit_mutation_site(self, node, op, count):
+        "Called when a mutation site is reached."
+        location = {
+            'line_number': getattr(node, 'lineno', None),
+            'col_offset': getattr(node, 'col_offset', None),
+            'end_line_number': getattr(node, 'end_lineno', None),
+            'end_col_offset': getattr(node, 'end_col_offset', None),
+            'node_type': node.__class__.__name__,
+        }
+        for idx in range(count):
+            site = dict(location)
+            site['replacement'] = _describe(op.mutate(_copy_node(node), idx))
+            self.sites.append(site)
+        return node
+
+    @staticmethod
+    def repr_args():
+        "Extra arguments to display in operator reprs."
+        return []
+
+
+def visit_all(node, operators):
+    """Visit `node` with every operator in `operators` in a single traversal.
+
+    This is equivalent to calling `operator.visit(node)` for each operator in
+    turn, but it walks the tree only once. Whenever an operator has a visitor
+    method for a node we hand that node to the operator, which then takes
+    responsibility for its subtree just as it would in a normal traversal;
+    operators without a visitor for the node simply continue into its
+    children along with the shared walk. As a result, each operator sees its
+    mutation sites in exactly the same order as it would on its own.
+
+    This is intended for operators with non-mutating cores (e.g. counting).
+    The result of each operator's visit is discarded.
+
+    Args:
+        node: The root of the AST to visit.
+        operators: A sequence of `Operator` instances.
+    """
+    operators = list(operators)
+
+    # Cache, per node type, the operators which have a visitor for that type.
+    interested = {}
+
+    def walk(node, active):
+        "Visit `node` with `active` operators, recursing for the uninterested."
+        node_type = node.__class__
+        try:
+            visitors = interested[node_type]
+        except KeyError:
+            method = 'visit_' + node_type.__name__
+            visitors = interested[node_type] = frozenset(
+                op for op in operators if hasattr(op, method))
+
+        remaining = []
+        for operator in active:
+            if operator in visitors:
+                operator.visit(node)
+            else:
+                remaining.append(operator)
+
+        if remaining:
+            for child in ast.iter_child_nodes(node):
+                walk(child, remaining)
+
+    walk(node, operators)
+
+
+def _count(module_ast, op_names):
+    """Count mutants for each operator in `op_names` in a single module.
+
+    Returns: A dict mapping operator names to their (non-zero) counts.
+    """
+    cores = {op_name: _CountingCore() for op_name in op_names}
+    visit_all(
+        module_ast,
+        [get_operator(op_name)(core) for op_name, core in cores.items()])
+    return {
+        op_name: core.count
+        for op_name, core in cores.items()
+        if core.count > 0
+    }
 
 
 def count_mutants(modules, operators):
     """Count how many mutations each operator will peform on each module.
 
+    Each module is parsed and traversed only once, regardless of the number of
+    operators.
+
     Args:
         modules: A sequence of module objects
         operators: A sequence of operator plugin names (not operator instances)
@@ -45,13 +178,56 @@ def count_mutants(modules, operators):
     Returns: A dict of the form `{ module-object: {operator-name: count} }`,
         giving a per-operator count for each module.
     """
+    operators = list(operators)
+    return {
+        mod: _count(get_ast(mod), operators)
+        for mod in modules
+    }
+
+
+def _index(module_ast, op_names):
+    """Index the mutation sites for each operator in `op_names` in a single
+    module.
+
+    Returns: A dict mapping operator names to their (non-empty) lists of
+        sites.
+    """
+    cores = {op_name: _IndexingCore() for op_name in op_names}
+    visit_all(
+        module_ast,
+        [get_operator(op_name)(core) for op_name, core in cores.items()])
+    return {
+        op_name: core.sites
+        for op_name, core in cores.items()
+        if core.sites
+    }
+
+
+def mutation_sites(modules, operators, module_asts=None):
+    """Describe each mutation each operator will perform on each module.
+
+    Each mutation is described by a dict with these keys:
+
+      line_number, col_offset: The start of the mutated node.
+      end_line_number, end_col_offset: The end of the mutated node. These are
+        `None` on Python versions which don't record end positions.
+      node_type: The name of the type of the mutated node, e.g. "Compare".
+      replacement: The source of the mutated node, or of its header for
+        compound statements, e.g. "(x <= y)" or "if (not x):".
+
+    Args:
+        modules: A sequence of module objects
+        operators: A sequence of operator plugin names (not operator instances)
+        module_asts: An optional dict mapping module objects to their
+            already-parsed ASTs. Modules which aren't in it are parsed.
+
+    Returns: A dict of the form `{ module-object: {operator-name: [site]} }`
+        where the Nth site in each list describes the mutation for occurrence
+        N. Operators with no sites in a module are omitted.
+    """
+    operators = list(operators)
+    module_asts = module_asts or {}
     return {
-        mod: dict(
-            filter(
-                lambda t: t[1] > 0,
-                ((op, _count(mod_ast, op))
-                 for op in operators)))
-        for (mod, mod_ast)
-        in ((m, get_ast(m))
-            for m in modules)
+        mod: _index(module_asts.get(mod) or get_ast(mod), operators)
+        for mod in modules
     }
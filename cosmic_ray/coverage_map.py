@@ -0,0 +1,141 @@
+"""Map the lines of the code under test to the tests which execute them.
+
+When coverage-guided test selection is enabled, the baseline run records which
+lines of the modules under test each test executes. Each work item can then be
+run against only the tests which execute the code it mutates, and mutants
+which no test executes at all can be reported as survivors without running any
+tests.
+
+A coverage map is a dict mapping source filenames to dicts mapping line
+numbers to lists of test IDs. Lines which are executed outside of any test
+(e.g. module-level code run at import time) have `None` in their list of test
+IDs, meaning that mutations of them need the entire test suite.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+
+
+def module_roots(module_name):
+    """Get the paths of the files containing the module named `module_name`.
+
+    For packages this is the package's directories, and for plain modules it's
+    the module's source file. This doesn't import the module itself, though it
+    does import any parent packages.
+    """
+    spec = importlib.util.find_spec(module_name)
+    if spec is None:
+        raise ImportError('No module named {}'.format(module_name))
+    if spec.submodule_search_locations:
+        return list(spec.submodule_search_locations)
+    return [spec.origin]
+
+
+class CoverageTracer:
+    """Records which tests execute which lines of the files under `roots`.
+
+    This is a test-runner listener (see `TestRunner.add_listener()`). It is
+    also a context manager which installs itself as the trace function (via
+    `sys.settrace()` and `threading.settrace()`) for the duration of the
+    `with`-block.
+
+    Only code in files at or below one of `roots` is traced line-by-line, so
+    the rest of the world (the test framework, the standard library, etc.) runs
+    at close to full speed.
+
+    After tracing, `coverage` is a coverage map (see the module docstring),
+    though with sets rather than lists of test IDs.
+    """
+
+    def __init__(self, roots):
+        self._roots = tuple(os.path.realpath(root) for root in roots)
+        self._test_id = None
+        self._filenames = {}
+        self.coverage = {}
+
+    def start_test(self, test_id):
+        "Attribute subsequently executed lines to the test `test_id`."
+        self._test_id = test_id
+
+    def stop_test(self, test_id):  # pylint: disable=unused-argument
+        "Stop attributing executed lines to a test."
+        self._test_id = None
+
+    def _filename(self, code_filename):
+        """Get the real path of `code_filename` if it's under one of our roots,
+        or `None` otherwise.
+        """
+        try:
+            return self._filenames[code_filename]
+        except KeyError:
+            path = os.path.realpath(code_filename)
+            if not any(path == root or path.startswith(root + os.sep)
+                       for root in self._roots):
+                path = None
+            self._filenames[code_filename] = path
+            return path
+
+    def _trace(self, frame, event, arg):  # pylint: disable=unused-argument
+        if event != 'call':
+            return None
+
+        filename = self._filename(frame.f_code.co_filename)
+        if filename is None:
+            return None
+
+        lines = self.coverage.setdefault(filename, {})
+
+        def trace_lines(frame, event, arg):  # pylint: disable=unused-argument
+            if event == 'line':
+                lines.setdefault(frame.f_lineno, set()).add(self._test_id)
+            return trace_lines
+
+        return trace_lines
+
+    def __enter__(self):
+        threading.settrace(self._trace)
+        sys.settrace(self._trace)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.settrace(None)
+        threading.settrace(None)
+
+    def to_json(self):
+        "Get `coverage` in a JSON-serializable form."
+        return {
+            filename: {str(line): sorted(tests, key=lambda t: (t is not None, t))
+                       for line, tests in lines.items()}
+            for filename, lines in self.coverage.items()
+        }
+
+
+def coverage_from_json(data):
+    "Convert the output of `CoverageTracer.to_json()` into a coverage map."
+    return {
+        filename: {int(line): tests for line, tests in lines.items()}
+        for filename, lines in data.items()
+    }
+
+
+def covering_tests(file_coverage, first_line, last_line):
+    """Find the tests which execute any of a range of lines.
+
+    Args:
+        file_coverage: The part of a coverage map for a single file, i.e. a
+            dict mapping line numbers to lists of test IDs.
+        first_line: The first line of the range.
+        last_line: The last line of the range (inclusive).
+
+    Returns: A sorted list of the IDs of the tests which execute any line in
+        the range, or `None` if the range is executed outside of any test and
+        thus needs the entire test suite.
+    """
+    tests = set()
+    for line in range(first_line, last_line + 1):
+        tests.update(file_coverage.get(line, ()))
+    if None in tests:
+        return None
+    return sorted(tests)
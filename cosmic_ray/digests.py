@@ -0,0 +1,64 @@
+"""Content digests of the code under test and of the test suite.
+
+Incremental sessions (see `cosmic-ray init --incremental`) record a digest for
+each module under test. When the session is re-initialized, the results for
+modules whose digest hasn't changed are kept and only the other modules are
+scheduled for mutation testing again.
+"""
+
+import hashlib
+import inspect
+import os
+
+
+def _update_from_file(digest, path):
+    with open(path, mode='rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b''):
+            digest.update(chunk)
+
+
+def _test_files(test_args):
+    """Generate the Python files named by, or found in directories named by,
+    the whitespace-separated elements of `test_args`.
+    """
+    for arg in str(test_args).split():
+        if os.path.isfile(arg):
+            yield arg
+        elif os.path.isdir(arg):
+            for dirpath, dirnames, filenames in os.walk(arg):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith('.py'):
+                        yield os.path.join(dirpath, filename)
+
+
+def test_suite_digest(test_args):
+    """Get a digest of the test suite described by `test_args`.
+
+    `test_args` are the "test-runner: args" from a configuration. Any of its
+    elements which name files or directories are taken to be the test suite,
+    and the digest covers the paths and contents of the Python files among
+    them. The digest also covers `test_args` itself, so changing how the tests
+    are run changes the digest too.
+
+    Returns: A hex digest string.
+    """
+    digest = hashlib.sha256(str(test_args).encode('utf-8'))
+    for path in _test_files(test_args):
+        digest.update(path.encode('utf-8'))
+        _update_from_file(digest, path)
+    return digest.hexdigest()
+
+
+def module_digest(module, tests_digest):
+    """Get the digest of `module` for an incremental session.
+
+    This covers the source of `module` and the test suite, as given by
+    `tests_digest` (see `test_suite_digest()`), so that a module's results are
+    discarded if either of them changes.
+
+    Returns: A hex digest string.
+    """
+    digest = hashlib.sha256(tests_digest.encode('utf-8'))
+    _update_from_file(digest, inspect.getsourcefile(module))
+    return digest.hexdigest()
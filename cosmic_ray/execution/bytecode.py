@@ -0,0 +1,30 @@
+"Implementation of the bytecode execution engine."
+
+from .local_parallel import ParallelLocalExecutionEngine
+from ..worker import worker_process
+
+
+class BytecodeExecutionEngine(ParallelLocalExecutionEngine):
+    """Execution engine that makes mutants by patching bytecode.
+
+    This runs jobs just like the local-parallel engine, except that each
+    worker makes its mutant by patching the mutated module's compiled code
+    (loaded from its cached `.pyc` file) rather than by mutating, unparsing
+    and recompiling its AST. This works for mutations which replace a
+    comparison, binary or unary operator, or a numeric or boolean constant.
+    Any other mutant, or one which can't be made by patching bytecode, is
+    made the usual way. See `cosmic_ray.bytecode` for details.
+
+    For example:
+
+        execution-engine:
+          name: bytecode
+          num-workers: 8
+
+    The mutation sites must have been recorded with their source positions,
+    as `cosmic-ray init` does on Python 3.8 and later. Patching bytecode needs
+    Python 3.11 or later; on earlier versions every mutant is made the usual
+    way.
+    """
+    def run_job(self, work_item, timeout, config):
+        return worker_process(work_item, timeout, config, bytecode=True)
@@ -0,0 +1,98 @@
+"Implementation of the fork-server execution engine."
+
+import logging
+
+from .execution_engine import ExecutionEngine
+from .job_server import JobServer
+from ..config import get_operator_set
+from ..plugins import operator_names, operator_path, test_runner_path
+from ..testing.test_runner import TestOutcome
+from ..work_item import WorkItem
+from ..worker import WorkerOutcome
+
+log = logging.getLogger()
+
+
+def _server_setup(config):
+    "Get the setup of a `cosmic_ray.fork_server` for `config`."
+    setup = {
+        'config': config,
+        'test_runner': test_runner_path(config['test-runner']['name']),
+    }
+    if config['execution-engine'].get('schemata', False):
+        # Only the operators which `init` made work items for.
+        setup['operators'] = {
+            name: operator_path(name)
+            for name in operator_names(get_operator_set(config))
+        }
+    return setup
+
+
+def _fork_server(config):
+    "Start a `cosmic_ray.fork_server` for `config`."
+    return JobServer('cosmic_ray.fork_server', _server_setup(config))
+
+
+class ForkServerExecutionEngine(ExecutionEngine):
+    """Execution engine that runs jobs in forks of a warmed-up server process.
+
+    Rather than starting a new `cosmic-ray worker` process for each job, this
+    starts a single `cosmic_ray.fork_server` process which imports the test
+    runner, the test suite and its dependencies once, and then forks a child
+    for each job. This removes most of the per-job start-up cost, which can
+    easily dominate the runtime of fast test suites. See
+    `cosmic_ray.fork_server` for details, including its configuration:
+
+        execution-engine:
+          name: fork-server
+          preload:
+            - django
+            - numpy
+          schemata: true
+
+    With `schemata` set, each module is compiled just once, into a meta-module
+    containing all of its mutants (see `cosmic_ray.schemata`).
+
+    Timeouts are enforced by the server, which kills children which run for
+    too long. If the server itself dies, the job is reported as an exception
+    and a new server is started for the remaining jobs.
+
+    This requires `os.fork()`, so it isn't available on Windows.
+    """
+    def __call__(self, timeout, pending_work_items, config):
+        server = None
+        try:
+            for work_item in pending_work_items:
+                work_item = WorkItem(work_item)
+                command = 'cosmic-ray worker {module} {operator} ' \
+                          '{occurrence}'.format(**work_item)
+                log.info('executing: %s', command)
+
+                if server is None:
+                    server = _fork_server(config)
+
+                try:
+                    result = server.run({
+                        'work_item': work_item,
+                        'operator': operator_path(work_item.operator),
+                        'timeout': work_item.timeout or timeout,
+                    })
+                except EOFError as exc:
+                    server.close()
+                    server = None
+                    result = WorkItem(
+                        worker_outcome=WorkerOutcome.EXCEPTION,
+                        test_outcome=TestOutcome.INCOMPETENT,
+                        data=[str(exc)])
+
+                work_item.update({
+                    k: v
+                    for k, v
+                    in result.items()
+                    if v is not None
+                })
+                work_item.command_line = command
+                yield work_item
+        finally:
+            if server is not None:
+                server.close()
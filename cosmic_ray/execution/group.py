@@ -0,0 +1,255 @@
+"Implementation of the group execution engine."
+
+import ast
+import logging
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .local_parallel import ParallelLocalExecutionEngine
+from ..reporting import is_killed
+from ..testing.test_runner import TestOutcome
+from ..worker import WorkerOutcome, group_worker_process, worker_process
+
+log = logging.getLogger()
+
+# The largest kill rate for which testing mutants in groups can pay off. Above
+# this, a group of two is expected to need more test runs than its mutants
+# would need on their own.
+_MAX_GROUP_KILL_RATE = 1 - 3 ** -(1 / 3)
+
+
+def group_size(kill_rate, max_size):
+    """The best number of mutants to test together at a given kill rate.
+
+    If each mutant in a group of size K is killed with probability `p`, the
+    group survives with probability (1 - p)**K, in which case one test run
+    does for all K mutants. Otherwise it has to be split up. Counting just one
+    further run per mutant in that case (as in Dorfman's classic scheme), the
+    expected number of runs per mutant is 1/K + 1 - (1 - p)**K, and this
+    returns the K which minimizes that.
+
+    Args:
+      kill_rate: The (estimated) probability `p` that a mutant is killed.
+      max_size: The largest group size to consider.
+
+    Returns: The group size, between 1 and `max_size`.
+    """
+    if kill_rate >= _MAX_GROUP_KILL_RATE:
+        return 1
+
+    def runs_per_mutant(size):
+        "The expected number of test runs per mutant in groups of `size`."
+        if size == 1:
+            return 1
+        return 1 / size + 1 - (1 - kill_rate) ** size
+
+    return min(range(1, max(max_size, 1) + 1), key=runs_per_mutant)
+
+
+def _source_file(module_name, local_imports):
+    "Find the source file of `module_name` without importing anything."
+    parts = module_name.split('.')
+    directories = ([os.curdir] if local_imports else []) + sys.path
+    for directory in directories:
+        base = os.path.join(directory or os.curdir, *parts)
+        for candidate in (base + '.py', os.path.join(base, '__init__.py')):
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+
+def _function_spans(module_name, local_imports):
+    """Get the `(first line, last line)` spans of the functions in a module.
+
+    Returns: A list of spans, or an empty list if the module's source can't
+        be found or parsed.
+    """
+    source_file = _source_file(module_name, local_imports)
+    if source_file is None:
+        return []
+    try:
+        with open(source_file, 'rb') as handle:
+            module_ast = ast.parse(handle.read(), source_file)
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    return [
+        (node.lineno, getattr(node, 'end_lineno', None) or node.lineno)
+        for node in ast.walk(module_ast)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+
+
+class _Grouper:
+    """Divides a sequence of work items into groups whose mutants are in
+    different functions of the same module.
+
+    Mutants which aren't in any function, e.g. in module-level code, and
+    mutants in a lane of their own (see `WorkItem.lane`), which may run
+    until they time out, are always on their own. To find work items for a
+    group, the grouper looks up to `lookahead` work items ahead; the others
+    stay in their original order.
+    """
+
+    def __init__(self, work_items, lookahead, local_imports):
+        self._work_items = iter(work_items)
+        self._lookahead = lookahead
+        self._local_imports = local_imports
+        self._buffer = []
+        self._spans = {}
+
+    def _function(self, work_item):
+        """Get a key for the innermost function containing the mutated code
+        of `work_item`, or `None` if it isn't in a function.
+        """
+        first_line = work_item.line_number
+        if work_item.module is None or first_line is None or \
+                work_item.lane is not None:
+            return None
+        last_line = work_item.end_line_number or first_line
+
+        if work_item.module not in self._spans:
+            self._spans[work_item.module] = _function_spans(
+                work_item.module, self._local_imports)
+
+        containing = [
+            span for span in self._spans[work_item.module]
+            if span[0] <= first_line and last_line <= span[1]]
+        if not containing:
+            return None
+        return work_item.module, max(containing)
+
+    def _fill(self):
+        "Read another work item into the buffer, if there is one."
+        for work_item in self._work_items:
+            self._buffer.append(work_item)
+            return True
+        return False
+
+    def next_group(self, size):
+        """Get the next group of at most `size` work items.
+
+        Returns: A list of work items, or `None` if there are none left.
+        """
+        if not self._buffer and not self._fill():
+            return None
+
+        seed = self._buffer.pop(0)
+        group = [seed]
+        function = self._function(seed)
+        if function is None:
+            return group
+
+        functions = {function}
+        index = 0
+        while len(group) < size:
+            if index == len(self._buffer):
+                if len(self._buffer) >= self._lookahead or not self._fill():
+                    break
+            candidate = self._function(self._buffer[index])
+            if candidate is not None and candidate[0] == seed.module and \
+                    candidate not in functions:
+                group.append(self._buffer.pop(index))
+                functions.add(candidate)
+            else:
+                index += 1
+
+        return group
+
+
+class GroupExecutionEngine(ParallelLocalExecutionEngine):
+    """Execution engine that tests several mutants at once.
+
+    A test of one function rarely depends on another function, so this engine
+    activates several mutants, each in a different function of the same
+    module, in a single worker. If
+    the tests pass, all of them survived. If not, the group is split in half
+    and each half is tested in the same way, until the killed mutants have
+    been tested on their own. A mutant which isn't in a function is always
+    tested on its own.
+
+    The size of the groups adapts to the kill rate seen so far (see
+    `group_size()`): groups only pay off if most mutants survive, so while
+    most of them are killed each mutant is tested on its own, as with the
+    local-parallel engine. The largest group size is set by `max-group-size`
+    (8 by default), and `num-workers` works as for the local-parallel engine.
+    For example:
+
+        execution-engine:
+          name: group
+          num-workers: 8
+          max-group-size: 16
+
+    Activating mutants together assumes that they don't interact. If two
+    mutants mask each other, or one only changes behaviour which the other
+    already broke, a killable mutant may be reported as surviving.
+    """
+
+    # The number of pending work items which are looked through for others
+    # to make up a group.
+    lookahead = 256
+
+    def _run_group(self, group, timeout, config):
+        """Test the mutants of `group`, splitting it up as needed.
+
+        This is called in a separate thread for each group.
+
+        Returns: A tuple `(results, runs)` of the results for the work items
+            and the number of test runs they took.
+        """
+        if len(group) == 1:
+            return [worker_process(group[0], timeout, config)], 1
+
+        results = group_worker_process(group, timeout, config)
+        if all(result.worker_outcome == WorkerOutcome.NORMAL and
+               result.test_outcome == TestOutcome.SURVIVED
+               for result in results):
+            return results, 1
+
+        half = len(group) // 2
+        first, first_runs = self._run_group(group[:half], timeout, config)
+        second, second_runs = self._run_group(group[half:], timeout, config)
+        return first + second, 1 + first_runs + second_runs
+
+    def __call__(self, timeout, pending_work_items, config):
+        engine_config = config['execution-engine']
+        num_workers = engine_config.get('num-workers')
+        num_workers = int(num_workers or os.cpu_count() or 1)
+        max_size = int(engine_config.get('max-group-size') or 8)
+
+        grouper = _Grouper(pending_work_items, self.lookahead,
+                           config.get('local-imports', True))
+
+        # The number of completed and killed mutants, starting from an even
+        # prior so that the first mutants are tested on their own.
+        completed = 2
+        kills = 1
+        runs = 0
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            def submit_next():
+                "Submit the next group, returning its future or None."
+                group = grouper.next_group(
+                    group_size(kills / completed, max_size))
+                if group is None:
+                    return None
+                return executor.submit(self._run_group, group, timeout, config)
+
+            running = {submit_next() for _ in range(num_workers)}
+            running.discard(None)
+
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results, group_runs = future.result()
+                    runs += group_runs
+                    completed += len(results)
+                    kills += sum(1 for result in results if is_killed(result))
+
+                    next_future = submit_next()
+                    if next_future is not None:
+                        running.add(next_future)
+                    yield from results
+
+        log.info('Tested %s mutants with %s test runs', completed - 2, runs)
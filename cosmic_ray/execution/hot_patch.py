@@ -0,0 +1,31 @@
+"Implementation of the hot-patch execution engine."
+
+from .execution_engine import ExecutionEngine
+from .job_server import ServerSlot
+
+
+class HotPatchExecutionEngine(ExecutionEngine):
+    """Execution engine that runs mutants by hot-patching functions in a
+    single long-lived process.
+
+    Rather than importing the mutated module afresh for each mutant, this runs
+    a `cosmic_ray.patch_server` process which keeps the code under test and the
+    tests imported. For mutations inside functions, the server compiles just
+    the mutated function and swaps its code into the live function object for
+    the duration of the test run. See `cosmic_ray.patch_server` for details.
+
+    Mutations which can't be hot-patched, e.g. of module-level code, are run
+    in a separate worker process, just as with the local engine.
+
+    If a job times out, the server is killed and a new one is started for the
+    remaining jobs. Since jobs share a process, a mutant which corrupts shared
+    state can affect the results of later jobs, so this engine is best suited
+    to quick, interactive runs.
+    """
+    def __call__(self, timeout, pending_work_items, config):
+        slot = ServerSlot('cosmic_ray.patch_server', config)
+        try:
+            for work_item in pending_work_items:
+                yield slot.run(work_item, timeout)
+        finally:
+            slot.close()
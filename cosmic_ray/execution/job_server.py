@@ -0,0 +1,281 @@
+"""Job servers: long-lived processes which run many jobs.
+
+Engines like fork-server and hot-patch avoid the cost of starting a fresh
+worker process for every mutant by sending jobs to a long-lived server
+process instead.
+
+`JobServer`, `ServerSlot` and `run_in_slots()` are the engines' side of the
+protocol. `start_server()`, `receive_jobs()`, `decode_job()` and `reply()` are
+the servers' side, which the server modules such as `cosmic_ray.fork_server`
+share.
+"""
+
+import json
+import logging
+import os
+import queue
+import select
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from ..plugins import load_object, operator_path, test_runner_path
+from ..testing.test_runner import TestOutcome
+from ..work_item import WorkItem
+from ..worker import WorkerOutcome, worker_process
+
+log = logging.getLogger()
+
+
+class JobServer:
+    """A running job server process, such as `cosmic_ray.fork_server`.
+
+    Job servers speak a JSON-lines protocol over their stdin and stdout. The
+    first line sent to a server is its setup, to which it replies with
+    `{"ready": true}`. After that, each line sent is a job and each line
+    received is the job's result.
+    """
+
+    def __init__(self, module, setup):
+        """
+        Args:
+          module: The name of the server's module, which is run with
+            `python -m`.
+          setup: The setup message for the server.
+
+        Raises:
+          RuntimeError: If the server doesn't start.
+        """
+        self._proc = subprocess.Popen(
+            [sys.executable, '-m', module],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True)
+        self._send(setup)
+        try:
+            ready = self._receive()
+        except EOFError:
+            ready = None
+        if ready != {'ready': True}:
+            self.close()
+            raise RuntimeError('{} failed to start'.format(module))
+
+    def _send(self, message):
+        self._proc.stdin.write(json.dumps(message) + '\n')
+        self._proc.stdin.flush()
+
+    def _receive(self, timeout=None):
+        if timeout is not None and not select.select(
+                [self._proc.stdout], [], [], timeout)[0]:
+            raise TimeoutError(
+                'No result after {} seconds'.format(timeout))
+
+        line = self._proc.stdout.readline()
+        if not line:
+            raise EOFError('Server exited with status {}'.format(
+                self._proc.wait()))
+        return json.loads(line)
+
+    def run(self, job, timeout=None):
+        """Run `job`, waiting at most `timeout` seconds for its result.
+
+        Returns: The decoded result of the job.
+
+        Raises:
+          EOFError: If the server died.
+          TimeoutError: If there's no result in time. The server is then in
+            an unknown state and should be closed.
+        """
+        self._send(job)
+        return self._receive(timeout)
+
+    def close(self):
+        """Tell the server to exit and wait for it to do so.
+
+        A server which is still busy (e.g. after a `TimeoutError`) is killed.
+        """
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+class ServerSlot:
+    """Runs jobs one at a time on a server, which is (re)started as needed.
+
+    This is for servers, like `cosmic_ray.patch_server`, which run the tests
+    in their own process. Their setup is `{config, test_runner}`, each job is
+    `{work_item, operator}`, and a result of `null` means that the server
+    can't run the job, which is then run by `worker_process()` instead.
+    Timeouts are enforced by killing the server.
+    """
+
+    def __init__(self, module, config):
+        """
+        Args:
+          module: The name of the server's module.
+          config: The session configuration.
+        """
+        self._module = module
+        self._config = config
+        self._server = None
+
+    def run(self, work_item, timeout):
+        """Run the job for `work_item`.
+
+        Returns: The updated `WorkItem`.
+        """
+        work_item = WorkItem(work_item)
+        job_timeout = work_item.timeout or timeout
+
+        if self._server is None:
+            self._server = JobServer(self._module, {
+                'config': self._config,
+                'test_runner': test_runner_path(
+                    self._config['test-runner']['name']),
+            })
+
+        command = 'cosmic-ray worker {module} {operator} ' \
+                  '{occurrence}'.format(**work_item)
+        log.info('executing in %s: %s', self._module, command)
+
+        try:
+            result = self._server.run({
+                'work_item': work_item,
+                'operator': operator_path(work_item.operator),
+            }, job_timeout)
+        except TimeoutError:
+            self.close()
+            result = WorkItem(
+                worker_outcome=WorkerOutcome.TIMEOUT,
+                data=job_timeout)
+        except EOFError as exc:
+            self.close()
+            result = WorkItem(
+                worker_outcome=WorkerOutcome.EXCEPTION,
+                test_outcome=TestOutcome.INCOMPETENT,
+                data=[str(exc)])
+
+        if result is None:
+            return worker_process(work_item, timeout, self._config)
+
+        work_item.update({
+            k: v
+            for k, v
+            in result.items()
+            if v is not None
+        })
+        work_item.command_line = command
+        return work_item
+
+    def close(self):
+        "Stop the server, if it's running."
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+
+def run_in_slots(module, timeout, pending_work_items, config):
+    """Run jobs on up to `num-workers` servers at once.
+
+    Each slot has its own `ServerSlot` for servers running `module`. The
+    number of slots is the `num-workers` of the `execution-engine` section of
+    `config`, by default the number of CPUs.
+
+    Returns: A generator of the completed `WorkItem`s, in the order in which
+        they complete.
+    """
+    num_workers = config['execution-engine'].get('num-workers')
+    num_workers = int(num_workers or os.cpu_count() or 1)
+
+    slots = queue.Queue()
+    for _ in range(num_workers):
+        slots.put(ServerSlot(module, config))
+
+    def run(work_item):
+        "Run `work_item` in a free slot."
+        slot = slots.get()
+        try:
+            return slot.run(work_item, timeout)
+        finally:
+            slots.put(slot)
+
+    pending_work_items = iter(pending_work_items)
+
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            def submit_next():
+                "Submit the next pending item, returning its future."
+                for work_item in pending_work_items:
+                    return executor.submit(run, work_item)
+                return None
+
+            running = {submit_next() for _ in range(num_workers)}
+            running.discard(None)
+
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    next_future = submit_next()
+                    if next_future is not None:
+                        running.add(next_future)
+                    yield future.result()
+    finally:
+        while not slots.empty():
+            slots.get().close()
+
+
+def start_server():
+    """Start the server's side of the protocol.
+
+    This keeps stdout, the protocol stream, to the server, and sends anything
+    else written to it (e.g. by the tests) to stderr. It then reads the setup
+    and, unless the config's `local-imports` is false, puts the current
+    directory on `sys.path`.
+
+    Returns: A tuple `(protocol, setup)` of the protocol stream, for
+        `reply()`, and the setup message.
+    """
+    protocol = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+
+    setup = json.loads(sys.stdin.readline())
+    if setup['config'].get('local-imports', True):
+        sys.path.insert(0, '')
+    return protocol, setup
+
+
+def make_test_runner(setup):
+    "Make the test runner described by the server's `setup`."
+    return load_object(setup['test_runner'])(
+        setup['config']['test-runner']['args'])
+
+
+def receive_jobs():
+    "Generate the jobs sent to the server until its stdin is closed."
+    for line in sys.stdin:
+        yield json.loads(line)
+
+
+def decode_job(job, test_runner):
+    """Get what's needed to run `job`, and set `test_runner` up to run the
+    job's tests.
+
+    Returns: A tuple `(work_item, operator_class, occurrence)`.
+    """
+    work_item = WorkItem(job['work_item'])
+    test_runner.tests = work_item.covering_tests
+    test_runner.priority_tests = work_item.priority_tests
+    return (work_item, load_object(job['operator']),
+            int(work_item.occurrence))
+
+
+def reply(protocol, message):
+    "Send `message`, e.g. the result of a job, on the `protocol` stream."
+    protocol.write(json.dumps(message) + '\n')
+    protocol.flush()
@@ -0,0 +1,87 @@
+"Implementation of the parallel local execution engine."
+
+import collections
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .execution_engine import ExecutionEngine
+from ..worker import worker_process
+
+
+class ParallelLocalExecutionEngine(ExecutionEngine):
+    """Execution engine that runs several jobs at once on the local machine.
+
+    Each job is still run in its own `cosmic-ray worker` subprocess via
+    `worker_process()`, so timeouts are handled exactly as for the `local`
+    engine. Up to `num-workers` of these subprocesses run at once; this
+    defaults to the number of CPUs on the machine. For example:
+
+        execution-engine:
+          name: local-parallel
+          num-workers: 8
+
+    Work items in a lane of their own (see `WorkItem.lane`), e.g. mutants
+    which may make a loop run forever, run on `lane-workers` further workers
+    (one by default), so that they don't hold up the rest. Once the main lane
+    is done, its workers help with the other lanes too.
+
+    Results are yielded in the order in which jobs complete, not the order in
+    which they were submitted.
+    """
+    def run_job(self, work_item, timeout, config):
+        """Run the job for `work_item`, returning the updated `WorkItem`.
+
+        This is called in a separate thread for each job.
+        """
+        return worker_process(work_item, timeout, config)
+
+    def __call__(self, timeout, pending_work_items, config):
+        engine_config = config['execution-engine']
+        num_workers = engine_config.get('num-workers')
+        num_workers = int(num_workers or os.cpu_count() or 1)
+        lane_workers = int(engine_config.get('lane-workers') or 1)
+
+        pending_work_items = iter(pending_work_items)
+        # The work items in other lanes which are waiting for a worker.
+        lane_backlog = collections.deque()
+
+        def next_main():
+            "Get the next work item for a main worker, or None."
+            for work_item in pending_work_items:
+                if work_item.lane is None:
+                    return work_item
+                lane_backlog.append(work_item)
+            if lane_backlog:
+                return lane_backlog.popleft()
+            return None
+
+        with ThreadPoolExecutor(
+                max_workers=num_workers + lane_workers) as executor:
+            main_running = set()
+            lane_running = set()
+
+            def fill():
+                "Submit pending items until every worker is busy."
+                # We only keep as many jobs in flight as there are workers
+                # so that we don't pull the entire pending sequence into
+                # memory up front.
+                while len(main_running) < num_workers:
+                    work_item = next_main()
+                    if work_item is None:
+                        break
+                    main_running.add(executor.submit(
+                        self.run_job, work_item, timeout, config))
+                while len(lane_running) < lane_workers and lane_backlog:
+                    lane_running.add(executor.submit(
+                        self.run_job, lane_backlog.popleft(), timeout,
+                        config))
+
+            fill()
+            while main_running or lane_running:
+                done, _ = wait(main_running | lane_running,
+                               return_when=FIRST_COMPLETED)
+                main_running -= done
+                lane_running -= done
+                fill()
+                for future in done:
+                    yield future.result()
@@ -0,0 +1,34 @@
+"Implementation of the reload execution engine."
+
+from .execution_engine import ExecutionEngine
+from .job_server import run_in_slots
+
+
+class ReloadExecutionEngine(ExecutionEngine):
+    """Execution engine that runs mutants in long-lived processes which only
+    re-import the modules a mutant affects.
+
+    Each of up to `num-workers` slots (by default, one per CPU) runs a
+    `cosmic_ray.reload_server` process. The server keeps everything imported
+    between jobs and tracks which modules import which. For each mutant it
+    re-imports only the mutated module and the modules which depend on it. See
+    `cosmic_ray.reload_server` for details.
+
+    Modules which hold on to other modules' objects in ways the server can't
+    track can be listed as `stateful-modules`. Mutants which would require
+    re-importing any of these are run in a separate worker process instead,
+    just as with the local engine. For example:
+
+        execution-engine:
+          name: reload
+          num-workers: 4
+          stateful-modules:
+            - myproject.registry
+
+    If a job times out, its server is killed and a new one is started for that
+    slot's remaining jobs. Results are yielded in the order in which jobs
+    complete.
+    """
+    def __call__(self, timeout, pending_work_items, config):
+        return run_in_slots('cosmic_ray.reload_server',
+                            timeout, pending_work_items, config)
@@ -0,0 +1,39 @@
+"Implementation of the sub-interpreter execution engine."
+
+import logging
+
+from .execution_engine import ExecutionEngine
+from .job_server import run_in_slots
+from .local_parallel import ParallelLocalExecutionEngine
+from ..subinterpreters import get_runner
+
+log = logging.getLogger()
+
+
+class SubinterpreterExecutionEngine(ExecutionEngine):
+    """Execution engine that runs each job in a fresh sub-interpreter.
+
+    Each of up to `num-workers` slots (by default, one per CPU) runs a
+    `cosmic_ray.subinterpreter_server` host process, which runs each job in a
+    new sub-interpreter with its own GIL. Each job gets its own `sys.modules`,
+    as it would with a worker process, but without starting a process. See
+    `cosmic_ray.subinterpreter_server` for details.
+
+    This needs Python 3.12 or later. On earlier versions, this engine runs
+    every job in a worker process, like the local-parallel engine. It does the
+    same for jobs which need an extension module which can't be loaded in a
+    sub-interpreter.
+
+    If a job times out, its host process is killed and a new one is started
+    for that slot's remaining jobs. Results are yielded in the order in which
+    jobs complete.
+    """
+    def __call__(self, timeout, pending_work_items, config):
+        if get_runner() is None:
+            log.warning('Sub-interpreters are not supported by this version '
+                        'of Python. Running jobs in worker processes.')
+            return ParallelLocalExecutionEngine()(
+                timeout, pending_work_items, config)
+
+        return run_in_slots('cosmic_ray.subinterpreter_server',
+                            timeout, pending_work_items, config)
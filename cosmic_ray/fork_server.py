@@ -0,0 +1,240 @@
+"""A server which runs worker jobs in forked copies of a warmed-up process.
+
+This is what the `fork-server` execution engine launches:
+
+    python -m cosmic_ray.fork_server
+
+Starting a fresh worker process for every mutant means paying, for every
+mutant, for interpreter start-up and for importing the test runner, the test
+suite and everything it depends on. The fork server instead pays for these
+once. It imports the test runner and warms up by having it discover (but not
+run) the tests, which imports the test modules and their dependencies. It then
+forgets the project's own modules - the code under test and the test modules
+which refer to it - so that only the expensive, unchanging third-party imports
+remain. Each job runs in an `os.fork()` child of this warmed-up process, which
+imports the mutated module and the tests afresh and runs the tests as
+`worker.worker()` normally would.
+
+The server speaks a JSON-lines protocol over stdin and stdout. The first line
+it reads is an object with these keys:
+
+  config: The session configuration.
+  test_runner: The import path of the test-runner class, as returned by
+    `plugins.test_runner_path()`.
+  operators: Only when using mutant schemata (see below), a dict mapping the
+    name of every operator plugin to the import path of its class.
+
+Once it has warmed up, the server writes `{"ready": true}`. Then each line it
+reads is a job: an object with the keys `work_item`, `operator` (as for
+`worker_main`) and `timeout`, the number of seconds after which the job's
+child is killed. For each job the server writes a line containing the
+resulting `WorkItem`. The server exits when stdin is closed.
+
+Configuration for the server comes from the "execution-engine" section of the
+config:
+
+  preload: A list of extra module names to import before forking.
+  warm-up: Whether to discover the tests before forking (default true).
+  schemata: Whether to use mutant schemata (default false).
+
+With mutant schemata (see `cosmic_ray.schemata`), the server builds and
+compiles the meta-module for each module the first time it gets a job for it.
+Children then just activate their mutant and execute the already-compiled
+meta-module, rather than each parsing, mutating, unparsing and compiling the
+module themselves. Mutants which aren't in the meta-module are run as usual.
+
+This only works on platforms with `os.fork()`.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import select
+import signal
+import sys
+import time
+
+from .execution.job_server import (decode_job, make_test_runner,
+                                   receive_jobs, reply, start_server)
+from .importing import preserve_modules
+from .plugins import load_object
+from .schemata import activate, compile_meta_module, mutant_key
+from .testing.test_runner import TestOutcome
+from .util import redirect_stdout
+from .work_item import WorkItem
+from .worker import WorkerOutcome, meta_module_worker, worker
+
+
+def _is_project_module(module, module_under_test, project_dir):
+    """Whether `module` is part of the code under test or lives in the
+    project directory (e.g. is a test module).
+    """
+    name = getattr(module, '__name__', '')
+    if name == module_under_test or \
+            name.startswith(module_under_test + '.'):
+        return True
+
+    filename = getattr(module, '__file__', None)
+    if not filename:
+        return False
+    return os.path.realpath(filename).startswith(project_dir + os.sep)
+
+
+def _warm_up(config, test_runner):
+    """Import the modules which jobs will need and which don't change between
+    them, and then forget the project's own modules.
+    """
+    engine_config = config['execution-engine']
+    already_imported = set(sys.modules)
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for name in engine_config.get('preload', None) or ():
+            importlib.import_module(name)
+
+        if engine_config.get('warm-up', True):
+            test_runner.tests = []
+            test_runner()
+            test_runner.tests = None
+
+    module_under_test = config['module']
+    project_dir = os.path.realpath(os.getcwd())
+    for name in set(sys.modules) - already_imported:
+        if _is_project_module(sys.modules[name], module_under_test,
+                              project_dir):
+            del sys.modules[name]
+
+
+class _MetaModules:
+    """The compiled meta-modules of the modules under test, built on demand.
+    """
+
+    def __init__(self, operator_paths):
+        self._operators = {
+            name: load_object(path)
+            for name, path in operator_paths.items()
+        }
+        self._meta_modules = {}
+
+    def get(self, module_name):
+        """Get the `(code, keys)` of the meta-module for `module_name`, as
+        returned by `schemata.compile_meta_module()`.
+        """
+        try:
+            return self._meta_modules[module_name]
+        except KeyError:
+            pass
+
+        try:
+            # Finding the module may import its parent packages, which must
+            # not stay imported for the children.
+            with preserve_modules():
+                source_file = importlib.util.find_spec(module_name).origin
+            meta_module = compile_meta_module(source_file, self._operators)
+        except Exception:  # noqa # pylint: disable=broad-except
+            # The children will run into (and report) the same problem.
+            meta_module = None, frozenset()
+        self._meta_modules[module_name] = meta_module
+        return meta_module
+
+
+def _run_child(job, test_runner, meta_module, result_fd):
+    """Run `job` in a forked child, writing the result to `result_fd`.
+
+    `meta_module` is the `(code, keys)` of the meta-module of the job's module,
+    or `None` if mutant schemata aren't being used.
+    """
+    try:
+        with open(os.devnull, 'w') as devnull:
+            # Nothing the tests print may reach the server's protocol stream.
+            os.dup2(devnull.fileno(), 1)
+            work_item, operator_class, occurrence = decode_job(
+                job, test_runner)
+
+            code, keys = meta_module or (None, ())
+            key = mutant_key(work_item.operator, occurrence)
+            with redirect_stdout(devnull):
+                if key in keys:
+                    activate(key)
+                    result = meta_module_worker(
+                        work_item.module, code, operator_class, occurrence,
+                        test_runner)
+                else:
+                    result = worker(
+                        work_item.module, operator_class, occurrence,
+                        test_runner)
+
+        with os.fdopen(result_fd, 'w') as handle:
+            handle.write(json.dumps(result))
+    finally:
+        os._exit(0)  # pylint: disable=protected-access
+
+
+def _read_result(pid, result_fd, timeout):
+    """Read the result of the child `pid` from `result_fd`, killing the child
+    if it doesn't finish within `timeout` seconds.
+
+    Returns: A `WorkItem`.
+    """
+    deadline = time.monotonic() + timeout
+    chunks = []
+    with os.fdopen(result_fd, 'rb') as handle:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([handle], [], [],
+                                                   remaining)[0]:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                return WorkItem(worker_outcome=WorkerOutcome.TIMEOUT,
+                                data=timeout)
+            chunk = os.read(handle.fileno(), 1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    _, status = os.waitpid(pid, 0)
+    try:
+        return WorkItem(json.loads(b''.join(chunks).decode('utf-8')))
+    except ValueError:
+        return WorkItem(
+            worker_outcome=WorkerOutcome.EXCEPTION,
+            test_outcome=TestOutcome.INCOMPETENT,
+            data=['Worker exited with status {} without a result'.format(
+                status)])
+
+
+def _run_job(job, test_runner, meta_module):
+    "Run `job` in a forked child, returning the resulting `WorkItem`."
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        _run_child(job, test_runner, meta_module, write_fd)
+    os.close(write_fd)
+    return _read_result(pid, read_fd, float(job['timeout']))
+
+
+def main():
+    "Serve jobs from stdin until it's closed."
+    # Anything else which writes to stdout (e.g. the warm-up) goes to stderr.
+    protocol, setup = start_server()
+    test_runner = make_test_runner(setup)
+    _warm_up(setup['config'], test_runner)
+
+    meta_modules = None
+    if 'operators' in setup:
+        meta_modules = _MetaModules(setup['operators'])
+
+    reply(protocol, {'ready': True})
+
+    for job in receive_jobs():
+        meta_module = None
+        if meta_modules is not None:
+            meta_module = meta_modules.get(job['work_item']['module'])
+        reply(protocol, _run_job(job, test_runner, meta_module))
+
+    return os.EX_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,6 @@
 
 import contextlib
 import sys
-from importlib.abc import MetaPathFinder
 from importlib.machinery import ModuleSpec
 
 
@@ -33,7 +32,34 @@ class ASTLoader:
         exec(compiled, mod.__dict__)  # pylint:disable=exec-used
 
 
-class ASTFinder(MetaPathFinder):
+class CodeLoader:
+
+    """
+    An `importlib.abc.Loader` which loads a compiled code object for a
+    particular name.
+
+    This is like `ASTLoader` except that the code has already been compiled,
+    so loading a module many times (e.g. once per mutant, see
+    `cosmic_ray.schemata`) doesn't mean compiling it many times.
+    """
+
+    def __init__(self, code):
+        self._code = code
+
+    def create_module(self,  # pylint: disable=no-self-use
+                      spec):  # pylint: disable=unused-argument
+        "Default module creation semantics."
+        return None
+
+    def exec_module(self, mod):
+        "Execute the code into `mod`."
+        exec(self._code, mod.__dict__)  # pylint:disable=exec-used
+
+
+# Note that we don't derive from `importlib.abc.MetaPathFinder` here. The
+# finder protocol only requires `find_spec()`, and importing `importlib.abc` is
+# surprisingly expensive for something every worker pays for.
+class ASTFinder:
 
     """
     An `importlib.ast.MetaPathFinder` that associates a module name
@@ -50,12 +76,29 @@ class ASTFinder(MetaPathFinder):
         self._fullname = fullname
         self._ast = ast
 
+    def _loader(self):
+        return ASTLoader(self._ast, self._fullname)
+
     def find_spec(self, fullname,
                   path, target=None):  # pylint:disable=unused-argument
         "Find modules matching `self._fullname`."
         if fullname == self._fullname:
-            return ModuleSpec(fullname,
-                              ASTLoader(self._ast, fullname))
+            return ModuleSpec(fullname, self._loader())
+
+
+class CodeFinder(ASTFinder):
+
+    """
+    An `ASTFinder` which associates a module name with a compiled code object
+    rather than an AST.
+    """
+
+    def __init__(self, fullname, code):  # pylint: disable=super-init-not-called
+        self._fullname = fullname
+        self._code = code
+
+    def _loader(self):
+        return CodeLoader(self._code)
 
 
 @contextlib.contextmanager
@@ -91,3 +134,15 @@ def using_ast(module_name, module_ast):
         yield finder
     finally:
         sys.meta_path.remove(finder)
+
+
+@contextlib.contextmanager
+def using_code(module_name, code):
+    """Like `using_ast()`, but for a compiled code object.
+    """
+    finder = CodeFinder(module_name, code)
+    sys.meta_path = [finder] + sys.meta_path
+    try:
+        yield finder
+    finally:
+        sys.meta_path.remove(finder)
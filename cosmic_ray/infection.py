@@ -0,0 +1,313 @@
+"""Find mutants which never change the value of the expression they mutate.
+
+A test can only kill a mutant if running the mutated code *infects* the
+program's state, i.e. if the mutated expression evaluates to something other
+than the original did. If `x` is never 0 in the tests, `x >= 0` and `x > 0`
+always give the same result, so the `x > 0` mutant survives whatever the tests
+check. When infection tracing is enabled, the baseline run instruments the
+modules under test (as for type profiling, see `cosmic_ray.type_profile`) so
+that each binary, unary and (unchained) comparison operation evaluates every
+replacement a mutation operator could make on the same operands as the
+original, and records which of them ever gave a different value. `init` then
+reports the mutants which never did as surviving, with the `not-infected` test
+outcome, without running them. This is known as *weak mutation* testing.
+
+Only operands of simple built-in types, such as numbers and strings, are
+evaluated again, since that can't have side effects. For comparisons, ranges
+and built-in containers which only hold such values (or other such containers)
+are allowed too, since any other element could run user code when it's
+compared. Replacements which would be too costly to evaluate, e.g. `x ** y` for
+a large `y`, are taken to infect the state, as are all the replacements at a
+site where other operands were seen.
+
+An infection map is a dict mapping source filenames to dicts mapping the
+`(line number, column offset, end line number, end column offset)` of each
+operation which was executed to the set of names of the replacements which
+infected the state there. A replacement is named by the `ast` class of its
+operator, e.g. `'Sub'`, or `'True'` and `'False'` for comparisons replaced by
+a constant and `'delete'` for a unary operation replaced by its operand.
+Operations which weren't executed aren't listed.
+"""
+
+import ast
+import operator
+import os
+
+from .type_profile import (_BINARY_OPERATORS, _UNARY_OPERATORS,
+                           OperationInstrumenter, TypeProfiler)
+
+# The functions which perform the comparison operators.
+_COMPARISON_OPERATORS = {
+    'Eq': operator.eq,
+    'NotEq': operator.ne,
+    'Lt': operator.lt,
+    'LtE': operator.le,
+    'Gt': operator.gt,
+    'GtE': operator.ge,
+    'Is': operator.is_,
+    'IsNot': operator.is_not,
+    'In': lambda left, right: left in right,
+    'NotIn': lambda left, right: left not in right,
+}
+
+# The replacements of each kind of operation, by name, and the functions which
+# evaluate them.
+_REPLACEMENTS = {
+    'binary': {
+        name: function
+        for name, (function, _, _) in _BINARY_OPERATORS.items()
+    },
+    'unary': dict(
+        {name: function
+         for name, (function, _) in _UNARY_OPERATORS.items()},
+        delete=lambda operand: operand),
+    'compare': dict(
+        _COMPARISON_OPERATORS,
+        **{'True': lambda left, right: True,
+           'False': lambda left, right: False}),
+}
+
+# The types of operands which are safe to evaluate replacements on.
+_SAFE_TYPES = frozenset(
+    (int, float, complex, bool, str, bytes, type(None)))
+
+# The types of operands which are safe to compare, or test for membership.
+_SAFE_COMPARISON_TYPES = _SAFE_TYPES | frozenset((range,))
+
+# The types of containers which are safe to compare, or test for membership,
+# if everything in them is.
+_SAFE_CONTAINER_TYPES = frozenset((tuple, list, dict, set, frozenset))
+
+# The largest exponent or shift, or count for repeating a sequence, for which
+# we evaluate a replacement.
+_MAX_EXPONENT = 64
+_MAX_REPEAT = 4096
+
+
+def _is_safe(operand, safe_types, container_types=frozenset()):
+    """Whether `operand` is of one of `safe_types`, or is a container of one of
+    `container_types` which only holds such operands.
+
+    Only the exact types are accepted, so that looking through the containers
+    doesn't run any user code.
+    """
+    pending = [operand]
+    seen = set()
+    while pending:
+        value = pending.pop()
+        if type(value) in safe_types:
+            continue
+        if type(value) not in container_types:
+            return False
+        # Containers may hold themselves.
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if type(value) is dict:  # noqa
+            pending.extend(value.keys())
+            pending.extend(value.values())
+        else:
+            pending.extend(value)
+    return True
+
+
+def _too_costly(name, operands):
+    """Whether the replacement `name` might take too long, or too much memory,
+    to evaluate for `operands`.
+    """
+    if name in ('Pow', 'LShift'):
+        right = operands[1]
+        return not isinstance(right, (int, float)) or \
+            abs(right) > _MAX_EXPONENT
+    if name == 'Mult':
+        left, right = operands
+        if isinstance(left, (str, bytes)):
+            return not isinstance(right, int) or right > _MAX_REPEAT
+        if isinstance(right, (str, bytes)):
+            return not isinstance(left, int) or left > _MAX_REPEAT
+    return False
+
+
+def _outcome(function, operands):
+    """Evaluate `function` on `operands`.
+
+    Returns: A tuple `(True, value)`, or `(False, exception type)` if it
+      raised an exception.
+    """
+    try:
+        return True, function(*operands)
+    except Exception as exc:  # noqa # pylint: disable=broad-except
+        return False, type(exc)
+
+
+def _same(outcome, other):
+    "Whether the results of two `_outcome()` calls are the same."
+    if outcome[0] != other[0]:
+        return False
+    if not outcome[0]:
+        return outcome[1] is other[1]
+    if type(outcome[1]) is not type(other[1]):  # noqa
+        return False
+    if isinstance(outcome[1], (float, complex)):
+        # This tells -0.0 from 0.0, and NaN is the same as NaN.
+        return repr(outcome[1]) == repr(other[1])
+    try:
+        return bool(outcome[1] == other[1])
+    except Exception:  # noqa # pylint: disable=broad-except
+        return False
+
+
+class _InfectionInstrumenter(OperationInstrumenter):
+    """Also replaces comparisons with a single operator with calls to
+    `InfectionTracer.compare()`.
+
+    Chained comparisons are left alone since they only evaluate their later
+    operands if need be.
+    """
+
+    def visit_Compare(self, node):  # pylint: disable=invalid-name
+        "Replace `node` with a call to `InfectionTracer.compare()`."
+        self.generic_visit(node)
+        if len(node.ops) != 1:
+            return node
+        return self._call('compare', node, node.ops[0],
+                          [node.left, node.comparators[0]])
+
+
+class InfectionTracer(TypeProfiler):
+    """Records which replacements of the binary, unary and comparison
+    operators in the source files under `roots` would infect the program's
+    state.
+
+    This is a `TypeProfiler`, so it records the types of operands too.
+
+    After tracing, `infected` maps the site (see `OperationInstrumenter`) of
+    each executed operation to the set of names of the replacements which gave
+    a different result than the original operator at least once.
+    """
+
+    instrumenter = _InfectionInstrumenter
+
+    def __init__(self, roots):
+        super().__init__(roots)
+        self.infected = {}
+
+    def _evaluate(self, site, kind, op_name, operands, safe_types,
+                  container_types=frozenset()):
+        """Apply the operator `op_name` of `kind` to `operands`, recording
+        which of the replacements infect the state. See `_is_safe()` for
+        `safe_types` and `container_types`.
+        """
+        function = _REPLACEMENTS[kind][op_name]
+        try:
+            result = function(*operands)
+        except Exception as exc:  # noqa # pylint: disable=broad-except
+            self._record(site, kind, op_name, operands,
+                         (safe_types, container_types), (False, type(exc)))
+            raise
+        self._record(site, kind, op_name, operands,
+                     (safe_types, container_types), (True, result))
+        return result
+
+    def _record(self, site, kind, op_name, operands, safety, original):
+        """Record which replacements of the operator `op_name` of `kind` give
+        a different outcome than `original` for `operands`. `safety` is the
+        `(safe_types, container_types)` of the operands which it's safe to
+        evaluate the replacements on.
+        """
+        replacements = _REPLACEMENTS[kind]
+        infected = self.infected.setdefault(site, set())
+        # Once every replacement has infected the state, there's nothing more
+        # to find out here.
+        if len(infected) == len(replacements) - 1:
+            return
+
+        safe = all(_is_safe(operand, *safety) for operand in operands)
+        for name, function in replacements.items():
+            if name == op_name or name in infected:
+                continue
+            if not safe or _too_costly(name, operands) or \
+                    not _same(original, _outcome(function, operands)):
+                infected.add(name)
+
+    def binary(self, site, op_name, left, right):
+        "Record the replacements of a binary operator which infect the state."
+        self.types.setdefault(site, set()).add((type(left), type(right)))
+        return self._evaluate(
+            site, 'binary', op_name, (left, right), _SAFE_TYPES)
+
+    def unary(self, site, op_name, operand):
+        "Record the replacements of a unary operator which infect the state."
+        self.types.setdefault(site, set()).add((type(operand),))
+        return self._evaluate(site, 'unary', op_name, (operand,), _SAFE_TYPES)
+
+    def compare(self, site, op_name, left, right):
+        "Record the replacements of a comparison which infect the state."
+        return self._evaluate(
+            site, 'compare', op_name, (left, right), _SAFE_COMPARISON_TYPES,
+            _SAFE_CONTAINER_TYPES)
+
+    def infection_to_json(self):
+        """Get the infection map (see the module docstring) in a
+        JSON-serializable form.
+        """
+        infection = {}
+        for (filename, *span), infected in self.infected.items():
+            infection.setdefault(os.path.realpath(filename), {})[
+                ':'.join(str(position) for position in span)] = sorted(
+                    infected)
+        return infection
+
+
+def infection_from_json(data):
+    """Convert the output of `InfectionTracer.infection_to_json()` into an
+    infection map.
+    """
+    infection = {}
+    for filename, sites in data.items():
+        infection[filename] = {}
+        for site, infected in sites.items():
+            span = tuple(
+                None if position == 'None' else int(position)
+                for position in site.split(':'))
+            infection[filename][span] = set(infected)
+    return infection
+
+
+def replacement_name(node_type, replacement):
+    """Get the name of the replacement a mutant makes of a `BinOp`, `UnaryOp`
+    or `Compare` node, as in an infection map.
+
+    Args:
+      node_type: The type of the mutated node, as in `WorkItem.node_type`.
+      replacement: The source of the mutated node, as in
+        `WorkItem.replacement`.
+
+    Returns: The name, or `None` if it can't be told.
+    """
+    if node_type not in ('BinOp', 'UnaryOp', 'Compare') or not replacement:
+        return None
+    try:
+        node = ast.parse(replacement.strip(), mode='eval').body
+    except SyntaxError:
+        return None
+
+    if node_type == 'Compare':
+        if isinstance(node, ast.Compare) and len(node.ops) == 1:
+            return type(node.ops[0]).__name__
+        # This is an `ast.Constant` or, before Python 3.8, an
+        # `ast.NameConstant`.
+        if isinstance(getattr(node, 'value', None), bool):
+            return str(node.value)
+        return None
+    if node_type == 'BinOp':
+        if isinstance(node, ast.BinOp):
+            return type(node.op).__name__
+        return None
+    # If the operand is itself a unary operation, we can't tell the
+    # replacement of the outer operator from its removal.
+    if isinstance(node, ast.UnaryOp):
+        if isinstance(node.operand, ast.UnaryOp):
+            return None
+        return type(node.op).__name__
+    return 'delete'
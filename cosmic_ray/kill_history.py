@@ -0,0 +1,90 @@
+"""Track which tests killed which mutants, to run likely killers first.
+
+Test runners generally stop at the first failing test, so the sooner a test
+which kills a mutant runs, the sooner the mutant's work item finishes. Tests
+which killed other mutants of the same code are much more likely to kill a
+mutant than an arbitrary test, so `KillHistory` collects the `killed_by` of
+completed work items and suggests `priority_tests` for pending ones.
+"""
+
+from collections import Counter
+
+from .plugins import operator_name
+
+
+class KillHistory:
+    """The tests which killed the mutants in a session.
+
+    Tests are suggested for a work item in this order:
+
+      1. Tests which killed mutants of the same line with the same operator.
+         Operators are compared by plugin name (see `operator_name()`), since
+         completed work items name them by class.
+      2. Tests which killed other mutants of the same line.
+      3. Tests which killed mutants elsewhere in the same module, most
+         prolific killers first.
+    """
+
+    # The maximum number of priority tests to suggest for a work item.
+    max_tests = 20
+
+    # The `WorkItem` fields which `record()` and `priority_tests()` use.
+    fields = ('module', 'operator', 'line_number', 'killed_by')
+
+    def __init__(self, work_items=()):
+        """
+        Args:
+          work_items: An iterable of `WorkItem`s to record, e.g. those already
+            completed in a session.
+        """
+        # module -> line -> [(operator, test_id)]
+        self._by_line = {}
+        # module -> Counter(test_id)
+        self._by_module = {}
+
+        for work_item in work_items:
+            self.record(work_item)
+
+    def record(self, work_item):
+        """Record the test which killed `work_item`, if any."""
+        if work_item.killed_by is None:
+            return
+
+        self._by_line.setdefault(
+            work_item.module, {}).setdefault(
+                work_item.line_number, []).append(
+                    (operator_name(work_item.operator), work_item.killed_by))
+        self._by_module.setdefault(
+            work_item.module, Counter())[work_item.killed_by] += 1
+
+    def priority_tests(self, work_item):
+        """Get the IDs of the tests most likely to kill `work_item`, most
+        likely first.
+        """
+        line_kills = self._by_line.get(
+            work_item.module, {}).get(work_item.line_number, ())
+        operator = operator_name(work_item.operator)
+        candidates = [test_id for other, test_id in line_kills
+                      if other == operator]
+        candidates += [test_id for other, test_id in line_kills
+                       if other != operator]
+        candidates += [test_id for test_id, _ in self._by_module.get(
+            work_item.module, Counter()).most_common()]
+
+        tests = []
+        for test_id in candidates:
+            if test_id not in tests:
+                tests.append(test_id)
+                if len(tests) == self.max_tests:
+                    break
+        return tests
+
+    def prioritize(self, work_items):
+        """Set `priority_tests` on each of `work_items` as they are generated.
+
+        This is lazy, so items generated later benefit from results recorded in
+        the meantime.
+        """
+        for work_item in work_items:
+            work_item.priority_tests = self.priority_tests(work_item)
+            yield work_item
@@ -0,0 +1,199 @@
+"""Predict whether the tests will kill a mutant from the results of earlier
+sessions.
+
+When the same code is tested again and again, e.g. every night, the results
+of earlier sessions say a lot about which mutants the tests kill: some
+operators nearly always give killed mutants in some modules, and mutants deep
+inside nested blocks, or covered by few tests, are more likely to survive.
+`cosmic-ray train-kill-model` fits a naive Bayes classifier on the features of
+the mutants in earlier sessions (see `features()`) and whether the tests
+killed them, and `cosmic-ray init --kill-model` uses it to give each work item
+its `kill_probability`.
+
+Pending work items are run in order of how uncertain their prediction is, so
+the mutants we know least about are tested first. With `--sample-killed`,
+`init` goes further: mutants which are almost certain to be killed (see
+`CONFIDENT`) are only run at the given rate, and the others are reported as
+killed without being run.
+
+Only the results of mutants whose tests were actually run are used for
+training, so the model never learns from its own predictions (or from the
+other ways `init` can skip mutants).
+
+A model is stored as JSON, so it needs nothing beyond the standard library.
+"""
+
+import ast
+import hashlib
+import json
+import math
+
+from .plugins import operator_name
+from .reporting import is_killed
+from .worker import WorkerOutcome
+
+# The names of the features which the model uses.
+FEATURES = ('operator', 'module', 'node_type', 'nesting_depth',
+            'covering_tests')
+
+# The kill probability above which a mutant is taken to be killed when
+# sampling.
+CONFIDENT = 0.95
+
+# The deepest nesting we tell apart. Deeper nesting is rare.
+_MAX_DEPTH = 8
+
+# The types of statements which nest others.
+_BLOCK_TYPES = tuple(
+    getattr(ast, name)
+    for name in ('FunctionDef', 'AsyncFunctionDef', 'ClassDef', 'If', 'For',
+                 'AsyncFor', 'While', 'With', 'AsyncWith', 'Try', 'TryStar',
+                 'Match')
+    if hasattr(ast, name))
+
+
+def block_spans(module_ast):
+    """Get the `(first line, last line)` spans of the statements in
+    `module_ast` which nest others, e.g. functions, loops and `if`s.
+    """
+    return [
+        (node.lineno, getattr(node, 'end_lineno', None) or node.lineno)
+        for node in ast.walk(module_ast)
+        if isinstance(node, _BLOCK_TYPES)
+    ]
+
+
+def nesting_depth(spans, first_line, last_line):
+    """Get the number of the blocks in `spans` (see `block_spans()`) which
+    contain the lines `first_line` to `last_line`.
+    """
+    return sum(1 for start, end in spans
+               if start <= first_line and last_line <= end)
+
+
+def features(work_item):
+    """Get the features of `work_item` which the model uses.
+
+    Returns: A dict mapping each name in `FEATURES` to a string value. The
+      operator is named by its plugin name (see `operator_name()`), so it's
+      the same for completed and pending work items. The number of covering
+      tests is rounded to a power of two, and the nesting depth is capped.
+    """
+    depth = work_item.nesting_depth
+    if depth is not None:
+        depth = min(depth, _MAX_DEPTH)
+
+    tests = work_item.covering_tests
+    if tests is None:
+        tests = 'all'
+    else:
+        # 0, 1, 2-3, 4-7, ...
+        tests = 'under {}'.format(2 ** len(tests).bit_length())
+
+    return {
+        'operator': str(operator_name(work_item.operator)),
+        'module': str(work_item.module),
+        'node_type': str(work_item.node_type),
+        'nesting_depth': str(depth),
+        'covering_tests': tests,
+    }
+
+
+def is_trainable(work_item):
+    """Whether `work_item`'s results can be used for training, i.e. whether
+    its tests were run to completion.
+    """
+    return work_item.worker_outcome in (WorkerOutcome.NORMAL,
+                                        WorkerOutcome.TIMEOUT)
+
+
+class KillModel:
+    """A naive Bayes classifier of mutants as killed or surviving.
+
+    The model just counts how many killed and surviving mutants it has seen
+    with each value of each feature, and uses Laplace smoothing for values
+    it hasn't seen.
+    """
+
+    def __init__(self, totals=None, counts=None):
+        # The number of (killed, surviving) mutants.
+        self._totals = list(totals or (0, 0))
+        # Maps each feature to a dict mapping its values to the number of
+        # (killed, surviving) mutants with that value.
+        self._counts = {
+            feature: {value: list(pair) for value, pair in values.items()}
+            for feature, values in (counts or {}).items()
+        }
+
+    @property
+    def num_samples(self):
+        "The number of mutants the model has been trained on."
+        return sum(self._totals)
+
+    def train(self, work_items):
+        """Train the model on the trainable (see `is_trainable()`) work items
+        in `work_items`.
+        """
+        for work_item in work_items:
+            if not is_trainable(work_item):
+                continue
+            index = 0 if is_killed(work_item) else 1
+            self._totals[index] += 1
+            for feature, value in features(work_item).items():
+                self._counts.setdefault(feature, {}).setdefault(
+                    value, [0, 0])[index] += 1
+
+    def kill_probability(self, work_item):
+        """Predict the probability that the tests kill `work_item`'s mutant.
+
+        Returns: The probability, or `None` if the model hasn't been trained
+          on both killed and surviving mutants.
+        """
+        if not all(self._totals):
+            return None
+
+        log_odds = math.log(self._totals[0] / self._totals[1])
+        for feature, value in features(work_item).items():
+            values = self._counts.get(feature, {})
+            killed, survived = values.get(value, (0, 0))
+            # Leave room for one value we haven't seen.
+            num_values = len(values) + 1
+            log_odds += math.log(
+                (killed + 1) / (self._totals[0] + num_values))
+            log_odds -= math.log(
+                (survived + 1) / (self._totals[1] + num_values))
+
+        if log_odds < -700:
+            return 0.0
+        return 1 / (1 + math.exp(-log_odds))
+
+    def to_json(self):
+        "Get the model as a JSON-serializable dict."
+        return {'totals': self._totals, 'counts': self._counts}
+
+    @classmethod
+    def from_json(cls, data):
+        "Make a model from the output of `to_json()`."
+        return cls(data['totals'], data['counts'])
+
+    def save(self, path):
+        "Write the model to the file `path`."
+        with open(path, mode='wt') as handle:
+            json.dump(self.to_json(), handle)
+
+    @classmethod
+    def load(cls, path):
+        "Read a model from the file `path`."
+        with open(path, mode='rt') as handle:
+            return cls.from_json(json.load(handle))
+
+
+def is_sampled(work_item, rate):
+    """Whether `work_item` is among the fraction `rate` of work items which
+    are run although they're confidently predicted to be killed.
+
+    This depends only on the work item's `job_id`, so it's the same however
+    often it's asked.
+    """
+    digest = hashlib.sha256(str(work_item.job_id).encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) < rate * 16 ** 8
@@ -0,0 +1,158 @@
+"""Find mutants which may make a loop run forever.
+
+A mutant which makes a loop run forever isn't done until it times out, and
+with the usual timeout that takes many times as long as the tests do. Such
+mutants are typically a handful of mutations at loop-control sites which take
+away a loop's only way out:
+
+- `ReplaceBreakWithContinue` on the only `break` of a `while` loop whose test
+  is always true, e.g. `while True:`.
+- `ZeroIterationLoop` on a `for` loop containing the only exits of an
+  enclosing `while` loop whose test is always true.
+- Any mutation of the test of a `while` loop which has no other exit, since
+  the mutated test may never be false. This includes `AddNot` on the loop.
+
+A loop's exits are its test (unless that's a constant true value), the
+`break`s which leave it, and the `return` and `raise` statements in its body,
+other than in nested functions and classes.
+
+`init` puts the mutants at these sites in the `LOOP_LANE` lane (see
+`WorkItem.lane`), and may give them a shorter timeout of their own. The
+`local-parallel` engine runs them on workers of their own, so they don't hold
+up the others.
+"""
+
+import ast
+
+# The lane of the work items whose mutants may make a loop run forever.
+LOOP_LANE = 'loop'
+
+# The nodes which start a new scope, so that `return` and `raise` in them
+# don't leave the loops around them.
+_SCOPE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+                ast.Lambda)
+
+# The loop nodes.
+_LOOP_TYPES = (ast.For, ast.AsyncFor, ast.While)
+
+
+def _is_always_true(test):
+    "Whether the loop test `test` is a constant true value."
+    try:
+        return bool(ast.literal_eval(test))
+    except (ValueError, TypeError, SyntaxError):
+        return False
+
+
+def _loop_exits(module_ast):
+    """Find the exits of each loop in `module_ast`, other than their tests.
+
+    Returns: A dict mapping each loop node to a list of its exit statements.
+    """
+    exits = {}
+
+    def visit(node, loops):
+        "Record the exits under `node`, which is inside `loops`."
+        for field, value in ast.iter_fields(node):
+            children = value if isinstance(value, list) else [value]
+            for child in children:
+                if not isinstance(child, ast.AST):
+                    continue
+                # A loop's `else` isn't part of the loop.
+                if isinstance(node, _LOOP_TYPES) and field == 'body':
+                    visit_child(child, loops + [node])
+                else:
+                    visit_child(child, loops)
+
+    def visit_child(child, loops):
+        "Record the exits at and under `child`, which is inside `loops`."
+        if isinstance(child, _SCOPE_TYPES):
+            loops = []
+        elif isinstance(child, ast.Break):
+            if loops:
+                exits[loops[-1]].append(child)
+        elif isinstance(child, (ast.Return, ast.Raise)):
+            for loop in loops:
+                exits[loop].append(child)
+        if isinstance(child, _LOOP_TYPES):
+            exits[child] = []
+        visit(child, loops)
+
+    visit(module_ast, [])
+    return exits
+
+
+def _body_ids(loop):
+    "Get the `id()`s of the nodes in the body of `loop`."
+    return {id(node)
+            for statement in loop.body
+            for node in ast.walk(statement)}
+
+
+def _end(node):
+    """Get the `(line, column)` at which `node` ends, or the end of its first
+    line if that's not known.
+    """
+    end_line = getattr(node, 'end_lineno', None)
+    if end_line is None:
+        return node.lineno, float('inf')
+    return end_line, node.end_col_offset
+
+
+class LoopSites:
+    """The sites in a module at which a mutation may make a loop run forever
+    (see the module docstring).
+
+    Args:
+      module_ast: The AST of the module.
+    """
+
+    def __init__(self, module_ast):
+        # The (node type, line number, column offset) of each `Break`, `For`
+        # and `While` node which is a risky mutation site.
+        self._nodes = set()
+        # The (start, end) positions of the tests of `while` loops which are
+        # their loop's only exit.
+        self._tests = []
+
+        exits = _loop_exits(module_ast)
+        for loop, loop_exits in exits.items():
+            if not isinstance(loop, ast.While):
+                continue
+            if not loop_exits:
+                self._add_node(loop)
+                self._tests.append(
+                    ((loop.test.lineno, loop.test.col_offset),
+                     _end(loop.test)))
+            elif _is_always_true(loop.test):
+                self._add_exits(loop, loop_exits, exits)
+
+    def _add_node(self, node):
+        "Add `node` itself as a risky mutation site."
+        self._nodes.add((type(node).__name__, node.lineno, node.col_offset))
+
+    def _add_exits(self, loop, loop_exits, exits):
+        """Add the sites at which all of `loop_exits`, the exits of the
+        `while` loop `loop` whose test is always true, can be taken away.
+        """
+        if len(loop_exits) == 1 and isinstance(loop_exits[0], ast.Break):
+            self._add_node(loop_exits[0])
+
+        # A `for` loop which never runs its body skips the exits in it.
+        exit_ids = {id(node) for node in loop_exits}
+        inner_ids = {id(node) for node in ast.walk(loop)}
+        for inner in exits:
+            if isinstance(inner, ast.For) and id(inner) in inner_ids and \
+                    exit_ids <= _body_ids(inner):
+                self._add_node(inner)
+
+    def __contains__(self, work_item):
+        "Whether the mutant of `work_item` is at one of these sites."
+        if work_item.line_number is None:
+            return False
+        if (work_item.node_type, work_item.line_number,
+                work_item.col_offset) in self._nodes:
+            return True
+        start = (work_item.line_number, work_item.col_offset)
+        return any(test_start <= start < test_end
+                   for test_start, test_end in self._tests)
@@ -25,21 +25,51 @@ class MutatingCore:
     will mutate the `target`-th instance of an operator's mutation candidates
     if such a candidate exists. If there is no `target`-th candidate then
     `activation_record` will remain `None` and no mutation will occur.
+
+    The target may also be a collection of counts, in which case the core
+    mutates each of those candidates in a single traversal. The counts are
+    those of the unmutated AST, since each mutation site is counted before it
+    is mutated. A site can only be mutated once, so of several targets at the
+    same site only the first is used.
     """
 
     def __init__(self, target):
         self._target = target
+        if isinstance(target, int):
+            self._targets = frozenset([target])
+        else:
+            self._targets = frozenset(target)
         self._count = 0
-        self._activation_record = None
+        self._activation_records = []
+        self._mutated_nodes = []
 
     @property
     def activation_record(self):
         """The activation record for the operator.
 
         The activation record is a dict describing where and how the
-        operator was applied.
+        operator was applied. With several targets, this is the record of
+        the first mutation.
+        """
+        if not self._activation_records:
+            return None
+        return self._activation_records[0]
+
+    @property
+    def activation_records(self):
+        """The activation records of all of the mutations made, in the order
+        in which they were made.
         """
-        return self._activation_record
+        return list(self._activation_records)
+
+    @property
+    def mutated_node(self):
+        """The node which the mutation produced, or `None` if there was no
+        mutation (or it deleted the node).
+        """
+        if not self._mutated_nodes:
+            return None
+        return self._mutated_nodes[0]
 
     def visit_mutation_site(self, node, op,  # pylint: disable=invalid-name
                             num_mutations):
@@ -52,20 +82,22 @@ class MutatingCore:
         """
         # If the current operator will do at least that many mutations,
         # then let it make the mutation now.
-        if self._count <= self._target < self._count + num_mutations:
-            assert self._activation_record is None
-            assert self._target - self._count < num_mutations
-
-            self._activation_record = {
+        targets = sorted(
+            target for target in self._targets
+            if self._count <= target < self._count + num_mutations)
+        if targets:
+            target = targets[0]
+            self._activation_records.append({
                 'operator': _full_module_name(op),
-                'occurrence': self._target,
+                'occurrence': target,
                 'line_number': cosmic_ray.util.get_line_number(node)
-            }
+            })
 
             old_node = node
-            node = op.mutate(old_node, self._target - self._count)
+            node = op.mutate(old_node, target - self._count)
             # add lineno and col_offset for newly created nodes
             ast.fix_missing_locations(node)
+            self._mutated_nodes.append(node)
 
         self._count += num_mutations
         return node
@@ -22,18 +22,60 @@ def _to_ops(from_op):  # pylint: disable=unused-argument
         yield to_op
 
 
+# A small set of replacements for each operator: its inverse, if it has one,
+# and an operator whose results differ from its own for almost all operands.
+# Mutants for the other replacements are nearly always killed by tests which
+# kill these.
+_SUFFICIENT_OPS = {
+    ast.Add: (ast.Sub, ast.Mod),
+    ast.Sub: (ast.Add, ast.Mod),
+    ast.Mult: (ast.Div, ast.Mod),
+    ast.Div: (ast.Mult, ast.Mod),
+    ast.FloorDiv: (ast.Mult, ast.Mod),
+    ast.Mod: (ast.Mult, ast.FloorDiv),
+    ast.Pow: (ast.Mult,),
+    ast.LShift: (ast.RShift,),
+    ast.RShift: (ast.LShift,),
+    ast.BitOr: (ast.BitAnd,),
+    ast.BitXor: (ast.BitAnd,),
+    ast.BitAnd: (ast.BitOr,),
+}
+
+if sys.version_info >= (3, 5):
+    _SUFFICIENT_OPS[ast.MatMult] = (ast.Mult,)
+
+
+def _sufficient_to_ops(from_op):
+    """The sufficient set of operators which `from_op` could be mutated to."""
+    yield from _SUFFICIENT_OPS[type(from_op)]
+
+
 class MutateBinaryOperator(Operator):
     """An operator that modifies binary operators."""
 
+    # The function giving the operators a binary operator is mutated to.
+    to_ops = staticmethod(_to_ops)
+
     def visit_BinOp(self, node):  # pylint: disable=invalid-name
         """
             http://greentreesnakes.readthedocs.io/en/latest/nodes.html#BinOp
         """
         return self.visit_mutation_site(
             node,
-            len(build_mutations([node.op], _to_ops)))
+            len(build_mutations([node.op], self.to_ops)))
 
     def mutate(self, node, idx):
-        _, to_op = build_mutations([node.op], _to_ops)[idx]
+        _, to_op = build_mutations([node.op], self.to_ops)[idx]
         node.op = to_op()
         return node
+
+
+class SufficientBinaryOperator(MutateBinaryOperator):
+    """An operator that modifies binary operators, making only a small set of
+    mutants for each.
+
+    For `a + b`, for example, this makes `a - b` and `a % b`, rather than the
+    twelve mutants which `MutateBinaryOperator` makes.
+    """
+
+    to_ops = staticmethod(_sufficient_to_ops)
@@ -80,18 +80,76 @@ def _build_mutations(node):
     return build_mutations(node.ops, ops)
 
 
+# A sufficient set of replacements for each operator. For the relational
+# operators these are from Kaminski, Ammann and Offutt, "Better Predicate
+# Testing" (2011): a test which kills the mutants for these replacements kills
+# those for every other relational operator, and for replacing the comparison
+# with `True` or `False` (which is what those booleans here stand for). For
+# identity and membership tests, negating them is all there is.
+_SUFFICIENT_OPS = {
+    ast.Lt: (ast.LtE, ast.NotEq, False),
+    ast.LtE: (ast.Lt, ast.Eq, True),
+    ast.Gt: (ast.GtE, ast.NotEq, False),
+    ast.GtE: (ast.Gt, ast.Eq, True),
+    ast.Eq: (ast.LtE, ast.GtE, False),
+    ast.NotEq: (ast.Lt, ast.Gt, True),
+    ast.Is: (ast.IsNot,),
+    ast.IsNot: (ast.Is,),
+    ast.In: (ast.NotIn,),
+    ast.NotIn: (ast.In,),
+}
+
+
+def _build_sufficient_mutations(node):
+    """Like `_build_mutations()`, but for just the sufficient set of
+    replacements.
+
+    A to-op of `True` or `False` means replacing the whole comparison with
+    that constant. This is only done for comparisons with a single operator.
+    """
+    assert isinstance(node, ast.Compare)
+    if _comparison_rhs_is_none(node):
+        return build_mutations(node.ops, _rhs_is_none_ops)
+    return [(idx, to_op)
+            for idx, from_op in enumerate(node.ops)
+            for to_op in _SUFFICIENT_OPS[type(from_op)]
+            if not isinstance(to_op, bool) or len(node.ops) == 1]
+
+
 class MutateComparisonOperator(Operator):
     """An operator that modifies comparisons."""
 
+    @staticmethod
+    def _mutations(node):
+        "The list of `(idx, to-op)` mutations for the Compare `node`."
+        return _build_mutations(node)
+
     def visit_Compare(self, node):
         """
             http://greentreesnakes.readthedocs.io/en/latest/nodes.html#Compare
         """
         return self.visit_mutation_site(
             node,
-            len(_build_mutations(node)))
+            len(self._mutations(node)))
 
     def mutate(self, node, idx):
-        from_idx, to_op = _build_mutations(node)[idx]
+        from_idx, to_op = self._mutations(node)[idx]
+        if isinstance(to_op, bool):
+            return ast.copy_location(ast.NameConstant(value=to_op), node)
         node.ops[from_idx] = to_op()
         return node
+
+
+class SufficientComparisonOperator(MutateComparisonOperator):
+    """An operator that modifies comparisons, making only a sufficient set of
+    mutants for each.
+
+    For `a < b`, for example, this makes `a <= b`, `a != b` and `False`,
+    rather than all nine mutants which `MutateComparisonOperator` makes. Any
+    test which kills all of these also kills the others, so the mutants which
+    survive tell you much the same about your tests.
+    """
+
+    @staticmethod
+    def _mutations(node):
+        return _build_sufficient_mutations(node)
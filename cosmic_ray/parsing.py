@@ -3,6 +3,7 @@
 import ast
 import inspect
 import logging
+import sys
 
 log = logging.getLogger()
 
@@ -41,3 +42,22 @@ def get_ast(module):
                 source = handle.read()
 
     return ast.parse(source, source_file, 'exec')
+
+
+def literal(value):
+    """Make an expression node for `value`, which may be a string, a number,
+    `None`, a bool or a tuple of these.
+
+    `ast.Constant` is only compiled by Python 3.8 and later, so older versions
+    get the nodes their own parser makes.
+    """
+    if sys.version_info >= (3, 8):
+        return ast.Constant(value=value)
+    if isinstance(value, tuple):
+        return ast.Tuple(elts=[literal(element) for element in value],
+                         ctx=ast.Load())
+    if isinstance(value, str):
+        return ast.Str(s=value)
+    if value is None or isinstance(value, bool):
+        return ast.NameConstant(value=value)
+    return ast.Num(n=value)
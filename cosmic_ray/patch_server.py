@@ -0,0 +1,247 @@
+"""A server which runs worker jobs by hot-patching functions in-process.
+
+This is what the `hot-patch` execution engine launches:
+
+    python -m cosmic_ray.patch_server
+
+Most mutants change nothing but the body of a single function. For these
+there's no need to re-import the mutated module, or anything which depends on
+it: the server imports everything once and, for each job, compiles just the
+function enclosing the mutation and swaps the new code into the live function
+object's `__code__`. It then runs the tests and puts the original code back.
+
+The function patched is the outermost function enclosing the mutation, so
+mutations of nested functions and lambdas are covered too. Mutations which
+can't be applied this way are not run by the server. These include mutations
+of module- or class-level code, of a function's decorators, default arguments
+or annotations, and of functions which can't be found at
+`module.Class.function` (e.g. because a decorator replaced them without
+`functools.wraps()`). They also include mutations of functions which are
+called at import time, such as decorators, since patching them after the fact
+has no effect. To find these, the server imports the tests (by having the test
+runner discover but not run them) with a profiler recording every function
+called.
+
+Since every job runs in the same process, anything a test or a mutant changes
+outside of the patched function (e.g. module-level state) persists into later
+jobs. This trades some isolation for speed.
+
+The server speaks the same JSON-lines protocol as `cosmic_ray.fork_server`,
+except that jobs have no timeout (the engine enforces timeouts by killing the
+server) and that the result of a job which can't be hot-patched is `null`.
+"""
+
+import ast
+import importlib
+import inspect
+import os
+import contextlib
+import sys
+
+from .execution.job_server import (decode_job, make_test_runner,
+                                   receive_jobs, reply, start_server)
+from .util import redirect_stdout
+from .work_item import WorkItem
+from .worker import (WorkerOutcome, exception_result, mutant_result,
+                     mutate_module)
+
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _find_path(node, target):
+    """Find the path from `node` down to `target` in an AST.
+
+    Returns: A list of nodes starting with `node` and ending with `target`,
+        or `None` if `target` isn't in the tree.
+    """
+    if node is target:
+        return [node]
+    for child in ast.iter_child_nodes(node):
+        path = _find_path(child, target)
+        if path is not None:
+            return [node] + path
+    return None
+
+
+def enclosing_function(module_ast, node):
+    """Find the outermost function whose body contains `node`.
+
+    Only functions which are at module level, or are methods of (possibly
+    nested) classes at module level, are considered.
+
+    Returns: A tuple `(classes, function)` where `classes` is the list of the
+        function's enclosing `ClassDef`s, outermost first. If `node` isn't in
+        the body of such a function, returns `None`.
+    """
+    path = _find_path(module_ast, node)
+    if path is None:
+        return None
+
+    classes = []
+    for parent, child in zip(path[1:], path[2:]):
+        # Anything outside of the body, e.g. a decorator, is evaluated at
+        # definition time.
+        if not any(child is stmt for stmt in getattr(parent, 'body', ())):
+            return None
+        if isinstance(parent, _FUNCTION_TYPES):
+            return classes, parent
+        if not isinstance(parent, ast.ClassDef):
+            return None
+        classes.append(parent)
+    return None
+
+
+def _find_code(code, name, first_line):
+    "Find the code object for function `name` at `first_line` under `code`."
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            if const.co_name == name and const.co_firstlineno == first_line:
+                return const
+            found = _find_code(const, name, first_line)
+            if found is not None:
+                return found
+    return None
+
+
+def _live_function(module, classes, function_def):
+    """Find the function object defined by `function_def` in `module`.
+
+    Returns: The function object, or `None` if it can't be found.
+    """
+    scope = module
+    for class_def in classes:
+        scope = vars(scope).get(class_def.name)
+        if not inspect.isclass(scope):
+            return None
+
+    obj = vars(scope).get(function_def.name)
+    obj = getattr(obj, '__func__', obj)  # staticmethod and classmethod
+    while obj is not None:
+        code = getattr(obj, '__code__', None)
+        if inspect.iscode(code) and code.co_name == function_def.name:
+            return obj
+        obj = getattr(obj, '__wrapped__', None)
+    return None
+
+
+def _compile_function(classes, function_def, filename, first_line):
+    """Compile `function_def` within its enclosing `classes`.
+
+    The classes are needed to get the same name mangling and `__class__` cell
+    as the original.
+
+    Returns: The code object for the function.
+    """
+    node = function_def
+    for class_def in reversed(classes):
+        node = ast.ClassDef(name=class_def.name, bases=[], keywords=[],
+                            body=[node], decorator_list=[])
+        ast.copy_location(node, class_def)
+    module_ast = ast.fix_missing_locations(
+        ast.Module(body=[node], type_ignores=[]))
+    return _find_code(compile(module_ast, filename, 'exec'),
+                      function_def.name, first_line)
+
+
+@contextlib.contextmanager
+def recording_calls(codes):
+    """Add the code of every Python function called in the with-block to the
+    set `codes`.
+    """
+    def profile(frame, event, arg):  # pylint: disable=unused-argument
+        if event == 'call':
+            codes.add(frame.f_code)
+
+    original = sys.getprofile()
+    sys.setprofile(profile)
+    try:
+        yield
+    finally:
+        sys.setprofile(original)
+
+
+def hot_patch(module_name,  # pylint: disable=too-many-arguments
+              operator_class,
+              occurrence,
+              test_runner,
+              import_time_code):
+    """Hot-patch the OCCURRENCE-th site for OPERATOR_CLASS in MODULE_NAME into
+    its function, run the tests, and restore the function.
+
+    `import_time_code` is a set of the code objects of the functions called
+    at import time, which can't be hot-patched. If this has to import
+    MODULE_NAME, it adds the functions called by the import to the set.
+
+    Returns: A `WorkItem`, or `None` if the mutation can't be hot-patched.
+
+    Raises: This will generally not raise any exceptions. Rather, exceptions
+        will be reported using the 'exception' result-type in the return value.
+    """
+    try:
+        with recording_calls(import_time_code):
+            module = importlib.import_module(module_name)
+        core, module_ast, module_diff = mutate_module(
+            module_name, operator_class, occurrence)
+        if not core.activation_record:
+            return WorkItem(worker_outcome=WorkerOutcome.NO_TEST)
+
+        enclosing = enclosing_function(module_ast, core.mutated_node)
+        if enclosing is None:
+            return None
+        function = _live_function(module, *enclosing)
+        if function is None:
+            return None
+
+        original = function.__code__
+        if original in import_time_code:
+            return None
+        code = _compile_function(*enclosing,
+                                 filename=original.co_filename,
+                                 first_line=original.co_firstlineno)
+        if code is None or len(code.co_freevars) != len(original.co_freevars):
+            return None
+
+        function.__code__ = code
+        try:
+            rec = test_runner()
+        finally:
+            function.__code__ = original
+
+        return mutant_result(rec, core, module_diff)
+
+    except Exception:  # noqa # pylint: disable=broad-except
+        return exception_result()
+
+
+def main():
+    "Serve jobs from stdin until it's closed."
+    # The tests run in this process, so the protocol stream is kept apart.
+    protocol, setup = start_server()
+    test_runner = make_test_runner(setup)
+
+    import_time_code = set()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        with recording_calls(import_time_code):
+            test_runner.tests = []
+            test_runner()
+
+    reply(protocol, {'ready': True})
+
+    with open(os.devnull, 'w') as devnull:
+        for job in receive_jobs():
+            work_item, operator_class, occurrence = decode_job(
+                job, test_runner)
+            with redirect_stdout(devnull):
+                result = hot_patch(
+                    work_item.module,
+                    operator_class,
+                    occurrence,
+                    test_runner,
+                    import_time_code)
+            reply(protocol, result)
+
+    return os.EX_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,24 @@
 """Query and retrieve the various plugins in Cosmic Ray.
+
+Note that stevedore (and the entry-point machinery beneath it) is only imported
+when a plugin is actually looked up. This keeps `import cosmic_ray.plugins`
+cheap for code, like workers, which doesn't need it.
 """
 
-from stevedore import driver, ExtensionManager
+import functools
+import importlib
+
+
+@functools.lru_cache()
+def _extension_manager(namespace):
+    """Get the (shared) `ExtensionManager` for `namespace`.
+
+    Building an `ExtensionManager` scans all of the installed entry points,
+    and the set of installed plugins doesn't change while we're running, so we
+    only do this once per namespace.
+    """
+    from stevedore import ExtensionManager
+    return ExtensionManager(namespace)
 
 
 def get_operator(name):
@@ -13,16 +30,41 @@ def get_operator(name):
     Returns: The operator *class object* (i.e. not an instance) provided by the
         plugin named `name`.
     """
-    return ExtensionManager('cosmic_ray.operators')[name].plugin
+    return _extension_manager('cosmic_ray.operators')[name].plugin
 
 
-def operator_names():
-    """Get an iterable of all operator plugin names."""
-    return ExtensionManager('cosmic_ray.operators').names()
+# The suffix of the names of operator plugins which make a sufficient subset
+# of the mutants of the plugin named without it.
+SUFFICIENT_SUFFIX = '_sufficient'
+
+
+def operator_names(operator_set=None):
+    """Get an iterable of operator plugin names.
+
+    Args:
+      operator_set: `None` for the names of all operator plugins. Otherwise,
+        `'full'` for those of the operators which make every mutant, or
+        `'sufficient'` to use the sufficient variant (named with
+        `SUFFICIENT_SUFFIX`) of each operator which has one in its place.
+    """
+    names = _extension_manager('cosmic_ray.operators').names()
+    if operator_set is None:
+        return names
+
+    variants = {name for name in names if name.endswith(SUFFICIENT_SUFFIX)}
+    if operator_set == 'full':
+        return [name for name in names if name not in variants]
+    return [
+        name + SUFFICIENT_SUFFIX
+        if name + SUFFICIENT_SUFFIX in variants else name
+        for name in names
+        if name not in variants
+    ]
 
 
 def get_test_runner(name, test_args):
     """Get a test-runner instance by name."""
+    from stevedore import driver
     test_runner_manager = driver.DriverManager(
         namespace='cosmic_ray.test_runners',
         name=name,
@@ -35,11 +77,12 @@ def get_test_runner(name, test_args):
 
 def test_runner_names():
     """Get iterable of test-runner plugin names."""
-    return ExtensionManager('cosmic_ray.test_runners').names()
+    return _extension_manager('cosmic_ray.test_runners').names()
 
 
 def get_execution_engine(name):
     """Get the execution engine by name."""
+    from stevedore import driver
     manager = driver.DriverManager(
         namespace='cosmic_ray.execution_engines',
         name=name,
@@ -50,4 +93,75 @@ def get_execution_engine(name):
 
 def execution_engine_names():
     """Get iterable of execution-enginer plugin names."""
-    return ExtensionManager('cosmic_ray.execution_engines').names()
+    return _extension_manager('cosmic_ray.execution_engines').names()
+
+
+def _object_path(obj):
+    return '{}:{}'.format(obj.__module__, obj.__qualname__)
+
+
+@functools.lru_cache()
+def operator_path(name):
+    """Get the import path of the operator class provided by plugin `name`.
+
+    The path has the form "package.module:ClassName" and can be passed to
+    `load_object()`. This lets processes which run many jobs resolve plugin
+    names once and pass the result to workers, which then don't need to scan
+    the installed plugins.
+    """
+    return _object_path(get_operator(name))
+
+
+@functools.lru_cache()
+def _operator_names_by_path():
+    "Get a dict mapping the dotted path of each operator class to its plugin."
+    return {
+        operator_path(name).replace(':', '.'): name
+        for name in operator_names()
+    }
+
+
+def operator_name(operator):
+    """Get the plugin name of an operator as named in a `WorkItem`.
+
+    `init` names the operator of a work item by its plugin name, but workers
+    report the operator class they ran by its dotted path, e.g.
+    "cosmic_ray.operators.break_continue.ReplaceBreakWithContinue", and that
+    replaces the plugin name in completed work items. Use this to compare the
+    operators of pending and completed work items.
+
+    Args:
+      operator: A plugin name, or the dotted path of an operator class.
+
+    Returns: The plugin name, or `operator` itself if it's neither a plugin
+      name nor the path of an operator which a plugin provides.
+    """
+    return _operator_names_by_path().get(
+        operator if operator is None else operator.replace(':', '.'),
+        operator)
+
+
+@functools.lru_cache()
+def test_runner_path(name):
+    """Get the import path of the test-runner class provided by plugin `name`.
+
+    See `operator_path()`.
+    """
+    return _object_path(
+        _extension_manager('cosmic_ray.test_runners')[name].plugin)
+
+
+def load_object(path):
+    """Import the object named by an import path.
+
+    Args:
+        path: A string of the form "package.module:name", as returned by
+            e.g. `operator_path()`. `name` may be a dotted path.
+
+    Returns: The object named by `path`.
+    """
+    module_name, _, qualname = path.partition(':')
+    obj = importlib.import_module(module_name)
+    for attr in qualname.split('.'):
+        obj = getattr(obj, attr)
+    return obj
@@ -0,0 +1,209 @@
+"""A server which runs worker jobs by re-importing only what a mutant affects.
+
+This is what the `reload` execution engine launches:
+
+    python -m cosmic_ray.reload_server
+
+A worker process imports everything afresh for each mutant, but the only
+modules which can actually differ between mutants are the mutated module and
+the modules which import it, directly or indirectly. This server keeps
+everything imported and records, via `builtins.__import__`, which modules
+import which. For each job it evicts just the mutated module and its
+dependents from `sys.modules` and from their parent packages, imports the
+mutated module through an `ASTFinder`, runs the tests (which import the
+evicted modules again as they need them), and then restores the original
+modules. The standard library, third-party packages and the test framework
+stay imported throughout.
+
+Modules which keep references to other modules' objects without importing
+them (e.g. registries) aren't seen as dependents, and may hold on to
+unmutated code. Modules like this can be listed in the "stateful-modules" of
+the "execution-engine" section of the config. A job which would have to evict
+one of them (or a submodule of one of them) isn't run by the server.
+
+The server speaks the same JSON-lines protocol as `cosmic_ray.patch_server`:
+the result of a job which the server won't run is `null`.
+"""
+
+import builtins
+import os
+import sys
+
+from .execution.job_server import (decode_job, make_test_runner,
+                                   receive_jobs, reply, start_server)
+from .importing import preserve_modules, using_ast
+from .util import redirect_stdout
+from .work_item import WorkItem
+from .worker import (WorkerOutcome, exception_result, mutant_result,
+                     mutate_module)
+
+
+class ImportGraph:
+    """Records which modules import which.
+
+    This is a context manager which records imports for the duration of the
+    `with`-block. Imports are recorded by wrapping `builtins.__import__`, so
+    this sees every import statement which is executed, including those of
+    modules which are already imported.
+    """
+
+    def __init__(self):
+        # module name -> names of the modules which import it
+        self._importers = {}
+        self._original_import = None
+
+    def _import(self, name, globals=None,  # pylint: disable=redefined-builtin
+                locals=None, fromlist=(), level=0):
+        module = self._original_import(name, globals, locals, fromlist, level)
+        importer = (globals or {}).get('__name__')
+        if importer:
+            self._record(importer, name, module, fromlist)
+        return module
+
+    def __enter__(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._original_import
+
+    def _record(self, importer, name, module, fromlist):
+        if fromlist:
+            imported = [module.__name__]
+            imported.extend(
+                '{}.{}'.format(module.__name__, attr)
+                for attr in fromlist
+                if '{}.{}'.format(module.__name__, attr) in sys.modules)
+        else:
+            imported = [name]
+
+        for imported_name in imported:
+            if imported_name != importer:
+                self._importers.setdefault(imported_name, set()).add(importer)
+
+    def dependents(self, module_name):
+        """Get the names of the modules which import `module_name`, directly or
+        indirectly.
+        """
+        found = set()
+        pending = [module_name]
+        while pending:
+            for importer in self._importers.get(pending.pop(), ()):
+                if importer not in found:
+                    found.add(importer)
+                    pending.append(importer)
+        found.discard(module_name)
+        return found
+
+
+def _is_flagged(module_name, flagged):
+    "Whether `module_name` is one of, or inside one of, the `flagged` modules."
+    return any(module_name == name or module_name.startswith(name + '.')
+               for name in flagged)
+
+
+def _evict_modules(names):
+    """Remove the modules called `names` from `sys.modules` and from the
+    attributes of their parent packages, so that importing them again (e.g.
+    with `from package import module`) doesn't find the originals.
+
+    Returns: A dict mapping the names of the evicted modules to the modules,
+      for `_restore_modules()`.
+    """
+    saved = {name: sys.modules.pop(name)
+             for name in names
+             if name in sys.modules}
+    for name, module in saved.items():
+        parent, _, child = name.rpartition('.')
+        if getattr(sys.modules.get(parent), child, None) is module:
+            delattr(sys.modules[parent], child)
+    return saved
+
+
+def _restore_modules(saved):
+    """Put the modules in `saved`, a dict mapping names to modules, back into
+    `sys.modules` and into the attributes of their parent packages.
+    """
+    sys.modules.update(saved)
+    for name, module in saved.items():
+        parent, _, child = name.rpartition('.')
+        if parent in sys.modules:
+            setattr(sys.modules[parent], child, module)
+
+
+def reload_and_run(module_name,  # pylint: disable=too-many-arguments
+                   operator_class,
+                   occurrence,
+                   test_runner,
+                   import_graph,
+                   stateful_modules):
+    """Mutate the OCCURRENCE-th site for OPERATOR_CLASS in MODULE_NAME,
+    re-import it and its dependents, run the tests, and restore the original
+    modules.
+
+    Returns: A `WorkItem`, or `None` if the job would have to evict any of
+        `stateful_modules`.
+
+    Raises: This will generally not raise any exceptions. Rather, exceptions
+        will be reported using the 'exception' result-type in the return value.
+    """
+    try:
+        core, module_ast, module_diff = mutate_module(
+            module_name, operator_class, occurrence)
+        if not core.activation_record:
+            return WorkItem(worker_outcome=WorkerOutcome.NO_TEST)
+
+        evicted = {module_name} | import_graph.dependents(module_name)
+        if any(_is_flagged(name, stateful_modules) for name in evicted):
+            return None
+
+        saved = _evict_modules(evicted)
+        try:
+            with preserve_modules(), using_ast(module_name, module_ast):
+                rec = test_runner()
+        finally:
+            _restore_modules(saved)
+
+        return mutant_result(rec, core, module_diff)
+
+    except Exception:  # noqa # pylint: disable=broad-except
+        return exception_result()
+
+
+def main():
+    "Serve jobs from stdin until it's closed."
+    # The tests run in this process, so the protocol stream is kept apart.
+    protocol, setup = start_server()
+    stateful_modules = setup['config']['execution-engine'].get(
+        'stateful-modules', None) or ()
+
+    with ImportGraph() as import_graph:
+        test_runner = make_test_runner(setup)
+
+        # Import the tests, and so the code under test, to fill in the graph.
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            test_runner.tests = []
+            test_runner()
+
+        reply(protocol, {'ready': True})
+
+        with open(os.devnull, 'w') as devnull:
+            for job in receive_jobs():
+                work_item, operator_class, occurrence = decode_job(
+                    job, test_runner)
+                with redirect_stdout(devnull):
+                    result = reload_and_run(
+                        work_item.module,
+                        operator_class,
+                        occurrence,
+                        test_runner,
+                        import_graph,
+                        stateful_modules)
+                reply(protocol, result)
+
+    return os.EX_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
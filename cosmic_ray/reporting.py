@@ -8,7 +8,8 @@ from cosmic_ray.worker import WorkerOutcome
 def _print_item(work_item, full_report):
     data = work_item.data
     outcome = work_item.worker_outcome
-    if outcome in [WorkerOutcome.NORMAL, WorkerOutcome.EXCEPTION]:
+    if outcome in [WorkerOutcome.NORMAL, WorkerOutcome.EXCEPTION,
+                   WorkerOutcome.SKIPPED]:
         outcome = work_item.test_outcome
     ret_val = [
         'job ID {}:{}:{}'.format(
@@ -28,6 +29,12 @@ def _print_item(work_item, full_report):
                                       WorkerOutcome.EXCEPTION]:
         ret_val += data
         ret_val += work_item.diff
+    elif work_item.worker_outcome == WorkerOutcome.SKIPPED:
+        ret_val += data
+        ret_val.append('{}:{}: {}'.format(
+            work_item.module,
+            work_item.line_number,
+            work_item.replacement))
 
     # for presentation purposes only
     if ret_val:
@@ -41,7 +48,8 @@ def is_killed(record):
     """
     if record.worker_outcome == WorkerOutcome.TIMEOUT:
         return True
-    elif record.worker_outcome == WorkerOutcome.NORMAL:
+    elif record.worker_outcome in [WorkerOutcome.NORMAL,
+                                   WorkerOutcome.SKIPPED]:
         if record.test_outcome == TestOutcome.KILLED:
             return True
         if record.test_outcome == TestOutcome.INCOMPETENT:
@@ -49,6 +57,24 @@ def is_killed(record):
     return False
 
 
+def is_equivalent(record):
+    """Determines if a WorkItem's mutant is equivalent to the unmutated code.
+
+    Equivalent mutants can't be killed, so they're left out of the survival
+    rate.
+    """
+    return record.test_outcome == TestOutcome.EQUIVALENT
+
+
+def is_not_infected(record):
+    """Determines if a WorkItem's mutant survived because it never changed the
+    program's state.
+
+    These mutants count as survivors.
+    """
+    return record.test_outcome == TestOutcome.NOT_INFECTED
+
+
 def create_report(records, show_pending, full_report=False):
     """Generate the lines of a simple report.
 
@@ -59,25 +85,37 @@ def create_report(records, show_pending, full_report=False):
     """
     total_jobs = 0
     pending_jobs = 0
+    equivalent_jobs = 0
+    not_infected_jobs = 0
     kills = 0
     for item in records:
         total_jobs += 1
         if item.worker_outcome is None:
             pending_jobs += 1
+        if is_equivalent(item):
+            equivalent_jobs += 1
+        if is_not_infected(item):
+            not_infected_jobs += 1
         if is_killed(item):
             kills += 1
         if (item.worker_outcome is not None) or show_pending:
             yield from _print_item(item, full_report)
 
     completed_jobs = total_jobs - pending_jobs
+    rated_jobs = completed_jobs - equivalent_jobs
 
     yield 'total jobs: {}'.format(total_jobs)
 
     if completed_jobs > 0:
         yield 'complete: {} ({:.2f}%)'.format(
             completed_jobs, completed_jobs / total_jobs * 100)
-        yield 'survival rate: {:.2f}%'.format(
-            (1 - kills / completed_jobs) * 100)
+        if equivalent_jobs:
+            yield 'equivalent: {}'.format(equivalent_jobs)
+        if not_infected_jobs:
+            yield 'not infected: {}'.format(not_infected_jobs)
+        if rated_jobs > 0:
+            yield 'survival rate: {:.2f}%'.format(
+                (1 - kills / rated_jobs) * 100)
     else:
         yield 'no jobs completed'
 
@@ -87,15 +125,18 @@ def survival_rate(records):
     """
     total_jobs = 0
     pending_jobs = 0
+    equivalent_jobs = 0
     kills = 0
     for item in records:
         total_jobs += 1
         if item.worker_outcome is None:
             pending_jobs += 1
+        if is_equivalent(item):
+            equivalent_jobs += 1
         if is_killed(item):
             kills += 1
 
-    completed_jobs = total_jobs - pending_jobs
+    completed_jobs = total_jobs - pending_jobs - equivalent_jobs
 
     if not completed_jobs:
         rate = 0
@@ -0,0 +1,178 @@
+"""Mutant schemata: every mutant of a module in a single meta-module.
+
+Normally each mutant costs a parse, a traversal, an unparse and a compile of
+its module. A meta-module instead contains all of a module's mutants at once,
+each guarded by a check of the *active mutant*, so that it is compiled only
+once and the mutant to run is chosen by `activate()`. For example, with the
+comparison and number operators
+
+    if x < 1:
+        ...
+
+becomes something like
+
+    if (x >= 1 if __cosmic_ray_mutant__ == 'mutate_comparison_operator/3'
+        else x < (2 if __cosmic_ray_mutant__ == 'number_replacer/0'
+                  else 1)):
+        ...
+
+The meta-module is built with the operators' own `mutate()` methods, so every
+operator gets schemata for free. The guards work for mutation sites which are
+expressions or statements. Mutants of other kinds of node (e.g. the exception
+handlers of `exception_replacer`) aren't included in the meta-module and have
+to be run the usual way; `build_meta_module()` reports which mutants are.
+
+Only one mutant is ever active, so the mutated branch of a guard is the
+operator's mutation of the *original* node, without guards for any other
+mutants inside it.
+
+Since a module's top-level code only runs when it's imported, a meta-module
+still has to be executed afresh for each mutant. What it saves is everything
+before that.
+"""
+
+import ast
+import builtins
+import copy
+import logging
+
+from .counting import visit_all
+from .parsing import literal
+
+log = logging.getLogger()
+
+# The name of the builtin which holds the key of the active mutant.
+ACTIVE_MUTANT = '__cosmic_ray_mutant__'
+
+setattr(builtins, ACTIVE_MUTANT, None)
+
+
+def mutant_key(operator_name, occurrence):
+    "Get the key which activates a mutant in a meta-module."
+    return '{}/{}'.format(operator_name, occurrence)
+
+
+def activate(key):
+    """Activate the mutant with key `key` in all meta-modules.
+
+    Pass `None` to deactivate all mutants.
+    """
+    setattr(builtins, ACTIVE_MUTANT, key)
+
+
+class _SchemataCore:
+    """An operator core which collects every mutant an operator could make.
+
+    The mutants are added to `variants`, which maps the `id()` of each
+    mutation site to the site and a list of `(key, mutated node)` pairs. The
+    same dict can be shared by the cores of several operators.
+    """
+
+    def __init__(self, operator_name, variants):
+        self._operator_name = operator_name
+        self._variants = variants
+        self._count = 0
+
+    def visit_mutation_site(self, node, op, num_mutations):
+        "Called when a mutation site is reached."
+        if isinstance(node, (ast.expr, ast.stmt)):
+            _, mutants = self._variants.setdefault(id(node), (node, []))
+            for idx in range(num_mutations):
+                mutated = op.mutate(copy.deepcopy(node), idx)
+                if mutated is None and isinstance(node, ast.expr):
+                    continue
+                mutants.append(
+                    (mutant_key(self._operator_name, self._count + idx),
+                     mutated))
+
+        self._count += num_mutations
+        return node
+
+    @staticmethod
+    def repr_args():
+        "Extra arguments to display in operator reprs."
+        return []
+
+
+def _is_active(key, node):
+    "Make the expression `__cosmic_ray_mutant__ == key`."
+    return ast.copy_location(
+        ast.Compare(left=ast.Name(id=ACTIVE_MUTANT, ctx=ast.Load()),
+                    ops=[ast.Eq()],
+                    comparators=[literal(key)]),
+        node)
+
+
+class _Guard(ast.NodeTransformer):
+    "Replace each mutation site with a choice between it and its mutants."
+
+    def __init__(self, variants):
+        self._variants = variants
+
+    def visit(self, node):
+        node = self.generic_visit(node)
+        _, mutants = self._variants.get(id(node), (None, ()))
+
+        guarded = node
+        for key, mutated in reversed(mutants):
+            if isinstance(node, ast.expr):
+                guarded = ast.IfExp(test=_is_active(key, node),
+                                    body=mutated,
+                                    orelse=guarded)
+            else:
+                guarded = ast.If(test=_is_active(key, node),
+                                 body=[mutated or ast.Pass()],
+                                 orelse=[guarded])
+            ast.copy_location(guarded, node)
+        return guarded
+
+
+def build_meta_module(module_ast, operators):
+    """Turn `module_ast` into a meta-module containing the mutants of
+    `operators`.
+
+    This modifies `module_ast`.
+
+    Args:
+        module_ast: The AST of the module.
+        operators: A dict mapping operator plugin names to operator classes.
+
+    Returns: A tuple `(meta-module AST, keys)`, where `keys` is the set of
+        keys (see `mutant_key()`) of the mutants in the meta-module.
+    """
+    variants = {}
+    visit_all(module_ast,
+              [operator_class(_SchemataCore(op_name, variants))
+               for op_name, operator_class in operators.items()])
+
+    meta_ast = ast.fix_missing_locations(_Guard(variants).visit(module_ast))
+    keys = frozenset(key
+                     for _, mutants in variants.values()
+                     for key, _ in mutants)
+    return meta_ast, keys
+
+
+def compile_meta_module(source_file, operators):
+    """Build and compile the meta-module for the module in `source_file`.
+
+    Some guards aren't valid everywhere (e.g. in the patterns of a `match`
+    statement), so not every module has a meta-module.
+
+    Args:
+        source_file: The name of the module's source file.
+        operators: A dict mapping operator plugin names to operator classes.
+
+    Returns: A tuple `(code, keys)` as for `build_meta_module()` but with a
+        compiled code object rather than an AST, or `(None, frozenset())` if
+        the meta-module doesn't compile.
+    """
+    with open(source_file, mode='rt') as handle:
+        module_ast = ast.parse(handle.read(), source_file, 'exec')
+
+    meta_ast, keys = build_meta_module(module_ast, operators)
+    try:
+        code = compile(meta_ast, source_file, 'exec')
+    except (SyntaxError, ValueError, TypeError) as exc:
+        log.warning('No meta-module for %s: %s', source_file, exc)
+        return None, frozenset()
+    return code, keys
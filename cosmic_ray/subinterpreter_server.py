@@ -0,0 +1,155 @@
+"""A server which runs each worker job in a fresh sub-interpreter.
+
+This is what the `subinterpreter` execution engine launches:
+
+    python -m cosmic_ray.subinterpreter_server
+
+For each job the server creates a new sub-interpreter (see
+`cosmic_ray.subinterpreters`), runs `worker.worker()` in it, and destroys it.
+A sub-interpreter has its own `sys.modules`, so each job imports the mutated
+module and the tests afresh, just as a new worker process would, but without
+the cost of starting a process.
+
+Extension modules which use single-phase initialization can't be loaded in
+sub-interpreters with their own GIL. If a job tries to load one, its result
+can't be trusted (e.g. the tests may have failed to import), so the server
+discards it and refuses to run that job or any later one. It also refuses
+every job if this version of Python doesn't support such sub-interpreters.
+
+The server speaks the same JSON-lines protocol as `cosmic_ray.patch_server`:
+the result of a job which the server refuses to run is `null`.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import tempfile
+
+from .execution.job_server import (decode_job, make_test_runner,
+                                   receive_jobs, reply, start_server)
+from .subinterpreters import InterpreterError, get_runner
+from .testing.test_runner import TestOutcome
+from .util import redirect_stdout
+from .work_item import WorkItem
+from .worker import WorkerOutcome, worker
+
+# What each sub-interpreter runs. Sub-interpreters start with the default
+# `sys.path`, so we give them ours.
+_SCRIPT = '''\
+import sys
+sys.path[:] = {path!r}
+from cosmic_ray.subinterpreter_server import run_job
+run_job({job!r}, {result_file!r})
+'''
+
+# The message of the `ImportError` for extension modules which can't be
+# loaded in sub-interpreters.
+_REFUSAL = 'does not support loading in subinterpreters'
+
+
+@contextlib.contextmanager
+def _recording_refusals(refused):
+    """Add the name of each extension module which refuses to load in this
+    sub-interpreter during the with-block to the list `refused`.
+    """
+    from importlib.machinery import ExtensionFileLoader
+    create_module = ExtensionFileLoader.create_module
+
+    def recording_create_module(self, spec):
+        try:
+            return create_module(self, spec)
+        except ImportError as exc:
+            if _REFUSAL in str(exc):
+                refused.append(spec.name)
+            raise
+
+    ExtensionFileLoader.create_module = recording_create_module
+    try:
+        yield
+    finally:
+        ExtensionFileLoader.create_module = create_module
+
+
+def run_job(job, result_file):
+    """Run a job in the current sub-interpreter.
+
+    Args:
+      job: The job, as JSON. This is the job as received by the server, plus
+        the server's `config` and `test_runner`.
+      result_file: The name of the file to write the result to. This is a
+        JSON object with the keys `result`, the resulting `WorkItem`, and
+        `refused`, the names of any extension modules which refused to load.
+    """
+    job = json.loads(job)
+    test_runner = make_test_runner(job)
+    work_item, operator_class, occurrence = decode_job(job, test_runner)
+
+    refused = []
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        with _recording_refusals(refused):
+            result = worker(
+                work_item.module,
+                operator_class,
+                occurrence,
+                test_runner,
+                work_item.bundle_entry)
+
+    with open(result_file, 'w') as handle:
+        json.dump({'result': result, 'refused': refused}, handle)
+
+
+def _run_in_subinterpreter(runner, job):
+    """Run `job` in a fresh sub-interpreter using `runner`.
+
+    Returns: A tuple `(result, refused)` as written by `run_job()`.
+    """
+    handle, result_file = tempfile.mkstemp(suffix='.json')
+    os.close(handle)
+    try:
+        runner(_SCRIPT.format(path=sys.path,
+                              job=json.dumps(job),
+                              result_file=result_file))
+        with open(result_file) as handle:
+            outcome = json.load(handle)
+        return WorkItem(outcome['result']), outcome['refused']
+    except (InterpreterError, ValueError) as exc:
+        return WorkItem(
+            data=[str(exc)],
+            test_outcome=TestOutcome.INCOMPETENT,
+            worker_outcome=WorkerOutcome.EXCEPTION), []
+    finally:
+        os.unlink(result_file)
+
+
+def main():
+    "Serve jobs from stdin until it's closed."
+    protocol, setup = start_server()
+
+    runner = get_runner()
+    if runner is None:
+        print('Sub-interpreters are not supported; refusing all jobs',
+              file=sys.stderr)
+
+    reply(protocol, {'ready': True})
+
+    for job in receive_jobs():
+        result = None
+        if runner is not None:
+            job = dict(job, **setup)
+            result, refused = _run_in_subinterpreter(runner, job)
+            if refused:
+                print('Extension modules {} refused to load in a '
+                      'sub-interpreter; refusing all further jobs'.format(
+                          ', '.join(refused)),
+                      file=sys.stderr)
+                runner = None
+                result = None
+
+        reply(protocol, result)
+
+    return os.EX_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Run code in sub-interpreters, where Python supports it.
+
+Since Python 3.12 a sub-interpreter can have its own GIL, and its own
+`sys.modules`, so code run in a fresh sub-interpreter is isolated much as if
+it were run in a fresh process. The API for this is private until Python 3.14
+(`concurrent.interpreters`) and differs between versions, so `get_runner()`
+wraps whichever one is available.
+
+Nothing here imports anything beyond the standard library.
+"""
+
+import sys
+
+
+class InterpreterError(Exception):
+    "Code run in a sub-interpreter raised an exception."
+
+
+def _concurrent_interpreters_runner():
+    "A runner for the public API of Python 3.14 and later."
+    from concurrent import interpreters  # pylint: disable=import-error
+
+    def run(code):
+        interp = interpreters.create()
+        try:
+            interp.exec(code)
+        except interpreters.ExecutionFailed as exc:
+            raise InterpreterError(str(exc)) from None
+        finally:
+            interp.close()
+
+    return run
+
+
+def _interpreters_runner():
+    "A runner for the private API of Python 3.13."
+    import _interpreters  # pylint: disable=import-error
+
+    def run(code):
+        interp = _interpreters.create('isolated')
+        try:
+            excinfo = _interpreters.exec(interp, code)
+        finally:
+            _interpreters.destroy(interp)
+        if excinfo is not None:
+            raise InterpreterError(excinfo.formatted)
+
+    return run
+
+
+def _xxsubinterpreters_runner():
+    "A runner for the private API of Python 3.12."
+    import _xxsubinterpreters  # pylint: disable=import-error
+
+    def run(code):
+        interp = _xxsubinterpreters.create(isolated=True)
+        try:
+            _xxsubinterpreters.run_string(interp, code)
+        except _xxsubinterpreters.RunFailedError as exc:
+            raise InterpreterError(str(exc)) from None
+        finally:
+            _xxsubinterpreters.destroy(interp)
+
+    return run
+
+
+def get_runner():
+    """Get a function which runs code in a fresh sub-interpreter.
+
+    The function takes a string of source code. It runs the code in a new
+    sub-interpreter with its own GIL, waits for it to finish, and destroys the
+    sub-interpreter. If the code raises an exception, the function raises an
+    `InterpreterError` describing it.
+
+    Returns: The function, or `None` if this version of Python doesn't support
+        sub-interpreters with their own GIL.
+    """
+    if sys.version_info >= (3, 14):
+        factory = _concurrent_interpreters_runner
+    elif sys.version_info >= (3, 13):
+        factory = _interpreters_runner
+    elif sys.version_info >= (3, 12):
+        factory = _xxsubinterpreters_runner
+    else:
+        return None
+
+    try:
+        return factory()
+    except ImportError:
+        return None
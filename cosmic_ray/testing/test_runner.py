@@ -14,6 +14,15 @@ class TestOutcome:
     KILLED = 'killed'
     INCOMPETENT = 'incompetent'
 
+    # The mutant is known to behave exactly like the unmutated code, so it
+    # wasn't tested. See `cosmic_ray.bundle`.
+    EQUIVALENT = 'equivalent'
+
+    # The mutant never changed the value of the expression it mutates while
+    # the tests ran, so it survived without being tested. See
+    # `cosmic_ray.infection`.
+    NOT_INFECTED = 'not-infected'
+
 
 class TestRunner(metaclass=abc.ABCMeta):
     """Specifies the interface for test runners in the system.
@@ -25,6 +34,10 @@ class TestRunner(metaclass=abc.ABCMeta):
 
     def __init__(self, test_args):
         self._test_args = test_args
+        self._tests = None
+        self._priority_tests = []
+        self._listeners = []
+        self._failed_tests = []
 
     @property
     def test_args(self):
@@ -35,6 +48,72 @@ class TestRunner(metaclass=abc.ABCMeta):
         """
         return self._test_args
 
+    @property
+    def tests(self):
+        """The IDs of the tests to run, or `None` to run all of the tests.
+
+        Test IDs are whatever the concrete `TestRunner` reports to its
+        listeners, e.g. `TestCase.id()` for unittest or node IDs for pytest.
+        Implementations of `_run()` must only run these tests when this is not
+        `None`.
+        """
+        return self._tests
+
+    @tests.setter
+    def tests(self, tests):
+        self._tests = None if tests is None else list(tests)
+
+    @property
+    def priority_tests(self):
+        """The IDs of tests to run before any others, in the order to run them.
+
+        Runners typically stop at the first failure, so running the tests
+        most likely to kill a mutant first makes killed mutants finish sooner.
+        Tests in this list which aren't otherwise being run are ignored.
+        Implementations of `_run()` should honor this where they can.
+        """
+        return self._priority_tests
+
+    @priority_tests.setter
+    def priority_tests(self, tests):
+        self._priority_tests = list(tests or ())
+
+    def _sort_key(self):
+        """Get a function mapping test IDs to sort keys which put
+        `priority_tests` first.
+        """
+        ranks = {test_id: rank
+                 for rank, test_id in enumerate(self._priority_tests)}
+        default = len(ranks)
+        return lambda test_id: ranks.get(test_id, default)
+
+    def add_listener(self, listener):
+        """Register `listener` to be notified as each test starts and stops.
+
+        `listener` must have `start_test(test_id)` and `stop_test(test_id)`
+        methods. Implementations of `_run()` are responsible for calling
+        `_start_test()` and `_stop_test()` around each test.
+        """
+        self._listeners.append(listener)
+
+    def _start_test(self, test_id):
+        "Tell listeners that the test `test_id` is starting."
+        for listener in self._listeners:
+            listener.start_test(test_id)
+
+    def _stop_test(self, test_id):
+        "Tell listeners that the test `test_id` has finished."
+        for listener in self._listeners:
+            listener.stop_test(test_id)
+
+    def _test_failed(self, test_id):
+        """Record that the test `test_id` failed.
+
+        Implementations of `_run()` should call this for each failing test.
+        The first one is reported as the `killed_by` of the results.
+        """
+        self._failed_tests.append(test_id)
+
     @abc.abstractmethod
     def _run(self):
         """Run all of the tests and return the results.
@@ -50,8 +129,9 @@ class TestRunner(metaclass=abc.ABCMeta):
         """Call `_run()` and return a `WorkItem` with the results.
 
         Returns: A `WorkItem` with the `test_outcome` and `data` fields
-            filled in.
+            filled in, along with `killed_by` if a test failed.
         """
+        self._failed_tests = []
         try:
             test_result = self._run()
             if test_result[0]:
@@ -60,7 +140,8 @@ class TestRunner(metaclass=abc.ABCMeta):
                     data=test_result[1])
             return WorkItem(
                 test_outcome=TestOutcome.KILLED,
-                data=test_result[1])
+                data=test_result[1],
+                killed_by=next(iter(self._failed_tests), None))
         except Exception:  # pylint: disable=broad-except
             return WorkItem(
                 test_outcome=TestOutcome.INCOMPETENT,
@@ -6,6 +6,43 @@ from itertools import chain
 from .test_runner import TestRunner
 
 
+def _iter_tests(suite):
+    "Generate the individual tests in a (possibly nested) `TestSuite`."
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_tests(test)
+        else:
+            yield test
+
+
+class _ListeningResult(unittest.TestResult):
+    "A `TestResult` which tells a `TestRunner` when tests start and stop."
+
+    def __init__(self, runner):
+        super().__init__()
+        self._runner = runner
+
+    def startTest(self, test):  # noqa # pylint: disable=invalid-name
+        super().startTest(test)
+        self._runner._start_test(  # pylint: disable=protected-access
+            test.id())
+
+    def stopTest(self, test):  # noqa # pylint: disable=invalid-name
+        self._runner._stop_test(  # pylint: disable=protected-access
+            test.id())
+        super().stopTest(test)
+
+    def addError(self, test, err):  # noqa # pylint: disable=invalid-name
+        self._runner._test_failed(  # pylint: disable=protected-access
+            test.id())
+        super().addError(test, err)
+
+    def addFailure(self, test, err):  # noqa # pylint: disable=invalid-name
+        self._runner._test_failed(  # pylint: disable=protected-access
+            test.id())
+        super().addFailure(test, err)
+
+
 class UnittestRunner(TestRunner):
     """A TestRunner using `unittest`'s discovery mechanisms.
 
@@ -14,11 +51,25 @@ class UnittestRunner(TestRunner):
 
     All elements in `test_args` after the first are ignored.
 
+    Test IDs are those returned by `TestCase.id()`.
     """
 
     def _run(self):
         suite = unittest.TestLoader().discover(self.test_args)
-        result = unittest.TestResult()
+
+        if self.tests is not None:
+            wanted = set(self.tests)
+            suite = unittest.TestSuite(
+                test for test in _iter_tests(suite)
+                if test.id() in wanted)
+
+        if self.priority_tests:
+            # The sort is stable, so the other tests keep discovery order.
+            sort_key = self._sort_key()
+            suite = unittest.TestSuite(sorted(
+                _iter_tests(suite), key=lambda test: sort_key(test.id())))
+
+        result = _ListeningResult(self)
         result.failfast = True
         suite.run(result)
 
@@ -5,6 +5,7 @@ generic functionality.
 """
 
 import datetime
+import time
 
 
 class Timer:
@@ -40,3 +41,64 @@ class Timer:
 
     def __exit__(self, ex_type, ex_value, ex_traceback):
         pass
+
+
+class TestTimer:
+    """Records how long each test takes.
+
+    This is a test-runner listener (see `TestRunner.add_listener()`). After
+    the tests have run, `durations` maps each test ID to the number of seconds
+    the test took.
+    """
+
+    def __init__(self):
+        self._start = None
+        self.durations = {}
+
+    def start_test(self, test_id):  # pylint: disable=unused-argument
+        "Start timing a test."
+        self._start = time.perf_counter()
+
+    def stop_test(self, test_id):
+        "Stop timing the test `test_id`."
+        self.durations[test_id] = (self.durations.get(test_id, 0.0) +
+                                   time.perf_counter() - self._start)
+
+
+class Timeouts:
+    """Timeouts for runs of all or part of a test suite, derived from the
+    durations of the individual tests in a baseline run.
+
+    The timeout for running some set of tests is `multiplier` times the time
+    those tests took in the baseline plus the baseline's overhead (i.e. the time
+    spent outside of any test, starting the interpreter, discovering tests and
+    so on), but never less than `floor`.
+    """
+
+    def __init__(self, durations, overhead, multiplier, floor):
+        """
+        Args:
+          durations: A dict mapping test IDs to the seconds each took in the
+            baseline.
+          overhead: The seconds the baseline spent outside of any test.
+          multiplier: The factor by which to multiply the baseline timings.
+          floor: The minimum timeout in seconds.
+        """
+        self._durations = durations
+        self._overhead = overhead
+        self._multiplier = multiplier
+        self._floor = floor
+
+    def __call__(self, tests=None):
+        """Get the timeout for running `tests`.
+
+        Args:
+          tests: An iterable of test IDs, or `None` for all of the tests.
+
+        Returns: The timeout in seconds.
+        """
+        if tests is None:
+            tests = self._durations
+        elapsed = self._overhead + sum(
+            self._durations.get(test_id, 0.0) for test_id in tests)
+        return max(self._floor, self._multiplier * elapsed)
@@ -0,0 +1,324 @@
+"""Record the types of the operands of the operators in the code under test.
+
+`MutateBinaryOperator` replaces each binary operator with every other one,
+whatever the types of its operands. For strings, lists and many other types
+most of those replacements just raise `TypeError`, e.g. `'a' - 'b'`, which
+costs a worker and a test run to find out. When type profiling is enabled, the
+baseline run instruments the modules under test as they're imported so that
+each binary and unary operation records the types of its operands. A
+replacement operator which none of the types recorded at a site supports can't
+do anything but raise `TypeError`, so `init` reports such mutants as
+incompetent without running them.
+
+An operator is only considered unsupported if that's certain. If neither
+operand's type has the special method for it, e.g. `__sub__` for the left
+operand of `-` or `__rsub__` for the right one, it's unsupported. Beyond that,
+operations on the built-in types are tried out on their default values, e.g.
+`'' * ''`, since whether those raise `TypeError` depends only on the types.
+(The exception is `%` for strings, where it depends on the format.) Operations
+on any other types are assumed to work if the special methods exist, since
+they can do anything.
+
+A type profile is a dict mapping source filenames to dicts mapping the `(line
+number, column offset, end line number, end column offset)` of each operation
+which was executed to the set of names of the `ast` operator classes, e.g.
+`'Sub'`, which the types recorded there support. The whole span is needed since
+nested operations can start at the same position, e.g. `-a` in `-a + b`.
+Operations which weren't executed aren't listed.
+"""
+
+import ast
+import importlib.machinery
+import operator
+import os
+import sys
+
+from .parsing import literal
+
+# The functions which perform the binary operators, and the special methods
+# of the left and right operands which implement them.
+_BINARY_OPERATORS = {
+    'Add': (operator.add, '__add__', '__radd__'),
+    'Sub': (operator.sub, '__sub__', '__rsub__'),
+    'Mult': (operator.mul, '__mul__', '__rmul__'),
+    'MatMult': (operator.matmul, '__matmul__', '__rmatmul__'),
+    'Div': (operator.truediv, '__truediv__', '__rtruediv__'),
+    'FloorDiv': (operator.floordiv, '__floordiv__', '__rfloordiv__'),
+    'Mod': (operator.mod, '__mod__', '__rmod__'),
+    'Pow': (operator.pow, '__pow__', '__rpow__'),
+    'LShift': (operator.lshift, '__lshift__', '__rlshift__'),
+    'RShift': (operator.rshift, '__rshift__', '__rrshift__'),
+    'BitOr': (operator.or_, '__or__', '__ror__'),
+    'BitXor': (operator.xor, '__xor__', '__rxor__'),
+    'BitAnd': (operator.and_, '__and__', '__rand__'),
+}
+
+# The functions which perform the unary operators, and the special methods
+# which implement them. `not` works for every object.
+_UNARY_OPERATORS = {
+    'UAdd': (operator.pos, '__pos__'),
+    'USub': (operator.neg, '__neg__'),
+    'Invert': (operator.invert, '__invert__'),
+    'Not': (operator.not_, None),
+}
+
+# The name by which instrumented modules refer to the `TypeProfiler`.
+_PROFILER_NAME = '__cosmic_ray_types__'
+
+# Built-in types for which whether an operator raises `TypeError` depends on
+# the operands' values, not just their types.
+_VALUE_DEPENDENT = {
+    'Mod': (str, bytes, bytearray),
+}
+
+
+def _has_method(type_, name):
+    """Whether instances of `type_` have the special method `name`.
+
+    Special methods are looked up on the type, so unlike `hasattr()` this
+    doesn't consider those of its metaclass, e.g. `type.__or__`.
+    """
+    return any(name in vars(klass) for klass in type_.__mro__)
+
+
+def _default_values(types):
+    """Get the default value of each of `types`, e.g. `0` for `int`.
+
+    Returns: A list of the values, or `None` unless all of `types` are
+      built-in types which can be constructed without arguments.
+    """
+    values = []
+    for type_ in types:
+        if getattr(type_, '__module__', None) != 'builtins':
+            return None
+        try:
+            values.append(type_())
+        except Exception:  # noqa # pylint: disable=broad-except
+            return None
+    return values
+
+
+def _supports(function, op_name, types):
+    """Whether an operator `op_name`, performed by `function`, can work with
+    operands of `types`, given that one of them has a special method for it.
+    """
+    if issubclass(types[0], _VALUE_DEPENDENT.get(op_name, ())):
+        return True
+    values = _default_values(types)
+    if values is None:
+        return True
+    try:
+        function(*values)
+    except TypeError:
+        return False
+    except Exception:  # noqa # pylint: disable=broad-except
+        # e.g. ZeroDivisionError
+        return True
+    return True
+
+
+def supported_operators(operand_types):
+    """Get the operators which some combination of operand types supports.
+
+    Args:
+      operand_types: An iterable of tuples of types, one for each operand:
+        `(left, right)` for binary operators and `(operand,)` for unary ones.
+
+    Returns: A set of the names of the `ast` operator classes.
+    """
+    supported = set()
+    for types in operand_types:
+        if len(types) == 2:
+            left, right = types
+            supported.update(
+                name
+                for name, (function, method, reflected)
+                in _BINARY_OPERATORS.items()
+                if (_has_method(left, method) or
+                    _has_method(right, reflected)) and
+                _supports(function, name, types))
+        else:
+            supported.update(
+                name
+                for name, (function, method) in _UNARY_OPERATORS.items()
+                if method is None or (_has_method(types[0], method) and
+                                      _supports(function, name, types)))
+    return supported
+
+
+def replacement_operator(node_type, replacement):
+    """Get the operator a mutant of a `BinOp` or `UnaryOp` replaces the
+    original with.
+
+    Args:
+      node_type: The type of the mutated node, as in `WorkItem.node_type`.
+      replacement: The source of the mutated node, as in
+        `WorkItem.replacement`.
+
+    Returns: The name of the `ast` class of the new operator, or `None` if the
+      mutant isn't a replacement of one of these operators with another, e.g.
+      because it removes a unary operator.
+    """
+    if node_type not in ('BinOp', 'UnaryOp') or not replacement:
+        return None
+    try:
+        node = ast.parse(replacement.strip(), mode='eval').body
+    except SyntaxError:
+        return None
+
+    if node_type == 'BinOp' and isinstance(node, ast.BinOp):
+        return type(node.op).__name__
+    # If the operand is itself a unary operation, we can't tell the
+    # replacement of the outer operator from its removal.
+    if node_type == 'UnaryOp' and isinstance(node, ast.UnaryOp) and \
+            not isinstance(node.operand, ast.UnaryOp):
+        return type(node.op).__name__
+    return None
+
+
+class OperationInstrumenter(ast.NodeTransformer):
+    """Replaces the binary and unary operations in a module with calls to the
+    `TypeProfiler`.
+
+    Each call is passed the operation's site, i.e. a tuple of the filename
+    and the operation's start and end positions, the name of its operator and
+    its operands.
+    """
+
+    def __init__(self, filename):
+        self._filename = filename
+
+    def _call(self, method, node, op, args):
+        """Make a call to the profiler's `method` to replace `node`, whose
+        operator is `op`.
+        """
+        site = literal(
+            (self._filename, node.lineno, node.col_offset,
+             getattr(node, 'end_lineno', None),
+             getattr(node, 'end_col_offset', None)))
+        call = ast.Call(
+            func=ast.Attribute(
+                value=ast.Name(id=_PROFILER_NAME, ctx=ast.Load()),
+                attr=method,
+                ctx=ast.Load()),
+            args=[site, literal(type(op).__name__)] + args,
+            keywords=[])
+        return ast.copy_location(call, node)
+
+    def visit_BinOp(self, node):  # pylint: disable=invalid-name
+        "Replace `node` with a call to `TypeProfiler.binary()`."
+        self.generic_visit(node)
+        return self._call('binary', node, node.op, [node.left, node.right])
+
+    def visit_UnaryOp(self, node):  # pylint: disable=invalid-name
+        "Replace `node` with a call to `TypeProfiler.unary()`."
+        self.generic_visit(node)
+        return self._call('unary', node, node.op, [node.operand])
+
+
+class _ProfilingLoader:
+    """An `importlib.abc.Loader` which loads a source file instrumented by a
+    profiler's `instrumenter`.
+
+    This never reads or writes cached bytecode, so the instrumented code
+    doesn't end up in `__pycache__`.
+    """
+
+    def __init__(self, profiler, filename):
+        self._profiler = profiler
+        self._filename = filename
+
+    def create_module(self,  # pylint: disable=no-self-use
+                      spec):  # pylint: disable=unused-argument
+        "Default module creation semantics."
+        return None
+
+    def exec_module(self, mod):
+        "Instrument the module's source and execute it into `mod`."
+        with open(self._filename, 'rb') as handle:
+            module_ast = ast.parse(handle.read(), self._filename)
+        module_ast = ast.fix_missing_locations(
+            self._profiler.instrumenter(self._filename).visit(module_ast))
+        code = compile(module_ast, self._filename, 'exec')
+        mod.__dict__[_PROFILER_NAME] = self._profiler
+        exec(code, mod.__dict__)  # pylint:disable=exec-used
+
+
+class TypeProfiler:
+    """Records the types of the operands of the binary and unary operations in
+    the source files under `roots`.
+
+    This is a context manager which, for the duration of the `with`-block,
+    installs a finder at the head of `sys.meta_path` which instruments those
+    modules as they're imported. Modules which are already imported aren't
+    affected.
+
+    After profiling, `types` maps the site (see `OperationInstrumenter`) of
+    each executed operation to the set of tuples of its operands' types.
+    """
+
+    # The `ast.NodeTransformer` class which instruments modules.
+    instrumenter = OperationInstrumenter
+
+    def __init__(self, roots):
+        self._roots = tuple(os.path.realpath(root) for root in roots)
+        self.types = {}
+
+    def binary(self, site, op_name, left, right):
+        "Record the types of `left` and `right`, and apply the operator."
+        self.types.setdefault(site, set()).add((type(left), type(right)))
+        return _BINARY_OPERATORS[op_name][0](left, right)
+
+    def unary(self, site, op_name, operand):
+        "Record the type of `operand`, and apply the operator."
+        self.types.setdefault(site, set()).add((type(operand),))
+        return _UNARY_OPERATORS[op_name][0](operand)
+
+    def _is_profiled(self, filename):
+        "Whether the source file `filename` is under one of our roots."
+        path = os.path.realpath(filename)
+        return any(path == root or path.startswith(root + os.sep)
+                   for root in self._roots)
+
+    def find_spec(self, fullname, path, target=None):
+        "Find modules under our roots, giving them a `_ProfilingLoader`."
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path, target)
+        if spec is None or \
+                not isinstance(spec.loader,
+                               importlib.machinery.SourceFileLoader) or \
+                not self._is_profiled(spec.origin):
+            return None
+        spec.loader = _ProfilingLoader(self, spec.origin)
+        return spec
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.meta_path.remove(self)
+
+    def to_json(self):
+        """Get the type profile (see the module docstring) in a
+        JSON-serializable form.
+        """
+        profile = {}
+        for (filename, *span), types in self.types.items():
+            sites = profile.setdefault(os.path.realpath(filename), {})
+            site = ':'.join(str(position) for position in span)
+            sites[site] = sorted(
+                set(sites.get(site, ())) | supported_operators(types))
+        return profile
+
+
+def type_profile_from_json(data):
+    "Convert the output of `TypeProfiler.to_json()` into a type profile."
+    profile = {}
+    for filename, sites in data.items():
+        profile[filename] = {}
+        for site, operators in sites.items():
+            span = tuple(
+                None if position == 'None' else int(position)
+                for position in site.split(':'))
+            profile[filename].setdefault(span, set()).update(operators)
+    return profile
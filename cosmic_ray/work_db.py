@@ -1,15 +1,65 @@
 """Implementation of the WorkDB."""
 
 import contextlib
+import json
 import os
+import sqlite3
 from enum import Enum
 
-# This db may well not scale very well. We need to be ready to switch it out
-# for something quicker if not. But for now it's *very* convenient.
-import tinydb
-
 from .work_item import WorkItem
 
+# The fields of a WorkItem, in column order.
+_WORK_ITEM_FIELDS = tuple(WorkItem().keys())
+
+# Fields which hold structured (i.e. non-scalar) data. These are stored as
+# JSON text in their columns.
+_JSON_FIELDS = frozenset(('data', 'diff', 'command_line', 'covering_tests',
+                          'priority_tests'))
+
+# Columns which we query on and therefore index.
+_INDEXED_FIELDS = ('worker_outcome', 'module', 'duplicate_of')
+
+# The fields of a work item's results, which are copied to its duplicates.
+# Duplicates keep their own diffs, since they mutate other sites.
+_RESULT_FIELDS = ('data', 'test_outcome', 'worker_outcome', 'killed_by')
+
+
+# The first bytes of every SQLite database file.
+_SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+class SessionFormatError(Exception):
+    """Raised when a session file is not an SQLite database, e.g. because it
+    was written as JSON by an older version of Cosmic Ray.
+    """
+
+
+def _check_format(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+
+    with open(path, 'rb') as handle:
+        header = handle.read(len(_SQLITE_HEADER))
+
+    if header != _SQLITE_HEADER:
+        raise SessionFormatError(
+            '{} is not a Cosmic Ray session database. It may have been '
+            'created by an older version of Cosmic Ray, which stored '
+            'sessions as JSON. Remove it and run "cosmic-ray init" '
+            'again.'.format(path))
+
+
+def _encode(field, value):
+    if value is None or field not in _JSON_FIELDS:
+        return value
+    return json.dumps(value)
+
+
+def _decode(field, value):
+    if value is None or field not in _JSON_FIELDS:
+        return value
+    return json.loads(value)
+
 
 class WorkDB:
     """WorkDB is the database that keeps track of mutation testing work progress.
@@ -17,6 +67,11 @@ class WorkDB:
     Essentially, there's a row in the DB for each mutation that needs to be
     executed in some run. These initially start off with no results, and
     results are added as they're completed.
+
+    The DB is stored in an SQLite file. Each `WorkItem` field has its own
+    column, `job_id` is the primary key, and the columns we query on are
+    indexed, so looking up or updating a single item does not depend on the
+    size of the session.
     """
     class Mode(Enum):
         "Modes in which a WorkDB may be opened."
@@ -27,6 +82,10 @@ class WorkDB:
         # Open only existing files, failing if it doesn't exist
         open = 2
 
+    # The number of `update_work_item()` calls which are grouped into a single
+    # transaction. Pending updates are always committed on `close()`.
+    commit_interval = 100
+
     def __init__(self, path, mode):
         """Open a DB in file `path` in mode `mode`.
 
@@ -38,17 +97,60 @@ class WorkDB:
         Raises:
           FileNotFoundError: If `mode` is `Mode.open` and `path` does not
             exist.
+          PermissionError: If `path` exists but can't be read and written.
+          SessionFormatError: If `path` exists but is not an SQLite
+            database, e.g. a JSON session from an older version.
         """
         if (mode == WorkDB.Mode.open) and (not os.path.exists(path)):
             raise FileNotFoundError(
                 'Requested file {} not found'.format(path))
 
+        if os.path.exists(path) and not os.access(path, os.R_OK | os.W_OK):
+            raise PermissionError(
+                'Insufficient permissions for file {}'.format(path))
+
+        _check_format(path)
+
         self._path = path
-        self._db = tinydb.TinyDB(path)
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._init_db()
+
+    def _init_db(self):
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS config '
+                '(config TEXT, timeout REAL)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS work_items '
+                '(job_id TEXT PRIMARY KEY)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS coverage '
+                '(module TEXT, line INTEGER, test_id TEXT)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS module_digests '
+                '(module TEXT PRIMARY KEY, digest TEXT)')
+
+            # Add any columns which are missing, e.g. because the DB was
+            # created by a version with fewer WorkItem fields.
+            existing = {row[1] for row in self._conn.execute(
+                'PRAGMA table_info(work_items)')}
+            for field in _WORK_ITEM_FIELDS:
+                if field not in existing:
+                    self._conn.execute(
+                        'ALTER TABLE work_items ADD COLUMN {}'.format(field))
+
+            for field in _INDEXED_FIELDS:
+                self._conn.execute(
+                    'CREATE INDEX IF NOT EXISTS work_items_{0} '
+                    'ON work_items ({0})'.format(field))
 
     def close(self):
         """Close the database."""
-        self._db.close()
+        self._conn.commit()
+        self._conn.close()
 
     @property
     def name(self):
@@ -58,27 +160,23 @@ class WorkDB:
         """
         return self._path
 
-    @property
-    def _config(self):
-        """The table of work parameters."""
-        return self._db.table('config')
+    def _select(self, where='', fields=_WORK_ITEM_FIELDS):
+        query = 'SELECT {} FROM work_items {}'.format(
+            ', '.join(fields), where)
+        return self._conn.execute(query)
 
-    @property
-    def _work_items(self):
-        """The table of work items."""
-        return self._db.table('work-items')
+    @staticmethod
+    def _to_work_item(row, fields=_WORK_ITEM_FIELDS):
+        return WorkItem({
+            field: _decode(field, value)
+            for field, value in zip(fields, row)
+        })
 
-    @property
-    def _pending(self):
-        table = self._work_items
-        work_item = tinydb.Query()
-        # This somewhat tortured invocation is intended to appease linters.
-        # They *hate* seeing "x == None" which is the natural expression of
-        # this query, so we use this custom test instead.
-        pending = table.search(
-            work_item.worker_outcome.test(
-                lambda val: val is None))
-        return pending
+    def _commit_periodically(self):
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_interval:
+            self._conn.commit()
+            self._uncommitted = 0
 
     def set_config(self, config, timeout):
         """Set (replace) the configuration for the session.
@@ -87,12 +185,11 @@ class WorkDB:
           config: Configuration object
           timeout: The timeout for tests.
         """
-        table = self._config
-        table.purge()
-        table.insert({
-            'config': config,
-            'timeout': timeout,
-        })
+        with self._conn:
+            self._conn.execute('DELETE FROM config')
+            self._conn.execute(
+                'INSERT INTO config VALUES (?, ?)',
+                (json.dumps(config), timeout))
 
     def get_config(self):
         """Get the work parameters (if set) for the session.
@@ -102,15 +199,67 @@ class WorkDB:
         Raises:
           ValueError: If is no config set for the session.
         """
-        table = self._config
+        row = self._conn.execute(
+            'SELECT config, timeout FROM config').fetchone()
 
-        try:
-            record = table.all()[0]
-        except IndexError:
+        if row is None:
             raise ValueError('work-db has no config')
 
-        return (record['config'],
-                record['timeout'])
+        return (json.loads(row[0]),
+                row[1])
+
+    def set_coverage(self, coverage):
+        """Set (replace) the test coverage of the modules under test.
+
+        Args:
+          coverage: A dict mapping module names to dicts mapping line numbers
+            to lists of the IDs of the tests which execute the line. A test ID
+            of `None` means the line is executed outside of any test. See
+            `cosmic_ray.coverage_map`.
+        """
+        with self._conn:
+            self._conn.execute('DELETE FROM coverage')
+            self._conn.executemany(
+                'INSERT INTO coverage VALUES (?, ?, ?)',
+                ((module, line, test_id)
+                 for module, lines in coverage.items()
+                 for line, test_ids in lines.items()
+                 for test_id in test_ids))
+
+    def get_coverage(self):
+        """Get the test coverage of the modules under test.
+
+        Returns: A dict in the form accepted by `set_coverage()`. This is empty
+          if no coverage has been recorded for the session.
+        """
+        coverage = {}
+        for module, line, test_id in self._conn.execute(
+                'SELECT module, line, test_id FROM coverage'):
+            coverage.setdefault(module, {}).setdefault(line, []).append(
+                test_id)
+        return coverage
+
+    def set_module_digests(self, digests):
+        """Set (replace) the digests of the modules under test.
+
+        Args:
+          digests: A dict mapping module names to digest strings. See
+            `cosmic_ray.digests`.
+        """
+        with self._conn:
+            self._conn.execute('DELETE FROM module_digests')
+            self._conn.executemany(
+                'INSERT INTO module_digests VALUES (?, ?)',
+                digests.items())
+
+    def get_module_digests(self):
+        """Get the digests of the modules under test.
+
+        Returns: A dict in the form accepted by `set_module_digests()`. This is
+          empty if no digests have been recorded for the session.
+        """
+        return dict(self._conn.execute(
+            'SELECT module, digest FROM module_digests'))
 
     def add_work_items(self, work_items):
         """Add a sequence of WorkItems.
@@ -118,54 +267,141 @@ class WorkDB:
         Args:
           work_items: An iterable of WorkItems.
         """
-        self._work_items.insert_multiple(work_items)
-
-    def clear_work_items(self):
-        """Clear all work items from the session.
+        query = 'INSERT INTO work_items ({}) VALUES ({})'.format(
+            ', '.join(_WORK_ITEM_FIELDS),
+            ', '.join('?' for _ in _WORK_ITEM_FIELDS))
+        with self._conn:
+            self._conn.executemany(
+                query,
+                (tuple(_encode(field, WorkItem(item)[field])
+                       for field in _WORK_ITEM_FIELDS)
+                 for item in work_items))
+
+    def clear_work_items(self, modules=None):
+        """Clear work items from the session.
 
         This removes any associated results as well.
+
+        Args:
+          modules: The names of the modules whose work items should be
+            cleared. If this is `None`, all work items are cleared.
         """
-        self._work_items.purge()
+        with self._conn:
+            if modules is None:
+                self._conn.execute('DELETE FROM work_items')
+            else:
+                self._conn.executemany(
+                    'DELETE FROM work_items WHERE module = ?',
+                    ((module,) for module in modules))
 
     @property
     def work_items(self):
         """The sequence of WorkItems in the session.
 
-        This include both complete and incomplete items.
+        This include both complete and incomplete items. See
+        `iter_work_items()`.
+        """
+        return self.iter_work_items()
+
+    def iter_work_items(self, fields=None):
+        """Generate the WorkItems in the session.
 
-        Each work item is a dict with the keys `module-name`, `op-name`, and
-        `occurrence`. Items with results will also have the keys `results-type`
-        and `results-data`.
+        The items are read from the DB as they are generated, so memory use
+        doesn't depend on the size of the session. This includes both complete
+        and incomplete items.
+
+        Args:
+          fields: The names of the `WorkItem` fields to read. The other fields
+            of the generated items are `None`. If this is `None`, all fields
+            are read.
+
+        Raises:
+          ValueError: If `fields` includes a name which isn't a `WorkItem`
+            field.
         """
-        return (WorkItem(r) for r in self._work_items)
+        if fields is None:
+            fields = _WORK_ITEM_FIELDS
+        else:
+            fields = tuple(fields)
+            unknown = set(fields) - set(_WORK_ITEM_FIELDS)
+            if unknown:
+                raise ValueError('Unknown WorkItem fields: {}'.format(
+                    ', '.join(sorted(unknown))))
+
+        for row in self._select(fields=fields):
+            yield self._to_work_item(row, fields)
 
     @property
     def num_work_items(self):
         """The number of WorkItems."""
-        return len(self._work_items)
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM work_items').fetchone()[0]
 
     def update_work_item(self, work_item):
         """Updates an existing WorkItem by job_id.
 
+        Updates are grouped into transactions of `commit_interval` updates, so
+        a crash may lose the most recent results. Those items simply remain
+        pending.
+
+        The work items which are duplicates of this one (i.e. whose
+        `duplicate_of` is its `job_id`) get the same results.
+
         Args:
             work_item: A WorkItem representing the new state of a job.
 
         Raises:
           KeyError: If there is no existing record with the same job_id.
         """
-        self._work_items.update(
-            work_item,
-            tinydb.Query().job_id == work_item.job_id)
+        fields = [field for field in _WORK_ITEM_FIELDS if field != 'job_id']
+        query = 'UPDATE work_items SET {} WHERE job_id = ?'.format(
+            ', '.join('{} = ?'.format(field) for field in fields))
+        cursor = self._conn.execute(
+            query,
+            [_encode(field, work_item[field]) for field in fields] +
+            [work_item.job_id])
+
+        if cursor.rowcount == 0:
+            raise KeyError('no work item with job_id {}'.format(
+                work_item.job_id))
+
+        self._conn.execute(
+            'UPDATE work_items SET {} WHERE duplicate_of = ?'.format(
+                ', '.join('{} = ?'.format(field) for field in _RESULT_FIELDS)),
+            [_encode(field, work_item[field]) for field in _RESULT_FIELDS] +
+            [work_item.job_id])
+
+        self._commit_periodically()
 
     @property
     def pending_work_items(self):
-        """The sequence of pending WorkItems in the session."""
-        return (WorkItem(r) for r in self._pending)
+        """The sequence of pending WorkItems in the session.
+
+        Duplicates of other work items aren't included, since they get their
+        results from those items.
+
+        Work items come in the order in which they were added, except that
+        those with a `kill_probability` come in order of how uncertain it is,
+        closest to 0.5 first, after those without one.
+        """
+        # We fetch all of the rows up front. Callers typically update items
+        # while iterating over this sequence, and SQLite doesn't guarantee
+        # what a query sees when its table is modified during iteration.
+        rows = self._select(
+            'WHERE worker_outcome IS NULL AND duplicate_of IS NULL '
+            'ORDER BY abs(kill_probability - 0.5), rowid').fetchall()
+        return (self._to_work_item(row) for row in rows)
 
     @property
     def num_pending_work_items(self):
-        """The number of pending WorkItems in the session."""
-        return len(self._pending)
+        """The number of pending WorkItems in the session.
+
+        As for `pending_work_items`, duplicates aren't counted.
+        """
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM work_items '
+            'WHERE worker_outcome IS NULL AND duplicate_of IS NULL'
+        ).fetchone()[0]
 
 
 @contextlib.contextmanager
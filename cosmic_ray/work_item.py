@@ -116,6 +116,57 @@ WorkItem = make_record(  # pylint: disable=invalid-name
         # The line number at which the operator was applied.
         'line_number',
 
+        # The column at which the mutated node starts.
+        'col_offset',
+
+        # The line and column at which the mutated node ends. These are only
+        # available on Python 3.8 and later.
+        'end_line_number',
+        'end_col_offset',
+
+        # The type name of the mutated AST node, e.g. "Compare".
+        'node_type',
+
+        # The number of blocks (functions, loops, etc.) the mutated node is
+        # nested in.
+        'nesting_depth',
+
+        # The source of the mutated node (or just its header for compound
+        # statements).
+        'replacement',
+
+        # The IDs of the tests to run against the mutant, or None to run all of
+        # them. See `cosmic_ray.coverage_map`.
+        'covering_tests',
+
+        # The IDs of tests to run first since they're likely to kill the
+        # mutant, e.g. because they killed other mutants on the same line.
+        'priority_tests',
+
+        # The ID of the (first) test which killed the mutant.
+        'killed_by',
+
+        # The timeout, in seconds, for testing the mutant. If this is None the
+        # session's timeout applies.
+        'timeout',
+
+        # The path of the mutant's compiled code in the session's bundle, if
+        # it has one. See `cosmic_ray.bundle`.
+        'bundle_entry',
+
+        # The job_id of another work item whose mutant compiles to the same
+        # code as this one's. This item isn't run; it gets that item's results.
+        'duplicate_of',
+
+        # The predicted probability that the tests kill the mutant. See
+        # `cosmic_ray.kill_model`.
+        'kill_probability',
+
+        # The lane in which execution engines which support lanes run this
+        # item, apart from the items in other lanes, or None for the main
+        # lane. See `cosmic_ray.loop_exits`.
+        'lane',
+
         'command_line',
         'job_id'
     ],
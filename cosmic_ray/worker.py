@@ -7,16 +7,15 @@ one location with one operator, runs the tests, reports the results, and dies.
 import difflib
 import importlib
 import inspect
+import itertools
 import json
 import logging
-import subprocess
 import sys
 import traceback
 
 import astunparse
 
-from .config import serialize_config
-from .importing import preserve_modules, using_ast
+from .importing import preserve_modules, using_ast, using_code
 from .mutating import MutatingCore
 from .parsing import get_ast
 from .testing.test_runner import TestOutcome
@@ -27,23 +26,71 @@ log = logging.getLogger()
 
 class WorkerOutcome:
     """Possible outcomes for a worker.
+
+    SKIPPED means that the work item was given a test outcome without
+    running any tests, e.g. because no test executes the mutated code.
     """
     NORMAL = 'normal'
     EXCEPTION = 'exception'
     NO_TEST = 'no-test'
     TIMEOUT = 'timeout'
+    SKIPPED = 'skipped'
+
+
+def mutant_result(rec, core, module_diff):
+    """Complete `rec`, the test runner's result for the mutant which `core`
+    made, with its diff `module_diff`.
+
+    Returns: `rec`.
+    """
+    rec.update({
+        'diff': module_diff,
+        'worker_outcome': WorkerOutcome.NORMAL
+    })
+    rec.update(core.activation_record)
+    return rec
+
+
+def operator_result(rec, operator_class, occurrence, **fields):
+    """Complete `rec`, the test runner's result for the OCCURRENCE-th mutant
+    of OPERATOR_CLASS, with the mutant and any other `fields` (e.g. its
+    `diff`).
+
+    Returns: `rec`.
+    """
+    rec.update(fields)
+    rec.update({
+        'worker_outcome': WorkerOutcome.NORMAL,
+        'operator': '{}.{}'.format(operator_class.__module__,
+                                   operator_class.__name__),
+        'occurrence': occurrence,
+    })
+    return rec
+
+
+def exception_result():
+    "Make the result of a job which raised the exception being handled."
+    return WorkItem(
+        data=traceback.format_exception(*sys.exc_info()),
+        test_outcome=TestOutcome.INCOMPETENT,
+        worker_outcome=WorkerOutcome.EXCEPTION)
 
 
 def worker(module_name,
            operator_class,
            occurrence,
-           test_runner):
+           test_runner,
+           bundle_entry=None):
     """Mutate the OCCURRENCE-th site for OPERATOR_CLASS in MODULE_NAME, run the
     tests, and report the results.
 
     This is fundamentally the single-mutation-and-test-run process
     implementation.
 
+    If BUNDLE_ENTRY is the path of the mutant's entry in a bundle (see
+    `cosmic_ray.bundle`), the mutant is loaded from there rather than made
+    afresh, unless the entry can't be loaded.
+
     There are three high-level ways that a worker can finish. First, it could
     fail exceptionally, meaning that some uncaught exception made its way from
     some part of the operation to terminate the function. This function will
@@ -66,76 +113,263 @@ def worker(module_name,
 
     """
     try:
+        if bundle_entry is not None:
+            # Imported here since the bundle module needs this one.
+            from .bundle import load_entry
+            entry = load_entry(bundle_entry)
+            if entry is not None:
+                code, module_diff = entry
+                with using_code(module_name, code):
+                    rec = test_runner()
+
+                return operator_result(rec, operator_class, occurrence,
+                                       diff=module_diff)
+
         with preserve_modules():
-            module = importlib.import_module(module_name)
-            module_source_file = inspect.getsourcefile(module)
-            module_ast = get_ast(module)
-            module_source = astunparse.unparse(module_ast)
-
-            core = MutatingCore(occurrence)
-            operator = operator_class(core)
-            # note: after this step module_ast and modified_ast
-            # appear to be the same
-            modified_ast = operator.visit(module_ast)
-            modified_source = astunparse.unparse(modified_ast)
+            core, module_ast, module_diff = mutate_module(
+                module_name, operator_class, occurrence)
 
             if not core.activation_record:
                 return WorkItem(
                     worker_outcome=WorkerOutcome.NO_TEST)
 
-            # generate a source diff to visualize how the mutation
-            # operator has changed the code
-            module_diff = ["--- mutation diff ---"]
-            for line in difflib.unified_diff(module_source.split('\n'),
-                                             modified_source.split('\n'),
-                                             fromfile="a" + module_source_file,
-                                             tofile="b" + module_source_file,
-                                             lineterm=""):
-                module_diff.append(line)
-
         with using_ast(module_name, module_ast):
             rec = test_runner()
 
-        rec.update({
-            'diff': module_diff,
-            'worker_outcome': WorkerOutcome.NORMAL
-        })
-        rec.update(core.activation_record)
-        return rec
+        return mutant_result(rec, core, module_diff)
+
+    except Exception:  # noqa # pylint: disable=broad-except
+        return exception_result()
+
+
+def mutate_module(module_name, operator_class, occurrence):
+    """Mutate the OCCURRENCE-th site for OPERATOR_CLASS in MODULE_NAME.
+
+    This imports the module if it isn't already imported, so you may want to
+    call it within `preserve_modules()`.
+
+    Returns: A tuple `(core, mutated AST, diff)`, where `core` is the
+        `MutatingCore` which made the mutation. If there is no such site, the
+        core's `activation_record` is `None`.
+    """
+    module = importlib.import_module(module_name)
+    module_source_file = inspect.getsourcefile(module)
+    module_ast = get_ast(module)
+    module_source = astunparse.unparse(module_ast)
+
+    core = MutatingCore(occurrence)
+    operator = operator_class(core)
+    # note: after this step module_ast and modified_ast
+    # appear to be the same
+    modified_ast = operator.visit(module_ast)
+    modified_source = astunparse.unparse(modified_ast)
+
+    # generate a source diff to visualize how the mutation
+    # operator has changed the code
+    module_diff = ["--- mutation diff ---"]
+    for line in difflib.unified_diff(module_source.split('\n'),
+                                     modified_source.split('\n'),
+                                     fromfile="a" + module_source_file,
+                                     tofile="b" + module_source_file,
+                                     lineterm=""):
+        module_diff.append(line)
+
+    return core, modified_ast, module_diff
+
+
+def mutate_module_group(module_name, mutants):
+    """Apply several mutations to MODULE_NAME at once.
+
+    Each mutation is made by a single-site `MutatingCore`, except that
+    consecutive mutations with the same operator are made in a single
+    traversal. The mutations are applied from the end of the module to its
+    start, since a mutation may change the numbering of the sites which come
+    after it (e.g. "add not" creates a new site for "unary operator"
+    mutations). For mutants in different functions, this means that each
+    occurrence still refers to the site it was counted for. As a check, each
+    mutation must be made on the line number given for it.
+
+    This imports the module if it isn't already imported, so you may want to
+    call it within `preserve_modules()`.
+
+    Args:
+      module_name: The name of the module to mutate.
+      mutants: A sequence of `(operator_class, occurrence, line_number,
+        col_offset)` tuples.
+
+    Returns: The mutated AST.
+
+    Raises:
+      ValueError: If one of the mutations couldn't be made as described.
+    """
+    module = importlib.import_module(module_name)
+    module_ast = get_ast(module)
+
+    ordered = sorted(
+        mutants,
+        key=lambda mutant: (mutant[2] or 0, mutant[3] or 0),
+        reverse=True)
+    for operator_class, batch in itertools.groupby(
+            ordered, key=lambda mutant: mutant[0]):
+        lines = {occurrence: line_number
+                 for _, occurrence, line_number, _ in batch}
+        core = MutatingCore(lines)
+        module_ast = operator_class(core).visit(module_ast)
+
+        made = {record['occurrence']: record['line_number']
+                for record in core.activation_records}
+        for occurrence, line_number in lines.items():
+            if occurrence not in made or (line_number is not None and
+                                          made[occurrence] != line_number):
+                raise ValueError(
+                    'Unable to make mutant {} {} {} in a group'.format(
+                        module_name, operator_class.__name__, occurrence))
+
+    return module_ast
+
+
+def group_worker(module_name, mutants, test_runner):
+    """Activate several mutants of MODULE_NAME at once and run the tests
+    against all of them.
+
+    If the tests pass, every one of the mutants survived, and each gets its
+    own diff. Otherwise at least one of them was killed, but there's no
+    telling which, so each just gets the results of the test run.
+
+    Args:
+      module_name: The name of the module to mutate.
+      mutants: A sequence of `(operator_class, occurrence, line_number,
+        col_offset)` tuples, as for `mutate_module_group()`.
+      test_runner: The test runner to run.
+
+    Returns: A list of WorkItems, one for each mutant in `mutants`.
+
+    Raises: This will generally not raise any exceptions. Rather, exceptions
+        will be reported using the 'exception' result-type in the return value.
+    """
+    try:
+        with preserve_modules():
+            module_ast = mutate_module_group(module_name, mutants)
+
+        with preserve_modules():
+            with using_ast(module_name, module_ast):
+                rec = test_runner()
+
+        results = []
+        for operator_class, occurrence, _, _ in mutants:
+            result = operator_result(WorkItem(rec), operator_class,
+                                     occurrence)
+            if rec.test_outcome == TestOutcome.SURVIVED:
+                with preserve_modules():
+                    _, _, result.diff = mutate_module(
+                        module_name, operator_class, occurrence)
+            results.append(result)
+        return results
 
     except Exception:  # noqa # pylint: disable=broad-except
-        return WorkItem(
-            data=traceback.format_exception(*sys.exc_info()),
-            test_outcome=TestOutcome.INCOMPETENT,
-            worker_outcome=WorkerOutcome.EXCEPTION)
+        return [exception_result() for _ in mutants]
+
+
+def meta_module_worker(module_name,
+                       code,
+                       operator_class,
+                       occurrence,
+                       test_runner):
+    """Run the tests against the active mutant of a meta-module.
+
+    This is `worker()` for mutant schemata (see `cosmic_ray.schemata`). `code`
+    is the compiled meta-module for MODULE_NAME, and the mutant for the
+    OCCURRENCE-th site for OPERATOR_CLASS must already have been activated.
+
+    Producing the diff of a mutant means mutating and unparsing the module the
+    usual way, which is what meta-modules avoid. So the diff is only produced
+    for mutants which aren't killed, since those are the ones people look at.
+
+    Returns: a WorkItem
+
+    Raises: This will generally not raise any exceptions. Rather, exceptions
+        will be reported using the 'exception' result-type in the return value.
+    """
+    try:
+        with preserve_modules():
+            with using_code(module_name, code):
+                rec = test_runner()
+
+        if rec.test_outcome != TestOutcome.KILLED:
+            with preserve_modules():
+                _, _, rec.diff = mutate_module(
+                    module_name, operator_class, occurrence)
+
+        return operator_result(rec, operator_class, occurrence)
+
+    except Exception:  # noqa # pylint: disable=broad-except
+        return exception_result()
+
+
+def _run_worker_main(job, timeout):
+    """Run `cosmic_ray.worker_main` in a subprocess with the JSON-able `job`
+    on its stdin, returning its decoded output.
+
+    Raises:
+      subprocess.TimeoutExpired: If it runs for longer than `timeout`
+        seconds. The subprocess is killed.
+      json.JSONDecodeError: If its output isn't JSON.
+    """
+    # Imported here since most users of this module (i.e. workers) don't need
+    # subprocesses.
+    import subprocess
+
+    proc = subprocess.Popen([sys.executable, '-m', 'cosmic_ray.worker_main'],
+                            stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE,
+                            universal_newlines=True)
+    try:
+        outs, _ = proc.communicate(input=json.dumps(job), timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        raise
+    return json.loads(outs)
 
 
 def worker_process(work_item,
                    timeout,
-                   config):
-    """Run `cosmic-ray worker` in a subprocess and return the results,
-    passing `config` to it via stdin.
+                   config,
+                   bytecode=False):
+    """Run `cosmic_ray.worker_main` in a subprocess and return the results,
+    passing the job description (including `config`) to it via stdin.
+
+    The subprocess is killed if it runs for longer than `work_item.timeout`
+    or, if the work item has no timeout of its own, `timeout` seconds. If
+    `bytecode` is true, the worker makes the mutant by patching bytecode
+    where it can (see `cosmic_ray.bytecode`).
 
     Returns: An updated WorkItem
 
     """
+    # Imported here since most users of this module (i.e. workers) don't need
+    # plugin lookup or subprocesses.
+    import subprocess
+    from .plugins import operator_path, test_runner_path
+
     # The work_item param may come as just a dict (e.g. if it arrives over
     # celery), so we reconstruct a WorkItem to make it easier to work with.
     work_item = WorkItem(work_item)
 
-    command = 'cosmic-ray worker {module} {operator} {occurrence}'.format(
-        **work_item)
+    command = _command_line(work_item)
 
     log.info('executing: %s', command)
 
-    proc = subprocess.Popen(command.split(),
-                            stdin=subprocess.PIPE,
-                            stdout=subprocess.PIPE,
-                            universal_newlines=True)
-    config_string = serialize_config(config)
+    job = {
+        'config': config,
+        'work_item': work_item,
+        'operator': operator_path(work_item.operator),
+        'test_runner': test_runner_path(config['test-runner']['name']),
+        'bytecode': bytecode,
+    }
+
     try:
-        outs, _ = proc.communicate(input=config_string, timeout=timeout)
-        result = json.loads(outs)
+        result = _run_worker_main(job, work_item.timeout or timeout)
         work_item.update({
             k: v
             for k, v
@@ -145,10 +379,64 @@ def worker_process(work_item,
     except subprocess.TimeoutExpired as exc:
         work_item.worker_outcome = WorkerOutcome.TIMEOUT
         work_item.data = exc.timeout
-        proc.kill()
     except json.JSONDecodeError as exc:
         work_item.worker_outcome = WorkerOutcome.EXCEPTION
-        work_item.data = exc
+        work_item.data = [str(exc)]
 
     work_item.command_line = command
     return work_item
+
+
+def group_worker_process(work_items, timeout, config):
+    """Like `worker_process()`, but for a group of mutants of the same module
+    which are activated together (see `group_worker()`).
+
+    The tests run are those for any of the work items, and the subprocess is
+    killed if it runs for longer than the work items' timeouts put together.
+
+    Returns: A list of the updated WorkItems.
+    """
+    import subprocess
+    from .plugins import operator_path, test_runner_path
+
+    work_items = [WorkItem(work_item) for work_item in work_items]
+    log.info('executing group: %s',
+             '; '.join(_command_line(work_item) for work_item in work_items))
+
+    job = {
+        'config': config,
+        'work_items': work_items,
+        'operators': [operator_path(work_item.operator)
+                      for work_item in work_items],
+        'test_runner': test_runner_path(config['test-runner']['name']),
+    }
+
+    try:
+        results = _run_worker_main(
+            job,
+            sum(work_item.timeout or timeout for work_item in work_items))
+        for work_item, result in zip(work_items, results):
+            work_item.update({
+                k: v
+                for k, v
+                in result.items()
+                if v is not None
+            })
+    except subprocess.TimeoutExpired as exc:
+        for work_item in work_items:
+            work_item.worker_outcome = WorkerOutcome.TIMEOUT
+            work_item.data = exc.timeout
+    except json.JSONDecodeError as exc:
+        for work_item in work_items:
+            work_item.worker_outcome = WorkerOutcome.EXCEPTION
+            work_item.data = [str(exc)]
+
+    for work_item in work_items:
+        work_item.command_line = _command_line(work_item)
+    return work_items
+
+
+def _command_line(work_item):
+    "The command a user can run to reproduce the job for `work_item` by hand."
+    return 'cosmic-ray worker {module} {operator} {occurrence}'.format(
+        **work_item)
@@ -0,0 +1,119 @@
+"""A minimal entry point for running a single worker job.
+
+This is what `worker.worker_process()` launches for each mutant:
+
+    python -m cosmic_ray.worker_main [--keep-stdout]
+
+It reads a JSON job description from stdin, runs `worker.worker()` on it, and
+writes the resulting `WorkItem` as JSON to stdout. The job is a JSON object
+with these keys:
+
+  config: The session configuration.
+  work_item: The `WorkItem` to execute. If its `covering_tests` is set, only
+    those tests are run, and its `priority_tests` are run first. If it has a
+    `bundle_entry`, the mutant is loaded from there.
+  operator: The import path of the operator class, as returned by
+    `plugins.operator_path()`.
+  test_runner: The import path of the test-runner class, as returned by
+    `plugins.test_runner_path()`.
+  bytecode: Optional. If true, the mutant is made by patching the module's
+    bytecode (see `cosmic_ray.bytecode`) where that's possible.
+
+A job for a group of mutants which are activated together (see
+`worker.group_worker_process()`) has `work_items` and `operators` lists in
+place of `work_item` and `operator`. The tests run are those for any of the
+work items, and the result is a list of `WorkItem`s, one per work item.
+
+Since this runs once for every mutant, it deliberately avoids the full
+`cosmic-ray` command line machinery: it doesn't parse options with docopt,
+read YAML, or scan for plugins. Keep the imports here (and in the modules it
+imports) to what a single job really needs.
+"""
+
+import json
+import os
+import sys
+
+from .plugins import load_object
+from .util import redirect_stdout
+from .work_item import WorkItem
+from .worker import group_worker, worker
+
+
+def main(argv=None):
+    """Run the job described on stdin, writing the result to stdout.
+
+    Args:
+      argv: The command line arguments. The only option is `--keep-stdout`,
+        which stops output from the tests being squelched.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    job = json.load(sys.stdin)
+    config = job['config']
+    if 'work_items' in job:
+        work_items = [WorkItem(item) for item in job['work_items']]
+        operators = [load_object(path) for path in job['operators']]
+    else:
+        work_items = [WorkItem(job['work_item'])]
+        operators = [load_object(job['operator'])]
+
+    if config.get('local-imports', True):
+        sys.path.insert(0, '')
+
+    test_runner = load_object(job['test_runner'])(
+        config['test-runner']['args'])
+    test_runner.tests = _union(item.covering_tests for item in work_items)
+    test_runner.priority_tests = _union(
+        item.priority_tests or [] for item in work_items)
+
+    with open(os.devnull, 'w') as devnull:
+        with redirect_stdout(
+                sys.stdout if '--keep-stdout' in argv else devnull):
+            if 'work_items' in job:
+                result = group_worker(
+                    work_items[0].module,
+                    [(operator, int(item.occurrence), item.line_number,
+                      item.col_offset)
+                     for operator, item in zip(operators, work_items)],
+                    test_runner)
+            else:
+                result = _run_one(job, work_items[0], operators[0],
+                                  test_runner)
+
+    sys.stdout.write(json.dumps(result))
+
+    return os.EX_OK
+
+
+def _union(test_lists):
+    """The IDs in all of `test_lists`, in order of first appearance, or `None`
+    (meaning all tests) if any of the lists is `None`.
+    """
+    tests = {}
+    for test_list in test_lists:
+        if test_list is None:
+            return None
+        tests.update(dict.fromkeys(test_list))
+    return list(tests)
+
+
+def _run_one(job, work_item, operator, test_runner):
+    "Run the job for a single work item."
+    result = None
+    if job.get('bytecode') and not work_item.bundle_entry:
+        from .bytecode import bytecode_worker
+        result = bytecode_worker(work_item, operator, test_runner)
+    if result is None:
+        result = worker(
+            work_item.module,
+            operator,
+            int(work_item.occurrence),
+            test_runner,
+            work_item.bundle_entry)
+    return result
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,19 +8,60 @@ from cosmic_ray.testing.test_runner import TestRunner
 from cosmic_ray.util import redirect_stdout, redirect_stderr
 
 
+def _skip(result):  # pylint: disable=unused-argument
+    "Run a test which the runner doesn't want, i.e. do nothing."
+
+
 class NoseResultsCollector(nose.plugins.Plugin):
-    "Nose plugin that collects results for later analysis."
+    """Nose plugin that collects results for later analysis.
+
+    This also restricts the loaded tests to those selected by `runner`, and
+    tells `runner` when each test starts, stops, and fails. Nose doesn't
+    support reordering tests, so `runner.priority_tests` is ignored.
+    """
     name = 'cosmic_ray'
     enabled = True
 
-    def __init__(self):
+    def __init__(self, runner):
         super().__init__()
         self.result = None
+        self._runner = runner
 
     def finalize(self, result):
         "Store result."
         self.result = result
 
+    def prepareTestCase(self, test):  # noqa # pylint: disable=invalid-name
+        """Skip `test` if the runner doesn't want it.
+
+        Tests are matched by `test.id()`, as for the listeners, since that
+        differs from the test's function for e.g. generated tests and
+        inherited test methods.
+        """
+        if self._runner.tests is None or test.id() in self._runner.tests:
+            return None
+        return _skip
+
+    def startTest(self, test):  # noqa # pylint: disable=invalid-name
+        "Tell the runner that `test` is starting."
+        self._runner._start_test(  # pylint: disable=protected-access
+            test.id())
+
+    def stopTest(self, test):  # noqa # pylint: disable=invalid-name
+        "Tell the runner that `test` has finished."
+        self._runner._stop_test(  # pylint: disable=protected-access
+            test.id())
+
+    def addError(self, test, err):  # noqa # pylint: disable=invalid-name,unused-argument
+        "Tell the runner that `test` failed."
+        self._runner._test_failed(  # pylint: disable=protected-access
+            test.id())
+
+    def addFailure(self, test, err):  # noqa # pylint: disable=invalid-name,unused-argument
+        "Tell the runner that `test` failed."
+        self._runner._test_failed(  # pylint: disable=protected-access
+            test.id())
+
 
 class NoseRunner(TestRunner):  # pylint: disable=too-few-public-methods
     """A TestRunner using nosetest.
@@ -30,12 +71,15 @@ class NoseRunner(TestRunner):  # pylint: disable=too-few-public-methods
     for a description of what arguments are accepted.
 
     NOTE: ``-s`` is not accepted here!
+
+    Test IDs are those returned by nose's `test.id()`, e.g.
+    "tests.test_foo.FooTest.test_bar".
     """
 
     def _run(self):
         argv = ['', '--with-cosmic_ray']
         argv += self.test_args.split()
-        collector = NoseResultsCollector()
+        collector = NoseResultsCollector(self)
 
         with open(os.devnull, 'w') as devnull:
             with redirect_stdout(devnull):
@@ -9,13 +9,45 @@ from cosmic_ray.util import redirect_stdout
 
 
 class ResultCollector:
-    "Pytest plugin that collects results for later analysis."
-    def __init__(self):
+    """Pytest plugin that collects results for later analysis.
+
+    This also restricts the collected tests to those selected by `runner`,
+    moves its priority tests to the front, and tells `runner` when each test
+    starts, stops, and fails.
+    """
+    def __init__(self, runner):
         self.reports = []
+        self._runner = runner
 
     def pytest_runtest_logreport(self, report):
         "Collect logreports into a list."
         self.reports.append(report)
+        if report.failed:
+            self._runner._test_failed(  # pylint: disable=protected-access
+                report.nodeid)
+
+    def pytest_collection_modifyitems(self, config, items):
+        "Deselect the tests which the runner doesn't want, and reorder the rest."
+        if self._runner.tests is not None:
+            wanted = set(self._runner.tests)
+            selected = [item for item in items if item.nodeid in wanted]
+            deselected = [item for item in items if item.nodeid not in wanted]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+                items[:] = selected
+
+        if self._runner.priority_tests:
+            # pylint: disable=protected-access
+            sort_key = self._runner._sort_key()
+            items.sort(key=lambda item: sort_key(item.nodeid))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        "Tell the runner when each test starts and stops."
+        # pylint: disable=protected-access
+        self._runner._start_test(item.nodeid)
+        yield
+        self._runner._stop_test(item.nodeid)
 
 
 class PytestRunner(TestRunner):
@@ -26,10 +58,11 @@ class PytestRunner(TestRunner):
     function, so see it's documentation for a description of how the arguments
     are used.
 
+    Test IDs are pytest node IDs, e.g. "tests/test_foo.py::test_bar".
     """
 
     def _run(self):
-        collector = ResultCollector()
+        collector = ResultCollector(self)
 
         args = self.test_args
         if args:
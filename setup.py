@@ -41,6 +41,10 @@ OPERATORS = [
     'cosmic_ray.operators.comparison_operator_replacement:'
     'MutateComparisonOperator',
 
+    'mutate_comparison_operator_sufficient = '
+    'cosmic_ray.operators.comparison_operator_replacement:'
+    'SufficientComparisonOperator',
+
     'replace_true_false = '
     'cosmic_ray.operators.boolean_replacer:ReplaceTrueFalse',
 
@@ -59,6 +63,10 @@ OPERATORS = [
     'mutate_binary_operator ='
     'cosmic_ray.operators.binary_operator_replacement:MutateBinaryOperator',
 
+    'mutate_binary_operator_sufficient ='
+    'cosmic_ray.operators.binary_operator_replacement:'
+    'SufficientBinaryOperator',
+
     'break_continue_replacement ='
     'cosmic_ray.operators.break_continue:ReplaceBreakWithContinue',
 
@@ -80,7 +88,6 @@ INSTALL_REQUIRES = [
     'pyyaml',
     'qprompt',
     'stevedore',
-    'tinydb>=3.2.1',
 ]
 
 if sys.version_info < (3, 4):
@@ -134,6 +141,16 @@ setup(
         'cosmic_ray.operators': OPERATORS,
         'cosmic_ray.execution_engines': [
             'local = cosmic_ray.execution.local:LocalExecutionEngine',
+            'local-parallel = '
+            'cosmic_ray.execution.local_parallel:ParallelLocalExecutionEngine',
+            'fork-server = cosmic_ray.execution.fork:ForkServerExecutionEngine',
+            'hot-patch = '
+            'cosmic_ray.execution.hot_patch:HotPatchExecutionEngine',
+            'reload = cosmic_ray.execution.reload:ReloadExecutionEngine',
+            'subinterpreter = '
+            'cosmic_ray.execution.subinterpreter:SubinterpreterExecutionEngine',
+            'bytecode = cosmic_ray.execution.bytecode:BytecodeExecutionEngine',
+            'group = cosmic_ray.execution.group:GroupExecutionEngine',
         ]
     },
     long_description=LONG_DESCRIPTION,
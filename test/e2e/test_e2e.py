@@ -8,7 +8,7 @@ from cosmic_ray.reporting import survival_rate
 
 
 TEST_RUNNERS = ('unittest', 'pytest', 'nosetest')
-ENGINES = ('local',)  # TODO: Add celery3
+ENGINES = ('local', 'local-parallel', 'fork-server')  # TODO: Add celery3
 
 
 @pytest.fixture(params=TEST_RUNNERS)
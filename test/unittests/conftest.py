@@ -0,0 +1,63 @@
+"""Fixtures shared by the unit tests.
+
+The `project` and `make_work_item` fixtures are for test modules which run
+mutants of a small project. They use these globals of the test module:
+
+- MODULE_NAME: The name of the module under test.
+- MODULE: The source of the module under test. This defaults to `LESS`.
+- TESTS: The source of the project's tests, which are run with the unittest
+  runner as "tests".
+- HELPERS: Optionally, a dict mapping the names of other modules of the
+  project to their source.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.work_item import WorkItem
+
+from path_utils import excursion, extend_path
+
+# A module with a single comparison to mutate.
+LESS = '''\
+def less(a, b):
+    return a < b
+'''
+
+
+@pytest.fixture
+def project(request, tmpdir):
+    """A project in `tmpdir`, made from the globals of the test module.
+
+    The project's directory is the current directory, and is on `sys.path`,
+    while the fixture is in use.
+    """
+    module_name = request.module.MODULE_NAME
+    modules = dict(getattr(request.module, 'HELPERS', {}))
+    modules[module_name] = getattr(request.module, 'MODULE', LESS)
+    for name, source in modules.items():
+        tmpdir.join(name + '.py').write(source)
+    tmpdir.mkdir('tests').join('test_{}.py'.format(module_name)).write(
+        request.module.TESTS)
+
+    with excursion(tmpdir), extend_path(str(tmpdir)):
+        yield tmpdir
+
+    for name in list(modules) + ['test_' + module_name]:
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def make_work_item(request):
+    """A function which makes a `WorkItem` for a mutant of the test module's
+    MODULE_NAME.
+    """
+    def make(job_id, occurrence, operator='mutate_comparison_operator',
+             **fields):
+        "Make a work item for the OCCURRENCE-th mutant of OPERATOR."
+        return WorkItem(job_id=job_id,
+                        module=request.module.MODULE_NAME,
+                        operator=operator,
+                        occurrence=occurrence,
+                        **fields)
+    return make
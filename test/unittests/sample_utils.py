@@ -0,0 +1,64 @@
+"""A sample module with many kinds of mutation site, for checking that mutants
+made in different ways behave the same.
+"""
+
+SAMPLE = '''
+import functools
+
+
+def deco(func):
+    @functools.wraps(func)
+    def wrapper(*args):
+        return ('decorated', func(*args))
+    return wrapper
+
+
+@deco
+def arith(x, y=-1):
+    total = 0
+    for i in range(x * 2 + y):
+        if i > 2 and not i == 5:
+            break
+        total += i if i > 0 else -i
+    try:
+        scaled = x < y <= total
+    finally:
+        total = total + 1.5
+    try:
+        total = total // (x - 3)
+    except ZeroDivisionError:
+        total = None
+    flag = not x
+    return (total, scaled, flag, True, x is not None, x or y <= 3 or False,
+            ~x, x % 3)
+
+
+class Thing:
+    SCALE = 2
+
+    def method(self, a, b):
+        return [a - b for _ in range(abs(a))] if a != b else a * self.SCALE
+'''
+
+
+def run_sample(code):
+    """Run `code`, which is compiled from SAMPLE or a mutant of it, and call
+    its functions with a few arguments.
+
+    Returns: A list of the results of the calls, or of the names of the
+      exceptions they raised.
+    """
+    namespace = {}
+    exec(code, namespace)  # pylint: disable=exec-used
+
+    results = []
+    calls = [(namespace['arith'], args)
+             for args in [(0,), (3,), (4, 2), (7, -2)]]
+    calls += [(namespace['Thing']().method, args)
+              for args in [(1, 1), (3, 1), (-2, 4)]]
+    for func, args in calls:
+        try:
+            results.append(func(*args))
+        except Exception as exc:  # pylint: disable=broad-except
+            results.append(type(exc).__name__)
+    return results
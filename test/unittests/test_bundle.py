@@ -0,0 +1,189 @@
+"""Tests for bundles of precompiled mutants.
+"""
+import importlib
+import os
+
+import pytest
+
+import cosmic_ray.bundle
+import cosmic_ray.commands
+from cosmic_ray.bundle import (bundle_dir, code_digest, compile_mutants,
+                               load_entry, _compile_module_mutants,
+                               _write_entry)
+from cosmic_ray.operators.comparison_operator_replacement import \
+    MutateComparisonOperator
+from cosmic_ray.plugins import get_test_runner
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome, worker
+
+from conftest import LESS
+from path_utils import extend_path
+
+MODULE_NAME = 'bundled'
+
+TESTS = '''\
+import unittest
+
+import bundled
+
+
+class LessTest(unittest.TestCase):
+    def test_less(self):
+        self.assertTrue(bundled.less(1, 2))
+'''
+
+CONFIG = {'module': 'bundled',
+          'test-runner': {'name': 'unittest', 'args': 'tests'},
+          'execution-engine': {'name': 'local', 'num-workers': 2}}
+
+
+def test_bundle_dir_is_next_to_session():
+    assert bundle_dir(os.path.join('a', 'session.json')) == \
+        os.path.join('a', 'session.bundle')
+
+
+def test_entries_are_content_addressed(tmpdir):
+    code = compile('x = 1', 'm', 'exec')
+    first = _write_entry(str(tmpdir), code, ['diff'])
+    second = _write_entry(str(tmpdir), code, ['diff'])
+    third = _write_entry(str(tmpdir), code, ['other diff'])
+
+    assert first == second != third
+    assert len(os.listdir(str(tmpdir))) == 2
+    loaded_code, diff = load_entry(first)
+    assert loaded_code == code
+    assert diff == ['diff']
+
+
+def test_entries_for_other_pythons_are_ignored(tmpdir):
+    path = tmpdir.join('entry')
+    path.write_binary(b'\0\0\0\0' + b'anything')
+    assert load_entry(str(path)) is None
+    assert load_entry(str(tmpdir.join('missing'))) is None
+
+
+@pytest.mark.usefixtures('project')
+def test_compile_mutants_into_bundle(tmpdir, make_work_item):
+    directory = str(tmpdir.join('session.bundle'))
+    work_items = compile_mutants(
+        [make_work_item(str(occurrence), occurrence)
+         for occurrence in (0, 1, 1000)],
+        directory)
+
+    entries = {item.job_id: item.bundle_entry for item in work_items}
+    assert entries['0'] != entries['1']
+    assert entries['1000'] is None
+    assert sorted(os.listdir(directory)) == sorted(
+        os.path.basename(entries[job_id]) for job_id in ('0', '1'))
+    _, diff = load_entry(entries['0'])
+    assert '+    return (a == b)' in diff
+
+
+@pytest.mark.usefixtures('project')
+def test_prefilter_without_bundle(make_work_item):
+    work_items = compile_mutants(
+        [make_work_item(str(occurrence), occurrence)
+         for occurrence in (0, 1)])
+
+    assert all(item.bundle_entry is None for item in work_items)
+    assert all(item.worker_outcome is None for item in work_items)
+
+
+@pytest.mark.parametrize('bundle', [False, True])
+@pytest.mark.usefixtures('project')
+def test_mutants_which_do_not_compile_are_reported(monkeypatch, tmpdir,
+                                                   bundle):
+    compiled = []
+
+    def fail_to_compile(*args):
+        # The unmutated module is compiled first.
+        compiled.append(args)
+        if len(compiled) > 1:
+            raise SyntaxError("'continue' not properly in loop")
+        return compile(*args)
+
+    directory = tmpdir.mkdir('session.bundle')
+    importlib.import_module('bundled')
+    monkeypatch.setattr(cosmic_ray.bundle, 'compile', fail_to_compile,
+                        raising=False)
+    results = _compile_module_mutants(
+        str(directory) if bundle else None,
+        'bundled',
+        [('0', 'mutate_comparison_operator', 0),
+         ('1000', 'mutate_comparison_operator', 1000)])
+
+    assert len(results[1]) == 1
+    job_id, entry, error, digest, _ = results[1][0]
+    assert (job_id, entry, digest) == ('0', None, None)
+    assert "SyntaxError: 'continue' not properly in loop" in error
+    assert not directory.listdir()
+
+
+def test_code_digest_ignores_positions():
+    code = compile('def f(x):\n    return -x\n', 'a', 'exec')
+    moved = compile('\n\ndef f(x):\n    return (\n        -x)\n', 'b', 'exec')
+    float_code = compile('def f(x):\n    return -x * 1.0\n', 'a', 'exec')
+    int_code = compile('def f(x):\n    return -x * 1\n', 'a', 'exec')
+
+    assert code_digest(code) == code_digest(moved)
+    assert code_digest(float_code) != code_digest(int_code)
+
+
+def test_equivalent_and_duplicate_mutants(tmpdir):
+    # "-0" is folded to the same constant as "+0", and mutating "and" gives
+    # the same "or" whichever of its two operands is chosen.
+    tmpdir.join('equivalents.py').write(
+        'def f(a, b):\n    return -0, a and b\n')
+    work_items = [
+        WorkItem(job_id=job_id, module='equivalents', operator=operator,
+                 occurrence=occurrence)
+        for job_id, operator, occurrence in [
+            ('unary', 'mutate_unary_operator', 0),
+            ('and', 'replace_and_with_or', 0),
+            ('and again', 'replace_and_with_or', 1)]]
+
+    with extend_path(str(tmpdir)):
+        results = {item.job_id: item for item in compile_mutants(work_items)}
+
+    assert results['unary'].test_outcome == TestOutcome.EQUIVALENT
+    assert results['unary'].worker_outcome == WorkerOutcome.SKIPPED
+    assert results['and'].worker_outcome is None
+    assert results['and'].duplicate_of is None
+    assert results['and again'].worker_outcome is None
+    assert results['and again'].duplicate_of == 'and'
+    # Duplicates aren't run, so they get their own diffs here.
+    assert results['and again'].diff
+
+
+@pytest.mark.usefixtures('project')
+def test_worker_loads_mutant_from_bundle(tmpdir):
+    # An entry whose diff shows that it was used.
+    code = compile(LESS.replace('<', '=='), 'bundled', 'exec')
+    entry = _write_entry(str(tmpdir), code, ['from the bundle'])
+
+    result = worker('bundled', MutateComparisonOperator, 0,
+                    get_test_runner('unittest', 'tests'), entry)
+
+    assert result.worker_outcome == WorkerOutcome.NORMAL
+    assert result.test_outcome == TestOutcome.KILLED
+    assert result.diff == ['from the bundle']
+
+
+def test_init_builds_and_prunes_bundle(project):
+    db_path = str(project.join('session.json'))
+    directory = bundle_dir(db_path)
+    os.makedirs(directory)
+    project.join('session.bundle', 'stale').write('')
+
+    with use_db(db_path) as db:
+        cosmic_ray.commands.init(
+            [importlib.import_module('bundled')], db, CONFIG, 10,
+            cosmic_ray.commands.InitOptions(bundle=directory))
+        items = list(db.work_items)
+
+    entries = {item.bundle_entry for item in items}
+    assert None not in entries
+    assert sorted(os.listdir(directory)) == sorted(
+        os.path.basename(entry) for entry in entries)
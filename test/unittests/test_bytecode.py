@@ -0,0 +1,127 @@
+"""Tests for making mutants by patching bytecode.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.bytecode import mutate_code
+from cosmic_ray.counting import mutation_sites
+from cosmic_ray.execution.bytecode import BytecodeExecutionEngine
+from cosmic_ray.importing import preserve_modules
+from cosmic_ray.plugins import get_operator, operator_names
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome, mutate_module
+
+from sample_utils import SAMPLE, run_sample
+
+# Some comparison mutants compare with literals using "is".
+pytestmark = pytest.mark.filterwarnings('ignore::SyntaxWarning')
+
+needs_positions = pytest.mark.skipif(
+    sys.version_info < (3, 11),
+    reason='Patching bytecode needs co_positions()')
+
+MODULE_NAME = 'patched'
+
+MODULE = SAMPLE
+
+# The tests for the engine.
+TESTS = '''\
+import unittest
+
+import patched
+
+
+class ThingTest(unittest.TestCase):
+    def test_method(self):
+        self.assertEqual(patched.Thing().method(1, 1), 2)
+'''
+
+
+@pytest.fixture
+def sample(project):  # pylint: disable=unused-argument
+    "The work items for all mutants of SAMPLE, as a module named `patched`."
+    with preserve_modules():
+        module = __import__('patched')
+        sites = mutation_sites([module], operator_names())[module]
+        yield [WorkItem(site,
+                        module='patched',
+                        operator=op_name,
+                        occurrence=occurrence)
+               for op_name, op_sites in sorted(sites.items())
+               for occurrence, site in enumerate(op_sites)]
+
+
+@needs_positions
+def test_patched_mutants_match_ast_mutants(sample):
+    patched = 0
+    for work_item in sample:
+        with preserve_modules():
+            mutant = mutate_code(work_item)
+            if mutant is None:
+                continue
+            _, module_ast, _ = mutate_module(
+                'patched', get_operator(work_item.operator),
+                work_item.occurrence)
+
+        patched += 1
+        code, diff = mutant
+        assert run_sample(code) == \
+            run_sample(compile(module_ast, 'patched', 'exec')), \
+            (work_item.operator, work_item.occurrence, work_item.replacement)
+        assert work_item.replacement in '\n'.join(diff)
+
+    # Every comparison, binary operator and unary operator is mutated this
+    # way, except for those of the constant-folded "-1".
+    assert patched > 60
+
+
+@needs_positions
+def test_unpatchable_mutants_are_declined(sample):
+    declined = {
+        (work_item.operator, work_item.replacement)
+        for work_item in sample
+        if mutate_code(work_item) is None}
+
+    # "-1" is folded into a single constant.
+    assert ('number_replacer', '2') in declined
+    assert ('mutate_unary_operator', '(~ 1)') in declined
+    # "if ... not i == 5" is compiled into a jump.
+    assert ('mutate_unary_operator', '(i == 5)') in declined
+    # "is not" can't be replaced by the larger "==" in the space it takes.
+    assert ('mutate_comparison_operator', '(x == None)') in declined
+    assert ('mutate_comparison_operator', '(x is None)') not in declined
+    assert ('break_continue_replacement', 'continue') in declined
+
+
+def test_mutants_without_positions_are_declined(sample):
+    work_item = WorkItem(dict(sample[0], line_number=None))
+    assert mutate_code(work_item) is None
+
+
+def test_engine_runs_jobs(sample):
+    by_replacement = {work_item.replacement: work_item
+                      for work_item in sample}
+    work_items = [
+        WorkItem(dict(by_replacement[replacement], job_id=job_id))
+        for job_id, replacement in [('survived', '(a > b)'),
+                                    ('killed', '(a / self.SCALE)'),
+                                    ('unpatchable', 'continue')]]
+    config = {
+        'module': 'patched',
+        'test-runner': {'name': 'unittest', 'args': 'tests'},
+        'execution-engine': {'name': 'bytecode', 'num-workers': 2},
+    }
+
+    results = {r.job_id: r
+               for r in BytecodeExecutionEngine()(10, work_items, config)}
+
+    assert all(r.worker_outcome == WorkerOutcome.NORMAL
+               for r in results.values())
+    assert results['survived'].test_outcome == TestOutcome.SURVIVED
+    # The diff of a patched mutant is of the source, not of unparsed code.
+    assert '+        return [a - b for _ in range(abs(a))] ' \
+        'if (a > b) else a * self.SCALE' in results['survived'].diff
+    assert results['killed'].test_outcome == TestOutcome.KILLED
+    assert results['unpatchable'].test_outcome == TestOutcome.SURVIVED
@@ -4,7 +4,7 @@ import io
 
 import pytest
 
-from cosmic_ray.config import ConfigError, load_config
+from cosmic_ray.config import ConfigError, get_operator_set, load_config
 
 
 def test_load_valid_stdin(mocker):
@@ -52,3 +52,10 @@ def test_load_from_non_utf8_file_raises_ConfigError(tmpdir):
         handle.write('{key: value}'.encode('utf-16'))
     with pytest.raises(ConfigError):
         load_config(str(config_path))
+
+
+def test_operator_set():
+    assert get_operator_set({}) == 'full'
+    assert get_operator_set({'operator-set': 'sufficient'}) == 'sufficient'
+    with pytest.raises(ConfigError):
+        get_operator_set({'operator-set': 'some'})
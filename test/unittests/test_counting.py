@@ -0,0 +1,109 @@
+"""Tests for mutant counting.
+"""
+import ast
+
+import pytest
+
+from cosmic_ray.counting import (_CountingCore, count_mutants,
+                                 mutation_sites, visit_all)
+from cosmic_ray.parsing import get_ast
+from cosmic_ray.plugins import get_operator, operator_names
+
+from path_utils import extend_path
+
+SAMPLE = '''
+import functools
+
+@functools.lru_cache()
+def func(x, y=-1):
+    if x > y and not (x is None):
+        while True:
+            for i in range(x * 2 + y):
+                try:
+                    x += i if i > 0 else -i
+                except ValueError:
+                    break
+                else:
+                    continue
+            break
+    return x or y <= 3 or False
+
+
+class Llama:
+    @staticmethod
+    def method(a, b):
+        return [a - b for _ in range(~a)] if a != b else a % b
+'''
+
+
+def _separate_counts(tree, op_names):
+    counts = {}
+    for op_name in op_names:
+        core = _CountingCore()
+        get_operator(op_name)(core).visit(tree)
+        counts[op_name] = core.count
+    return counts
+
+
+def test_visit_all_matches_separate_traversals():
+    tree = ast.parse(SAMPLE)
+    op_names = list(operator_names())
+    cores = {op_name: _CountingCore() for op_name in op_names}
+    visit_all(tree,
+              [get_operator(op_name)(core)
+               for op_name, core in cores.items()])
+
+    expected = _separate_counts(tree, op_names)
+    assert {op_name: core.count for op_name, core in cores.items()} == expected
+    assert any(expected.values())
+
+
+@pytest.mark.parametrize('module_name', ['cosmic_ray.counting',
+                                         'cosmic_ray.worker',
+                                         'cosmic_ray.work_db'])
+def test_count_mutants_matches_separate_traversals(module_name):
+    module = __import__(module_name, fromlist=['_'])
+    op_names = list(operator_names())
+
+    counts = count_mutants([module], op_names)
+
+    expected = {
+        op_name: count
+        for op_name, count
+        in _separate_counts(get_ast(module), op_names).items()
+        if count > 0
+    }
+    assert counts == {module: expected}
+
+
+def test_mutation_sites_match_counts():
+    module = __import__('cosmic_ray.worker', fromlist=['_'])
+    op_names = list(operator_names())
+
+    counts = count_mutants([module], op_names)[module]
+    sites = mutation_sites([module], op_names)[module]
+
+    assert {op_name: len(op_sites)
+            for op_name, op_sites in sites.items()} == counts
+
+
+def test_mutation_sites_describe_mutations(tmpdir):
+    source = tmpdir.join('sitey.py')
+    source.write('def f(x, y):\n'
+                 '    if x > y:\n'
+                 '        return -x\n')
+    with extend_path(str(tmpdir)):
+        module = __import__('sitey')
+        sites = mutation_sites([module], ['mutate_comparison_operator',
+                                          'add_not'])[module]
+
+    compare = sites['mutate_comparison_operator'][0]
+    assert compare['line_number'] == 2
+    assert compare['col_offset'] == 7
+    assert compare['node_type'] == 'Compare'
+    assert compare['replacement'] == '(x == y)'
+
+    add_not = sites['add_not'][0]
+    assert add_not['line_number'] == 2
+    assert add_not['node_type'] == 'If'
+    assert add_not['replacement'] == 'if (not (x > y)):'
@@ -0,0 +1,184 @@
+"""Tests for coverage-guided test selection.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.commands.init import _select_tests
+from cosmic_ray.coverage_map import (CoverageTracer, coverage_from_json,
+                                     covering_tests)
+from cosmic_ray.plugins import get_test_runner
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.testing.unittest_runner import UnittestRunner
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import excursion, extend_path
+
+MODULE = '''\
+def inc(x):
+    return x + 1
+
+
+def dec(x):
+    return x - 1
+
+
+def unused(x):
+    return x * 2
+'''
+
+TESTS = '''\
+import unittest
+
+import covered
+
+
+class IncTest(unittest.TestCase):
+    def test_inc(self):
+        self.assertEqual(covered.inc(1), 2)
+
+
+class DecTest(unittest.TestCase):
+    def test_dec(self):
+        self.assertEqual(covered.dec(1), 0)
+
+    def test_dec_negative(self):
+        self.assertEqual(covered.dec(-1), -2)
+'''
+
+
+@pytest.fixture
+def project(tmpdir):
+    tmpdir.join('covered.py').write(MODULE)
+    tmpdir.mkdir('tests').join('test_covered.py').write(TESTS)
+    with excursion(tmpdir), extend_path(tmpdir):
+        yield tmpdir
+    for name in ('covered', 'test_covered'):
+        sys.modules.pop(name, None)
+
+
+def test_tracer_maps_lines_to_tests(project):
+    runner = UnittestRunner('tests')
+    tracer = CoverageTracer([str(project.join('covered.py'))])
+    runner.add_listener(tracer)
+    with tracer:
+        work_item = runner()
+    assert work_item.test_outcome == TestOutcome.SURVIVED
+
+    coverage = coverage_from_json(tracer.to_json())
+    assert list(coverage) == [str(project.join('covered.py'))]
+    lines = coverage[str(project.join('covered.py'))]
+
+    # Module-level code runs on import, outside of any test.
+    assert lines[1] == [None]
+    assert lines[2] == ['test_covered.IncTest.test_inc']
+    assert lines[6] == ['test_covered.DecTest.test_dec',
+                        'test_covered.DecTest.test_dec_negative']
+    assert 10 not in lines
+
+
+def test_unittest_runner_runs_only_selected_tests(project):
+    started = []
+
+    class Listener:
+        @staticmethod
+        def start_test(test_id):
+            started.append(test_id)
+
+        @staticmethod
+        def stop_test(test_id):
+            pass
+
+    runner = UnittestRunner('tests')
+    runner.tests = ['test_covered.DecTest.test_dec_negative']
+    runner.add_listener(Listener())
+    runner()
+
+    assert started == ['test_covered.DecTest.test_dec_negative']
+
+
+needs_nose = pytest.mark.skipif(
+    sys.version_info >= (3, 10),
+    reason="nose doesn't run on Python 3.10 and later")
+
+NOSE_BASE = '''\
+import unittest
+
+
+class BaseTest(unittest.TestCase):
+    def test_inherited(self):
+        pass
+'''
+
+NOSE_TESTS = '''\
+import nose_base
+
+
+class DerivedTest(nose_base.BaseTest):
+    def test_own(self):
+        pass
+
+
+def check(n):
+    assert n < 2
+
+
+def test_gen():
+    for n in range(2):
+        yield check, n
+'''
+
+
+@needs_nose
+def test_nose_runner_runs_only_selected_tests(tmpdir):
+    tmpdir.join('nose_base.py').write(NOSE_BASE)
+    tmpdir.mkdir('tests').join('test_nose.py').write(NOSE_TESTS)
+    started = []
+
+    class Listener:
+        @staticmethod
+        def start_test(test_id):
+            started.append(test_id)
+
+        @staticmethod
+        def stop_test(test_id):
+            pass
+
+    # The IDs of generated tests and inherited test methods aren't the
+    # names of their functions.
+    selected = ['test_nose.DerivedTest.test_inherited',
+                'test_nose.test_gen(1,)']
+    runner = get_test_runner('nose', 'tests')
+    runner.tests = selected
+    runner.add_listener(Listener())
+    with excursion(tmpdir), extend_path(tmpdir):
+        try:
+            runner()
+        finally:
+            for name in ('nose_base', 'test_nose'):
+                sys.modules.pop(name, None)
+
+    assert started == selected
+
+
+def test_covering_tests():
+    file_coverage = {1: [None], 2: ['t1'], 3: ['t2', 't1'], 5: ['t3']}
+    assert covering_tests(file_coverage, 2, 2) == ['t1']
+    assert covering_tests(file_coverage, 2, 3) == ['t1', 't2']
+    assert covering_tests(file_coverage, 4, 4) == []
+    assert covering_tests(file_coverage, 1, 3) is None
+
+
+def test_select_tests_marks_uncovered_items_as_survivors():
+    line_coverage = {2: ['t1']}
+
+    covered = _select_tests(WorkItem(line_number=2), line_coverage)
+    assert covered.covering_tests == ['t1']
+    assert covered.worker_outcome is None
+
+    uncovered = _select_tests(WorkItem(line_number=4, end_line_number=5),
+                              line_coverage)
+    assert uncovered.covering_tests == []
+    assert uncovered.worker_outcome == WorkerOutcome.SKIPPED
+    assert uncovered.test_outcome == TestOutcome.SURVIVED
@@ -0,0 +1,27 @@
+"""Tests for the registration of the execution engines.
+"""
+import pytest
+
+from cosmic_ray.execution.bytecode import BytecodeExecutionEngine
+from cosmic_ray.execution.fork import ForkServerExecutionEngine
+from cosmic_ray.execution.group import GroupExecutionEngine
+from cosmic_ray.execution.hot_patch import HotPatchExecutionEngine
+from cosmic_ray.execution.local import LocalExecutionEngine
+from cosmic_ray.execution.local_parallel import ParallelLocalExecutionEngine
+from cosmic_ray.execution.reload import ReloadExecutionEngine
+from cosmic_ray.execution.subinterpreter import SubinterpreterExecutionEngine
+from cosmic_ray.plugins import get_execution_engine
+
+
+@pytest.mark.parametrize('name,engine_class', [
+    ('local', LocalExecutionEngine),
+    ('local-parallel', ParallelLocalExecutionEngine),
+    ('fork-server', ForkServerExecutionEngine),
+    ('hot-patch', HotPatchExecutionEngine),
+    ('reload', ReloadExecutionEngine),
+    ('subinterpreter', SubinterpreterExecutionEngine),
+    ('bytecode', BytecodeExecutionEngine),
+    ('group', GroupExecutionEngine),
+])
+def test_engine_is_registered(name, engine_class):
+    assert isinstance(get_execution_engine(name), engine_class)
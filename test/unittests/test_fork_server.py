@@ -0,0 +1,81 @@
+"""Tests for the fork-server execution engine.
+"""
+import pytest
+
+from cosmic_ray.execution.fork import (ForkServerExecutionEngine,
+                                       _server_setup)
+from cosmic_ray.plugins import operator_names
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.worker import WorkerOutcome
+
+MODULE_NAME = 'forked'
+
+TESTS = '''\
+import os
+import time
+import unittest
+
+import forked
+
+
+class LessTest(unittest.TestCase):
+    def test_less(self):
+        self.assertTrue(forked.less(1, 2))
+
+    def test_hang(self):
+        if os.environ.get('FORKED_HANG'):
+            time.sleep(60)
+'''
+
+CONFIG = {
+    'module': 'forked',
+    'test-runner': {'name': 'unittest', 'args': 'tests'},
+    'execution-engine': {'name': 'fork-server'},
+}
+
+
+@pytest.mark.parametrize('operator_set', ['full', 'sufficient'])
+def test_schemata_use_the_operator_set(operator_set):
+    config = dict(CONFIG, **{
+        'operator-set': operator_set,
+        'execution-engine': {'name': 'fork-server', 'schemata': True}})
+    setup = _server_setup(config)
+    assert sorted(setup['operators']) == sorted(operator_names(operator_set))
+
+
+@pytest.mark.parametrize('schemata', [False, True])
+@pytest.mark.usefixtures('project')
+def test_jobs_are_run_in_forks(schemata, make_work_item):
+    config = dict(CONFIG, **{
+        'execution-engine': {'name': 'fork-server', 'schemata': schemata}})
+    engine = ForkServerExecutionEngine()
+    results = list(engine(10,
+                          [make_work_item('killed', 0),
+                           make_work_item('no-test', 1000),
+                           make_work_item('survived', 1)],
+                          config))
+
+    assert [r.job_id for r in results] == ['killed', 'no-test', 'survived']
+    assert results[0].worker_outcome == WorkerOutcome.NORMAL
+    assert results[0].test_outcome == TestOutcome.KILLED
+    assert results[0].killed_by == 'test_forked.LessTest.test_less'
+    assert results[1].worker_outcome == WorkerOutcome.NO_TEST
+    # "a != b" holds for the test's inputs
+    assert results[2].test_outcome == TestOutcome.SURVIVED
+    assert '+    return (a != b)' in results[2].diff
+    assert all(r.command_line.startswith('cosmic-ray worker forked')
+               for r in results)
+
+
+@pytest.mark.usefixtures('project')
+def test_server_enforces_timeouts(monkeypatch, make_work_item):
+    monkeypatch.setenv('FORKED_HANG', '1')
+    engine = ForkServerExecutionEngine()
+    results = list(engine(10,
+                          [make_work_item('hangs', 0, timeout=0.5),
+                           make_work_item('no-test', 1000)],
+                          CONFIG))
+
+    assert results[0].worker_outcome == WorkerOutcome.TIMEOUT
+    assert results[0].data == 0.5
+    assert results[1].worker_outcome == WorkerOutcome.NO_TEST
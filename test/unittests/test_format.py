@@ -0,0 +1,94 @@
+"""Tests for the report formatting commands.
+"""
+import io
+import sys
+import xml.etree.ElementTree
+
+import pytest
+
+from cosmic_ray.commands.format import (_write_xml_report,
+                                        format_survival_rate, report)
+from cosmic_ray.reporting import create_report, survival_rate
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+
+def _work_items():
+    return [
+        WorkItem(job_id='killed', module='mod', line_number=1,
+                 worker_outcome=WorkerOutcome.NORMAL,
+                 test_outcome=TestOutcome.KILLED, data=[], diff=[]),
+        WorkItem(job_id='survived', module='mod', line_number=2,
+                 worker_outcome=WorkerOutcome.NORMAL,
+                 test_outcome=TestOutcome.SURVIVED, data=['output'],
+                 diff=['--- diff']),
+        WorkItem(job_id='pending', module='mod', line_number=3),
+    ]
+
+
+@pytest.fixture
+def session_file(tmpdir):
+    path = str(tmpdir.join('session.json'))
+    with use_db(path) as db:
+        db.add_work_items(_work_items())
+    return path
+
+
+def test_xml_report():
+    stream = io.BytesIO()
+    _write_xml_report(_work_items(), stream)
+
+    root = xml.etree.ElementTree.fromstring(stream.getvalue())
+    assert root.tag == 'testsuite'
+    assert root.attrib == {'errors': '1', 'failures': '1', 'skips': '0',
+                           'tests': '3'}
+    assert [case.get('classname') for case in root] == ['killed', 'survived']
+    assert root[1].find('failure').text == "['output']--- diff"
+
+
+def test_survival_rate_from_session_file(monkeypatch, capsys, session_file):
+    monkeypatch.setattr(sys, 'argv', ['cr-rate', session_file])
+    format_survival_rate()
+    assert capsys.readouterr().out == '50.00\n'
+
+
+def test_report_from_session_file(monkeypatch, capsys, session_file):
+    monkeypatch.setattr(sys, 'argv', ['cr-report', session_file])
+    report()
+    out = capsys.readouterr().out
+    assert 'job ID survived:survived:mod' in out
+    assert 'job ID killed' not in out
+    assert 'survival rate: 50.00%' in out
+
+
+def test_equivalent_mutants_are_not_rated():
+    equivalent = WorkItem(job_id='equivalent', module='mod', line_number=4,
+                          worker_outcome=WorkerOutcome.SKIPPED,
+                          test_outcome=TestOutcome.EQUIVALENT,
+                          data=['equivalent'], replacement='(+ 0)')
+    stream = io.BytesIO()
+    _write_xml_report(_work_items() + [equivalent], stream)
+
+    root = xml.etree.ElementTree.fromstring(stream.getvalue())
+    assert root.attrib['skips'] == '1'
+    assert root[2].find('skipped') is not None
+    assert survival_rate(_work_items() + [equivalent]) == 50.0
+
+
+def test_not_infected_mutants_survive():
+    not_infected = WorkItem(job_id='not infected', module='mod',
+                            line_number=4,
+                            worker_outcome=WorkerOutcome.SKIPPED,
+                            test_outcome=TestOutcome.NOT_INFECTED,
+                            data=['not infected'], replacement='(x > 0)')
+    stream = io.BytesIO()
+    _write_xml_report(_work_items() + [not_infected], stream)
+
+    root = xml.etree.ElementTree.fromstring(stream.getvalue())
+    assert root[2].find('failure') is not None
+    assert survival_rate(_work_items() + [not_infected]) == \
+        pytest.approx(200 / 3)
+    assert 'not infected: 1' in create_report(
+        _work_items() + [not_infected], show_pending=False)
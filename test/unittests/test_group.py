@@ -0,0 +1,217 @@
+"""Tests for testing mutants in groups.
+"""
+import pytest
+
+import cosmic_ray.execution.group
+from cosmic_ray.counting import mutation_sites
+from cosmic_ray.execution.group import (GroupExecutionEngine, _Grouper,
+                                        group_size)
+from cosmic_ray.importing import preserve_modules
+from cosmic_ray.plugins import get_operator, get_test_runner
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome, group_worker, mutate_module_group
+
+MODULE_NAME = 'grouped'
+
+MODULE = '''\
+LIMIT = 10
+
+
+def small(x):
+    return x < LIMIT
+
+
+def tiny(x):
+    return x < 2
+
+
+def scaled(x):
+    return x * 3
+
+
+def halved(x):
+    return x // 2
+'''
+
+# `small` and `tiny` are tested, `scaled` and `halved` aren't.
+TESTS = '''\
+import unittest
+
+import grouped
+
+
+class GroupedTest(unittest.TestCase):
+    def test_small(self):
+        self.assertTrue(grouped.small(5))
+        self.assertFalse(grouped.small(10))
+
+    def test_tiny(self):
+        self.assertTrue(grouped.tiny(1))
+        self.assertFalse(grouped.tiny(2))
+'''
+
+
+@pytest.fixture
+def grouped_items(project):  # pylint: disable=unused-argument
+    "The work items for MODULE's mutants, by (operator name, occurrence)."
+    with preserve_modules():
+        module = __import__('grouped')
+        sites = mutation_sites([module], ['mutate_comparison_operator',
+                                          'mutate_binary_operator',
+                                          'number_replacer'])[module]
+    return {
+        (op_name, occurrence): WorkItem(
+            site,
+            job_id='{}-{}'.format(op_name, occurrence),
+            module='grouped',
+            operator=op_name,
+            occurrence=occurrence)
+        for op_name, op_sites in sites.items()
+        for occurrence, site in enumerate(op_sites)}
+
+
+def _mutant(work_item):
+    return (get_operator(work_item.operator), work_item.occurrence,
+            work_item.line_number, work_item.col_offset)
+
+
+def test_group_size_follows_kill_rate():
+    assert group_size(0.9, 8) == 1
+    assert group_size(0.5, 8) == 1
+    assert group_size(0.0, 8) == 8
+    assert 1 < group_size(0.05, 8) < 8
+    assert group_size(0.05, 1) == 1
+
+
+def test_grouper_groups_mutants_of_different_functions(grouped_items):
+    items = [grouped_items[key] for key in [
+        ('number_replacer', 0),             # "LIMIT = 10", module-level
+        ('mutate_comparison_operator', 0),  # small
+        ('mutate_comparison_operator', 1),  # small
+        ('mutate_comparison_operator', 9),  # tiny
+        ('mutate_binary_operator', 0),      # scaled
+        ('number_replacer', 1),             # tiny
+    ]]
+    grouper = _Grouper(items, lookahead=10, local_imports=True)
+
+    groups = [[item.job_id for item in group]
+              for group in iter(lambda: grouper.next_group(3), None)]
+
+    assert groups == [
+        ['number_replacer-0'],
+        ['mutate_comparison_operator-0', 'mutate_comparison_operator-9',
+         'mutate_binary_operator-0'],
+        ['mutate_comparison_operator-1', 'number_replacer-1'],
+    ]
+
+
+def test_grouper_leaves_items_in_lanes_on_their_own(grouped_items):
+    items = [grouped_items[key] for key in [
+        ('mutate_comparison_operator', 0),  # small
+        ('mutate_comparison_operator', 9),  # tiny
+        ('mutate_binary_operator', 0),      # scaled
+    ]]
+    items[1].lane = 'loop'
+    grouper = _Grouper(items, lookahead=10, local_imports=True)
+
+    groups = [[item.job_id for item in group]
+              for group in iter(lambda: grouper.next_group(3), None)]
+
+    assert groups == [
+        ['mutate_comparison_operator-0', 'mutate_binary_operator-0'],
+        ['mutate_comparison_operator-9'],
+    ]
+
+
+def test_mutants_are_made_together(grouped_items):
+    # Mutating "10" doesn't change the occurrences of the other mutants.
+    mutants = [_mutant(grouped_items[key]) for key in [
+        ('mutate_comparison_operator', 9),
+        ('number_replacer', 0),
+        ('mutate_binary_operator', 0)]]
+    with preserve_modules():
+        module_ast = mutate_module_group('grouped', mutants)
+
+    namespace = {}
+    code = compile(module_ast, 'grouped', 'exec')
+    exec(code, namespace)  # pylint: disable=exec-used
+    assert namespace['LIMIT'] == 11
+    assert namespace['tiny'](2)
+    assert namespace['scaled'](3) != 9
+
+
+def test_mutants_on_the_wrong_line_are_refused(grouped_items):
+    operator, occurrence, _, col_offset = _mutant(
+        grouped_items[('mutate_comparison_operator', 0)])
+    with pytest.raises(ValueError), preserve_modules():
+        mutate_module_group('grouped', [(operator, occurrence, 1, col_offset)])
+
+
+def test_group_worker(grouped_items):
+    test_runner = get_test_runner('unittest', 'tests')
+    surviving = [grouped_items[('mutate_binary_operator', 0)],
+                 grouped_items[('mutate_binary_operator', 12)]]
+    killing = surviving + [grouped_items[('mutate_comparison_operator', 0)]]
+
+    results = group_worker('grouped', [_mutant(item) for item in surviving],
+                           test_runner)
+    assert all(result.worker_outcome == WorkerOutcome.NORMAL and
+               result.test_outcome == TestOutcome.SURVIVED
+               for result in results)
+    assert results[0].diff != results[1].diff
+
+    results = group_worker('grouped', [_mutant(item) for item in killing],
+                           test_runner)
+    assert all(result.test_outcome == TestOutcome.KILLED
+               for result in results)
+
+
+def test_engine_bisects_killed_groups(monkeypatch, grouped_items):
+    killed = {'mutate_comparison_operator-9'}
+    calls = []
+
+    def outcome(work_item):
+        work_item.worker_outcome = WorkerOutcome.NORMAL
+        work_item.test_outcome = (TestOutcome.KILLED
+                                  if work_item.job_id in killed
+                                  else TestOutcome.SURVIVED)
+        return work_item
+
+    def fake_group_worker_process(work_items, timeout, config):
+        calls.append(len(work_items))
+        results = [outcome(WorkItem(item)) for item in work_items]
+        if any(result.test_outcome == TestOutcome.KILLED
+               for result in results):
+            for result in results:
+                result.test_outcome = TestOutcome.KILLED
+        return results
+
+    def fake_worker_process(work_item, timeout, config):
+        calls.append(1)
+        return outcome(WorkItem(work_item))
+
+    monkeypatch.setattr(cosmic_ray.execution.group, 'group_worker_process',
+                        fake_group_worker_process)
+    monkeypatch.setattr(cosmic_ray.execution.group, 'worker_process',
+                        fake_worker_process)
+    # Start out with groups of the largest size.
+    monkeypatch.setattr(cosmic_ray.execution.group, 'group_size',
+                        lambda kill_rate, max_size: max_size)
+
+    items = [grouped_items[key] for key in [
+        ('mutate_comparison_operator', 0),
+        ('mutate_comparison_operator', 9),
+        ('mutate_binary_operator', 0),
+        ('mutate_comparison_operator', 1)]]
+    config = {'execution-engine': {'name': 'group', 'num-workers': 1,
+                                   'max-group-size': 3}}
+    results = {result.job_id: result
+               for result in GroupExecutionEngine()(10, items, config)}
+
+    assert {job_id for job_id, result in results.items()
+            if result.test_outcome == TestOutcome.KILLED} == killed
+    assert len(results) == 4
+    # The group of three, its two halves, the two mutants of the killed half
+    # and the fourth mutant.
+    assert calls == [3, 1, 2, 1, 1, 1]
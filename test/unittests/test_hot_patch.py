@@ -0,0 +1,130 @@
+"""Tests for the hot-patch execution engine.
+"""
+import ast
+import sys
+
+import pytest
+
+from cosmic_ray.execution.hot_patch import HotPatchExecutionEngine
+from cosmic_ray.patch_server import enclosing_function
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.worker import WorkerOutcome
+
+# The node type of number literals.
+NUMBER = ast.Num if sys.version_info < (3, 8) else ast.Constant
+
+MODULE_NAME = 'patched'
+
+MODULE = '''\
+import os
+import time
+
+LIMIT = 1
+
+
+def less(a, b):
+    if os.environ.get('PATCHED_HANG'):
+        time.sleep(60)
+    return a < b
+
+
+class Limits:
+    def over(self, value):
+        return value > LIMIT
+'''
+
+TESTS = '''\
+import unittest
+
+import patched
+
+
+class PatchedTest(unittest.TestCase):
+    def test_less(self):
+        self.assertTrue(patched.less(1, 2))
+
+    def test_over(self):
+        self.assertTrue(patched.Limits().over(2))
+        self.assertFalse(patched.Limits().over(1))
+'''
+
+CONFIG = {
+    'module': 'patched',
+    'test-runner': {'name': 'unittest', 'args': 'tests'},
+    'execution-engine': {'name': 'hot-patch'},
+}
+
+
+def _site(source, node_type):
+    module_ast = ast.parse(source)
+    node = next(node for node in ast.walk(module_ast)
+                if isinstance(node, node_type))
+    return module_ast, node
+
+
+def test_enclosing_function_of_method():
+    module_ast, node = _site(
+        'class C:\n    class D:\n        def m(self):\n            return 1\n',
+        NUMBER)
+    classes, function = enclosing_function(module_ast, node)
+    assert [c.name for c in classes] == ['C', 'D']
+    assert function.name == 'm'
+
+
+def test_enclosing_function_of_nested_function_is_outermost():
+    module_ast, node = _site('def f():\n    def g():\n        return 1\n',
+                             NUMBER)
+    classes, function = enclosing_function(module_ast, node)
+    assert classes == []
+    assert function.name == 'f'
+
+
+@pytest.mark.parametrize('source', [
+    'LIMIT = 1\n',
+    'class C:\n    LIMIT = 1\n',
+    'def f(x=1):\n    pass\n',
+    '@decorate(1)\ndef f():\n    pass\n',
+])
+def test_no_enclosing_function_outside_of_function_bodies(source):
+    module_ast, node = _site(source, NUMBER)
+    assert enclosing_function(module_ast, node) is None
+
+
+@pytest.mark.usefixtures('project')
+def test_jobs_are_hot_patched_or_run_in_workers(make_work_item):
+    engine = HotPatchExecutionEngine()
+    results = list(engine(
+        10,
+        [make_work_item('function', 3),
+         make_work_item('method', 13),
+         make_work_item('module-level', 0, 'number_replacer'),
+         make_work_item('no-test', 1000, 'number_replacer')],
+        CONFIG))
+
+    assert [r.job_id for r in results] == [
+        'function', 'method', 'module-level', 'no-test']
+    for result in results[:3]:
+        assert result.worker_outcome == WorkerOutcome.NORMAL
+        assert result.test_outcome == TestOutcome.KILLED
+    assert results[0].killed_by == 'test_patched.PatchedTest.test_less'
+    assert results[1].killed_by == 'test_patched.PatchedTest.test_over'
+    assert results[3].worker_outcome == WorkerOutcome.NO_TEST
+    assert all(r.command_line.startswith('cosmic-ray worker patched')
+               for r in results)
+
+
+@pytest.mark.usefixtures('project')
+def test_timeouts_restart_the_server(monkeypatch, make_work_item):
+    monkeypatch.setenv('PATCHED_HANG', '1')
+    engine = HotPatchExecutionEngine()
+    results = list(engine(
+        10,
+        [make_work_item('hangs', 3, timeout=1),
+         make_work_item(
+             'method', 13,
+             covering_tests=['test_patched.PatchedTest.test_over'])],
+        CONFIG))
+
+    assert results[0].worker_outcome == WorkerOutcome.TIMEOUT
+    assert results[0].data == 1
+    assert results[1].test_outcome == TestOutcome.KILLED
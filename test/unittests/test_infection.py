@@ -0,0 +1,169 @@
+"""Tests for weak-mutation infection tracing.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.commands.init import _prune_uninfected
+from cosmic_ray.infection import (InfectionTracer, infection_from_json,
+                                  replacement_name)
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.testing.unittest_runner import UnittestRunner
+from cosmic_ray.type_profile import _BINARY_OPERATORS
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import excursion, extend_path
+
+MODULE = '''\
+def positive(x):
+    return x >= 0
+
+
+def double(x):
+    return x * 2
+
+
+def negate(x):
+    return -x
+
+
+def describe(x):
+    return str(x) + '!'
+'''
+
+# `x` is never 0, 1 or 2, and `negate` raises for strings.
+TESTS = '''\
+import unittest
+
+import infected
+
+
+class InfectedTest(unittest.TestCase):
+    def test_positive(self):
+        self.assertTrue(infected.positive(5))
+        self.assertFalse(infected.positive(-5))
+
+    def test_double(self):
+        self.assertEqual(infected.double(3), 6)
+
+    def test_negate(self):
+        with self.assertRaises(TypeError):
+            infected.negate('a')
+
+    def test_describe(self):
+        self.assertEqual(infected.describe(1), '1!')
+'''
+
+
+@pytest.fixture
+def project(tmpdir):
+    tmpdir.join('infected.py').write(MODULE)
+    tmpdir.mkdir('tests').join('test_infected.py').write(TESTS)
+    with excursion(tmpdir), extend_path(tmpdir):
+        yield tmpdir
+    for name in ('infected', 'test_infected'):
+        sys.modules.pop(name, None)
+
+
+def test_tracer_records_infecting_replacements(project):
+    runner = UnittestRunner('tests')
+    with InfectionTracer([str(project.join('infected.py'))]) as tracer:
+        work_item = runner()
+    assert work_item.test_outcome == TestOutcome.SURVIVED
+
+    infection = infection_from_json(tracer.infection_to_json())
+    sites = infection[str(project.join('infected.py'))]
+
+    # `x > 0` is the same as `x >= 0` unless `x` is 0.
+    assert sites[(2, 11, 2, 17)] == {
+        'Eq', 'NotEq', 'Lt', 'LtE', 'Is', 'IsNot', 'In', 'NotIn', 'True',
+        'False'}
+    # `3 ** 2` is 9, but `3 + 2` is 5.
+    assert 'Add' in sites[(6, 11, 6, 16)]
+    assert 'Pow' in sites[(6, 11, 6, 16)]
+    # Every replacement raises TypeError for a string, as `-` does.
+    assert sites[(10, 11, 10, 13)] == {'Not', 'delete'}
+    # Replacements which raise where `+` didn't infect the state.
+    assert sites[(14, 11, 14, 23)] == set(_BINARY_OPERATORS) - {'Add'}
+
+    # The tracer records types too.
+    assert (str(project.join('infected.py')), 10, 11, 10, 13) in tracer.types
+
+
+def test_instrumented_code_behaves_the_same(project):
+    with InfectionTracer([str(project.join('infected.py'))]) as tracer:
+        module = __import__('infected')
+    assert module.positive(0)
+    assert module.double(-1.5) == -3.0
+    with pytest.raises(TypeError):
+        module.negate('a')
+    assert module.describe(None) == 'None!'
+    assert len(tracer.infected) == 4
+
+
+def test_tracer_compares_containers_of_simple_values_only():
+    tracer = InfectionTracer([])
+    comparisons = {'Eq', 'NotEq', 'Lt', 'LtE', 'Gt', 'GtE', 'Is', 'IsNot',
+                   'In', 'NotIn', 'True', 'False'}
+
+    # Membership in a list of simple values is tested again for the
+    # replacements, so only some of them infect the state.
+    simple = ('test.py', 1, 0, 1, 20)
+    assert tracer.compare(simple, 'In', 1, [1, (2, 'a')])
+    assert tracer.infected[simple] == comparisons - {
+        'In', 'NotEq', 'IsNot', 'True'}
+
+    calls = []
+
+    class Recorder:
+        def __eq__(self, other):
+            calls.append(other)
+            return False
+
+        __hash__ = object.__hash__
+
+    # Evaluating a replacement might call `Recorder.__eq__()` again, so
+    # every replacement is taken to infect the state instead.
+    unsafe = ('test.py', 2, 0, 2, 20)
+    assert not tracer.compare(unsafe, 'In', 1, [Recorder()])
+    assert tracer.infected[unsafe] == comparisons - {'In'}
+    assert calls == [1]
+
+    nested = ('test.py', 3, 0, 3, 20)
+    assert not tracer.compare(nested, 'Eq', [(1, {'a': Recorder()})], [])
+    assert tracer.infected[nested] == comparisons - {'Eq'}
+
+
+@pytest.mark.parametrize('node_type,replacement,expected', [
+    ('Compare', '(a <= b)', 'LtE'),
+    ('Compare', 'False', 'False'),
+    ('Compare', '(a < b < c)', None),
+    ('BinOp', '(a - b)', 'Sub'),
+    ('UnaryOp', '(~ x)', 'Invert'),
+    ('UnaryOp', 'x', 'delete'),
+    ('UnaryOp', '(- (- x))', None),
+    ('Num', '2', None),
+])
+def test_replacement_name(node_type, replacement, expected):
+    assert replacement_name(node_type, replacement) == expected
+
+
+def test_prune_uninfected():
+    def work_item(replacement, line_number=2):
+        return WorkItem(line_number=line_number, col_offset=11,
+                        end_line_number=line_number, end_col_offset=17,
+                        node_type='Compare', replacement=replacement)
+
+    site_infection = {(2, 11, 2, 17): {'Eq', 'LtE'}}
+
+    pruned = _prune_uninfected(work_item('(x > 0)'), site_infection)
+    assert pruned.worker_outcome == WorkerOutcome.SKIPPED
+    assert pruned.test_outcome == TestOutcome.NOT_INFECTED
+
+    kept = _prune_uninfected(work_item('(x == 0)'), site_infection)
+    assert kept.worker_outcome is None
+
+    # Nothing is known about operations which weren't executed.
+    unexecuted = _prune_uninfected(work_item('(x > 0)', 10), site_infection)
+    assert unexecuted.worker_outcome is None
@@ -0,0 +1,107 @@
+"""Tests for session initialization.
+"""
+import importlib
+import sys
+
+import pytest
+
+import cosmic_ray.commands
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.timing import Timeouts
+from cosmic_ray.work_db import use_db
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import excursion, extend_path
+
+
+@pytest.fixture
+def project(tmpdir):
+    tmpdir.join('incr_one.py').write('def one(x):\n    return x + 1\n')
+    tmpdir.join('incr_two.py').write('def two(x):\n    return x - 2\n')
+    tmpdir.mkdir('tests').join('test_incr.py').write('')
+    with excursion(tmpdir), extend_path(tmpdir):
+        yield tmpdir
+    for name in ('incr_one', 'incr_two'):
+        sys.modules.pop(name, None)
+
+
+def _modules():
+    return [importlib.import_module(name) for name in ('incr_one', 'incr_two')]
+
+
+def _init(db_path, config, incremental, **kwargs):
+    with use_db(db_path) as db:
+        cosmic_ray.commands.init(
+            _modules(), db, config, 10,
+            cosmic_ray.commands.InitOptions(incremental=incremental,
+                                            **kwargs))
+        return {item.job_id: item for item in db.work_items}
+
+
+def _complete_all(db_path):
+    with use_db(db_path) as db:
+        for item in db.pending_work_items:
+            item.worker_outcome = WorkerOutcome.NORMAL
+            item.test_outcome = TestOutcome.KILLED
+            db.update_work_item(item)
+
+
+CONFIG = {'module': 'incr', 'test-runner': {'name': 'unittest',
+                                            'args': 'tests'}}
+
+
+def test_incremental_init_keeps_unchanged_modules(project):
+    db_path = str(project.join('session.sqlite'))
+    first = _init(db_path, CONFIG, incremental=True)
+    _complete_all(db_path)
+
+    project.join('incr_two.py').write('def two(x):\n    return x * 2\n')
+    second = _init(db_path, CONFIG, incremental=True)
+
+    kept = {job_id for job_id, item in second.items()
+            if item.module == 'incr_one'}
+    assert kept == {job_id for job_id, item in first.items()
+                    if item.module == 'incr_one'}
+    assert all(second[job_id].worker_outcome == WorkerOutcome.NORMAL
+               for job_id in kept)
+
+    redone = [item for item in second.values() if item.module == 'incr_two']
+    assert redone
+    assert not any(item.job_id in first for item in redone)
+    assert all(item.worker_outcome is None for item in redone)
+
+
+@pytest.mark.parametrize('change', ['tests', 'config', 'not-incremental',
+                                    'first-not-incremental'])
+def test_incremental_init_redoes_everything(project, change):
+    db_path = str(project.join('session.sqlite'))
+    first = _init(db_path, CONFIG,
+                  incremental=change != 'first-not-incremental')
+    _complete_all(db_path)
+
+    config = CONFIG
+    if change == 'tests':
+        project.join('tests', 'test_incr.py').write('# A new test\n')
+    elif change == 'config':
+        config = dict(CONFIG, timeout=20)
+    second = _init(db_path, config, incremental=change != 'not-incremental')
+
+    assert len(second) == len(first)
+    assert not set(second) & set(first)
+    assert all(item.worker_outcome is None for item in second.values())
+
+
+def test_init_sets_timeouts_from_covering_tests(project):
+    db_path = str(project.join('session.sqlite'))
+    coverage = {
+        str(project.join('incr_one.py')): {2: ['t1']},
+        str(project.join('incr_two.py')): {2: ['t1', 't2']},
+    }
+    timeouts = Timeouts({'t1': 1.0, 't2': 4.0}, overhead=0.0, multiplier=2,
+                        floor=0.5)
+
+    items = _init(db_path, CONFIG, incremental=False,
+                  coverage=coverage, timeouts=timeouts)
+
+    assert {item.module: item.timeout for item in items.values()} == \
+        {'incr_one': 2.0, 'incr_two': 10.0}
@@ -0,0 +1,164 @@
+"""Tests for running the tests most likely to kill a mutant first.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.importing import preserve_modules
+from cosmic_ray.kill_history import KillHistory
+from cosmic_ray.plugins import get_operator, get_test_runner
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.testing.unittest_runner import UnittestRunner
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import worker
+
+from path_utils import excursion, extend_path
+
+
+def _item(operator, line, killed_by=None, module='mod'):
+    return WorkItem(module=module, operator=operator, line_number=line,
+                    killed_by=killed_by)
+
+
+def test_priority_tests_prefer_same_line_and_operator():
+    history = KillHistory([
+        _item('op1', 1, 't1'),
+        _item('op2', 1, 't2'),
+        _item('op1', 1, 't3'),
+        _item('op1', 5, 't4'),
+        _item('op2', 6, 't4'),
+        _item('op1', 7, 't5'),
+        _item('op1', 1, 't6', module='other'),
+        _item('op1', 1),
+    ])
+
+    assert history.priority_tests(_item('op1', 1)) == \
+        ['t1', 't3', 't2', 't4', 't5']
+    assert history.priority_tests(_item('op3', 2)) == \
+        ['t4', 't1', 't2', 't3', 't5']
+    assert history.priority_tests(_item('op1', 1, module='new')) == []
+
+
+def test_prioritize_uses_results_recorded_while_generating():
+    history = KillHistory()
+    items = history.prioritize([_item('op1', 1), _item('op1', 1)])
+
+    first = next(items)
+    assert first.priority_tests == []
+    first.killed_by = 't1'
+    history.record(first)
+
+    assert next(items).priority_tests == ['t1']
+
+
+def test_max_tests():
+    history = KillHistory(_item('op', line, 't{}'.format(line))
+                          for line in range(KillHistory.max_tests * 2))
+    assert len(history.priority_tests(_item('op', 0))) == KillHistory.max_tests
+
+
+TESTS = '''\
+import unittest
+
+
+class FirstTest(unittest.TestCase):
+    def test_passes(self):
+        pass
+
+
+class SecondTest(unittest.TestCase):
+    def test_fails(self):
+        self.fail()
+'''
+
+
+@pytest.fixture
+def project(tmpdir):
+    tmpdir.mkdir('tests').join('test_order.py').write(TESTS)
+    with excursion(tmpdir), extend_path(tmpdir):
+        yield tmpdir
+    sys.modules.pop('test_order', None)
+
+
+class _Listener:
+    def __init__(self):
+        self.started = []
+
+    def start_test(self, test_id):
+        self.started.append(test_id)
+
+    def stop_test(self, test_id):
+        pass
+
+
+@pytest.mark.usefixtures('project')
+@pytest.mark.parametrize('priority_tests, expected_started', [
+    ([], ['test_order.FirstTest.test_passes',
+          'test_order.SecondTest.test_fails']),
+    (['test_order.SecondTest.test_fails'],
+     ['test_order.SecondTest.test_fails']),
+])
+def test_unittest_runner_runs_priority_tests_first(priority_tests,
+                                                   expected_started):
+    listener = _Listener()
+    runner = UnittestRunner('tests')
+    runner.priority_tests = priority_tests
+    runner.add_listener(listener)
+
+    result = runner()
+
+    assert result.test_outcome == TestOutcome.KILLED
+    assert result.killed_by == 'test_order.SecondTest.test_fails'
+    assert listener.started == expected_started
+
+
+KILLED_MODULE = '''\
+def f(x):
+    return x * 2 < 10
+'''
+
+KILLING_TESTS = '''\
+import unittest
+
+import killed
+
+
+class KillingTest(unittest.TestCase):
+    def test_f(self):
+        self.assertTrue(killed.f(1))
+        self.assertFalse(killed.f(5))
+'''
+
+
+@pytest.fixture
+def killed_project(tmpdir):
+    tmpdir.join('killed.py').write(KILLED_MODULE)
+    tmpdir.mkdir('tests').join('test_killed.py').write(KILLING_TESTS)
+    with excursion(tmpdir), extend_path(str(tmpdir)):
+        yield tmpdir
+    for name in ('killed', 'test_killed'):
+        sys.modules.pop(name, None)
+
+
+@pytest.mark.usefixtures('killed_project')
+def test_priority_tests_match_operators_of_worker_results():
+    work_item = _item('mutate_comparison_operator', 2, module='killed')
+    work_item.occurrence = 0
+    with preserve_modules():
+        result = worker('killed', get_operator(work_item.operator), 0,
+                        get_test_runner('unittest', 'tests'))
+    # As `worker_process()` does.
+    work_item.update(
+        {key: value for key, value in result.items() if value is not None})
+    assert work_item.killed_by == 'test_killed.KillingTest.test_f'
+    # The worker names the operator by its class.
+    assert work_item.operator != 'mutate_comparison_operator'
+
+    history = KillHistory([
+        _item('mutate_binary_operator', 2, 'other', module='killed'),
+        work_item,
+    ])
+
+    pending = _item('mutate_comparison_operator', 2, module='killed')
+    assert history.priority_tests(pending) == \
+        ['test_killed.KillingTest.test_f', 'other']
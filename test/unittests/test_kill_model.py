@@ -0,0 +1,194 @@
+"""Tests for predicting which mutants are killed.
+"""
+import ast
+import sys
+
+import pytest
+
+from cosmic_ray.commands.init import _predict
+from cosmic_ray.counting import mutation_sites
+from cosmic_ray.importing import preserve_modules
+from cosmic_ray.kill_model import (KillModel, block_spans, features,
+                                   is_sampled, nesting_depth)
+from cosmic_ray.plugins import get_operator, get_test_runner
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome, worker
+
+from path_utils import excursion, extend_path
+
+MODULE = '''\
+def f(x):
+    for i in x:
+        if i:
+            return i
+    return None
+'''
+
+
+def _work_item(operator, killed=True, **fields):
+    fields.setdefault('worker_outcome', WorkerOutcome.NORMAL)
+    return WorkItem(
+        job_id=operator,
+        module='mod',
+        operator=operator,
+        node_type='Compare',
+        nesting_depth=1,
+        test_outcome=TestOutcome.KILLED if killed else TestOutcome.SURVIVED,
+        **fields)
+
+
+def test_nesting_depth():
+    spans = block_spans(ast.parse(MODULE))
+    assert nesting_depth(spans, 4, 4) == 3
+    assert nesting_depth(spans, 2, 4) == 2
+    assert nesting_depth(spans, 5, 5) == 1
+    assert nesting_depth(spans, 7, 7) == 0
+
+
+def test_features_bucket_covering_tests():
+    assert features(_work_item('op'))['covering_tests'] == 'all'
+    assert features(_work_item('op', covering_tests=[]))[
+        'covering_tests'] == 'under 1'
+    assert features(_work_item('op', covering_tests=['a', 'b', 'c']))[
+        'covering_tests'] == 'under 4'
+
+
+def test_untrained_model_makes_no_predictions():
+    model = KillModel()
+    model.train([_work_item('op')] * 3)
+    assert model.kill_probability(_work_item('op')) is None
+
+
+def test_model_learns_which_operators_are_killed():
+    model = KillModel()
+    model.train([_work_item('strong')] * 20 +
+                [_work_item('weak', killed=False)] * 20)
+    # Mutants which weren't run aren't learned from.
+    model.train([_work_item('strong', killed=False,
+                            worker_outcome=WorkerOutcome.SKIPPED)] * 100)
+    assert model.num_samples == 40
+
+    strong = model.kill_probability(_work_item('strong'))
+    weak = model.kill_probability(_work_item('weak'))
+    unknown = model.kill_probability(_work_item('unknown'))
+    assert strong > 0.95
+    assert weak < 0.05
+    assert weak < unknown < strong
+
+
+def test_model_round_trips_through_a_file(tmpdir):
+    model = KillModel()
+    model.train([_work_item('strong')] * 3 +
+                [_work_item('weak', killed=False)])
+    path = str(tmpdir.join('model.json'))
+    model.save(path)
+    loaded = KillModel.load(path)
+    assert loaded.num_samples == 4
+    assert loaded.kill_probability(_work_item('weak')) == \
+        model.kill_probability(_work_item('weak'))
+
+
+def test_is_sampled():
+    items = [WorkItem(job_id=str(i)) for i in range(1000)]
+    sampled = [item for item in items if is_sampled(item, 0.1)]
+    assert 50 < len(sampled) < 150
+    assert sampled == [item for item in items if is_sampled(item, 0.1)]
+    assert not any(is_sampled(item, 0) for item in items)
+    assert all(is_sampled(item, 1) for item in items)
+
+
+def test_predict():
+    model = KillModel()
+    model.train([_work_item('strong')] * 20 +
+                [_work_item('weak', killed=False)] * 20)
+
+    def pending(operator):
+        return WorkItem(job_id='x', module='mod', operator=operator,
+                        node_type='Compare', nesting_depth=1)
+
+    scored = _predict(pending('strong'), model, None)
+    assert scored.kill_probability > 0.95
+    assert scored.worker_outcome is None
+
+    predicted = _predict(pending('strong'), model, 0)
+    assert predicted.worker_outcome == WorkerOutcome.SKIPPED
+    assert predicted.test_outcome == TestOutcome.KILLED
+
+    sampled = _predict(pending('strong'), model, 1)
+    assert sampled.worker_outcome is None
+
+    uncertain = _predict(pending('weak'), model, 0)
+    assert uncertain.worker_outcome is None
+
+
+PROJECT_MODULE = '''\
+def small(x):
+    return x < 10
+
+
+def scaled(x):
+    return x * 3
+'''
+
+# Only `small` is tested.
+PROJECT_TESTS = '''\
+import unittest
+
+import predicted
+
+
+class PredictedTest(unittest.TestCase):
+    def test_small(self):
+        self.assertTrue(predicted.small(5))
+        self.assertFalse(predicted.small(10))
+'''
+
+
+@pytest.fixture
+def project(tmpdir):
+    tmpdir.join('predicted.py').write(PROJECT_MODULE)
+    tmpdir.mkdir('tests').join('test_predicted.py').write(PROJECT_TESTS)
+    with excursion(tmpdir), extend_path(str(tmpdir)):
+        yield tmpdir
+    for name in ('predicted', 'test_predicted'):
+        sys.modules.pop(name, None)
+
+
+def _pending_work_items():
+    with preserve_modules():
+        module = __import__('predicted')
+        sites = mutation_sites([module], ['mutate_comparison_operator',
+                                          'mutate_binary_operator'])[module]
+    return [
+        WorkItem(site, job_id='{}-{}'.format(op_name, occurrence),
+                 module='predicted', operator=op_name, occurrence=occurrence,
+                 nesting_depth=1)
+        for op_name, op_sites in sites.items()
+        for occurrence, site in enumerate(op_sites)]
+
+
+@pytest.mark.usefixtures('project')
+def test_model_learns_operators_from_worker_results():
+    test_runner = get_test_runner('unittest', 'tests')
+    completed = []
+    for work_item in _pending_work_items():
+        with preserve_modules():
+            result = worker(work_item.module,
+                            get_operator(work_item.operator),
+                            work_item.occurrence, test_runner)
+        # As `worker_process()` does.
+        work_item.update(
+            {key: value for key, value in result.items() if value is not None})
+        completed.append(work_item)
+    # The worker names the operator by its class.
+    assert completed[0].operator.startswith('cosmic_ray.operators.')
+
+    model = KillModel()
+    model.train(completed)
+
+    operators = model.to_json()['counts']['operator']
+    assert set(operators) == {'mutate_comparison_operator',
+                              'mutate_binary_operator'}
+    for pending in _pending_work_items():
+        assert features(pending)['operator'] in operators
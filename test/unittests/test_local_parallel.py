@@ -0,0 +1,93 @@
+"""Tests for the local-parallel execution engine.
+"""
+import threading
+import time
+
+import cosmic_ray.execution.local_parallel
+from cosmic_ray.execution.local_parallel import ParallelLocalExecutionEngine
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+
+class FakeWorkerProcess:
+    "Stand-in for `worker_process` which records how many jobs run at once."
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, work_item, timeout, config):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        # Later jobs finish first.
+        time.sleep(0.05 * (10 - work_item.occurrence))
+
+        with self._lock:
+            self.running -= 1
+
+        work_item.worker_outcome = WorkerOutcome.NORMAL
+        return work_item
+
+
+def _work_items():
+    return [WorkItem(job_id=str(i), occurrence=i) for i in range(10)]
+
+
+def test_all_items_are_executed(monkeypatch):
+    fake = FakeWorkerProcess()
+    monkeypatch.setattr(cosmic_ray.execution.local_parallel,
+                        'worker_process', fake)
+
+    engine = ParallelLocalExecutionEngine()
+    config = {'execution-engine': {'name': 'local-parallel',
+                                   'num-workers': 3}}
+    results = list(engine(1, iter(_work_items()), config))
+
+    assert sorted(r.job_id for r in results) == \
+        sorted(w.job_id for w in _work_items())
+    assert all(r.worker_outcome == WorkerOutcome.NORMAL for r in results)
+    assert fake.max_running == 3
+
+
+def test_results_are_yielded_in_completion_order(monkeypatch):
+    fake = FakeWorkerProcess()
+    monkeypatch.setattr(cosmic_ray.execution.local_parallel,
+                        'worker_process', fake)
+
+    engine = ParallelLocalExecutionEngine()
+    config = {'execution-engine': {'name': 'local-parallel',
+                                   'num-workers': 10}}
+    results = list(engine(1, _work_items(), config))
+
+    assert [r.occurrence for r in results] == list(reversed(range(10)))
+
+
+def test_items_in_lanes_do_not_hold_up_the_rest(monkeypatch):
+    finished = []
+
+    def fake(work_item, timeout, config):
+        time.sleep(0.5 if work_item.lane else 0.01)
+        finished.append(work_item.job_id)
+        work_item.worker_outcome = WorkerOutcome.NORMAL
+        return work_item
+
+    monkeypatch.setattr(cosmic_ray.execution.local_parallel,
+                        'worker_process', fake)
+
+    work_items = _work_items()
+    for work_item in work_items[:3]:
+        work_item.lane = 'loop'
+
+    engine = ParallelLocalExecutionEngine()
+    config = {'execution-engine': {'name': 'local-parallel',
+                                   'num-workers': 1}}
+    results = list(engine(1, work_items, config))
+
+    assert len(results) == 10
+    # The main lane finishes while the first item in the other lane runs,
+    # and then the main worker helps out with the rest.
+    assert finished[:7] == [str(i) for i in range(3, 10)]
+    assert sorted(finished[7:]) == ['0', '1', '2']
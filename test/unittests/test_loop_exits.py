@@ -0,0 +1,111 @@
+"""Tests for finding mutants which may make a loop run forever.
+"""
+import ast
+
+import pytest
+
+from cosmic_ray.commands.init import _isolate_loop
+from cosmic_ray.counting import mutation_sites
+from cosmic_ray.importing import preserve_modules
+from cosmic_ray.loop_exits import LOOP_LANE, LoopSites
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import excursion, extend_path
+
+MODULE = '''\
+def wait(queue):
+    while True:
+        if queue.ready():
+            break
+        queue.poll()
+
+
+def first(queue):
+    while True:
+        for item in queue:
+            if item:
+                return item
+        queue.poll()
+
+
+def count(n):
+    i = 0
+    while i < n:
+        i += 1
+    return i
+
+
+def countdown(i):
+    while i:
+        if i == 3:
+            break
+        i -= 1
+    for j in range(i):
+        break
+'''
+
+
+@pytest.fixture
+def work_items(tmpdir):
+    "The work items for the loop-related mutants of MODULE, by job ID."
+    tmpdir.join('loops.py').write(MODULE)
+    with excursion(tmpdir), extend_path(str(tmpdir)):
+        with preserve_modules():
+            module = __import__('loops')
+            sites = mutation_sites([module], [
+                'break_continue_replacement',
+                'zero_iteration_loop',
+                'add_not',
+                'mutate_comparison_operator',
+            ])[module]
+    return {
+        '{}-{}'.format(op_name, occurrence): WorkItem(
+            site,
+            job_id='{}-{}'.format(op_name, occurrence),
+            module='loops',
+            operator=op_name,
+            occurrence=occurrence)
+        for op_name, op_sites in sites.items()
+        for occurrence, site in enumerate(op_sites)}
+
+
+def test_loop_sites(work_items):
+    sites = LoopSites(ast.parse(MODULE))
+    flagged = {(item.line_number, item.node_type)
+               for item in work_items.values() if item in sites}
+
+    assert flagged == {
+        # The only `break` of `while True`.
+        (4, 'Break'),
+        # The `for` loop containing the only exit of `while True`.
+        (10, 'For'),
+        # The only exit of `while i < n` is its test.
+        (18, 'While'),
+        (18, 'Compare'),
+    }
+
+
+def test_isolate_loop(work_items):
+    sites = LoopSites(ast.parse(MODULE))
+    loop = work_items['break_continue_replacement-0']
+    other = work_items['break_continue_replacement-1']
+    other.timeout = 5
+
+    _isolate_loop(loop, sites, 2, 10)
+    _isolate_loop(other, sites, 2, 10)
+
+    assert loop.lane == LOOP_LANE
+    assert loop.timeout == 2
+    assert other.lane is None
+    assert other.timeout == 5
+
+    # The loop timeout is only used if it's shorter.
+    loop.timeout = 1
+    assert _isolate_loop(loop, sites, 2, 10).timeout == 1
+    loop.timeout = None
+    assert _isolate_loop(loop, sites, None, 10).timeout is None
+
+    loop.lane = None
+    loop.worker_outcome = WorkerOutcome.SKIPPED
+    assert _isolate_loop(loop, sites, 2, 10).lane is None
@@ -2,14 +2,16 @@
 """
 import ast
 import copy
+
+import astunparse
 import pytest
 
 from cosmic_ray.operators.comparison_operator_replacement import \
-    MutateComparisonOperator
+    MutateComparisonOperator, SufficientComparisonOperator, _build_mutations
 from cosmic_ray.operators.unary_operator_replacement import \
     MutateUnaryOperator
 from cosmic_ray.operators.binary_operator_replacement import \
-    MutateBinaryOperator
+    MutateBinaryOperator, SufficientBinaryOperator
 from cosmic_ray.counting import _CountingCore
 from cosmic_ray.operators.boolean_replacer import (ReplaceTrueFalse,
                                                    ReplaceAndWithOr,
@@ -22,6 +24,7 @@ from cosmic_ray.operators.number_replacer import NumberReplacer
 from cosmic_ray.operators.remove_decorator import RemoveDecorator
 from cosmic_ray.operators.zero_iteration_loop import ZeroIterationLoop
 from cosmic_ray.mutating import MutatingCore
+from cosmic_ray.plugins import operator_names
 
 
 class Linearizer(ast.NodeVisitor):
@@ -63,10 +66,13 @@ OPERATOR_SAMPLES = [
     (NumberReplacer, 'x = 1'),
     (MutateComparisonOperator, 'if x > y: pass'),
     (MutateComparisonOperator, 'if x is None: pass'),
+    (SufficientComparisonOperator, 'if x > y: pass'),
+    (SufficientComparisonOperator, 'if x is None: pass'),
     (MutateUnaryOperator, 'return not X'),
     (MutateUnaryOperator, 'x = -1'),
     (MutateBinaryOperator, 'x * y'),
     (MutateBinaryOperator, 'x - y'),
+    (SufficientBinaryOperator, 'x * y'),
     (ExceptionReplacer, 'try: raise OSError \nexcept OSError: pass'),
     (ZeroIterationLoop, 'for i in range(1,2): pass'),
     (RemoveDecorator, 'def wrapper(f): f.cosmic_ray=1; '
@@ -93,6 +99,64 @@ def test_no_activation_record_created(operator, code):
     assert core.activation_record is None
 
 
+def test_core_with_several_targets():
+    node = ast.parse('x = 1 < 2\ny = 3 < 4\nz = 5 < 6')
+    core = MutatingCore({0, 2 * len(_build_mutations(node.body[0].value))})
+    mutant = MutateComparisonOperator(core).visit(node)
+
+    assert [record['line_number'] for record in core.activation_records] \
+        == [1, 3]
+    assert core.activation_record == core.activation_records[0]
+    assert [type(stmt.value.ops[0]) for stmt in mutant.body] == \
+        [ast.Eq, ast.Lt, ast.Eq]
+
+
+def _all_mutants(operator, code):
+    "Get the source of each of the mutants `operator` makes of `code`."
+    core = _CountingCore()
+    operator(core).visit(ast.parse(code))
+    mutants = []
+    for occurrence in range(core.count):
+        mutant = operator(MutatingCore(occurrence)).visit(ast.parse(code))
+        mutants.append(astunparse.unparse(mutant).strip())
+    return mutants
+
+
+def test_sufficient_comparison_mutants():
+    assert _all_mutants(SufficientComparisonOperator, 'a < b') == \
+        ['(a <= b)', '(a != b)', 'False']
+    assert _all_mutants(SufficientComparisonOperator, 'a >= b') == \
+        ['(a > b)', '(a == b)', 'True']
+    # Chained comparisons aren't replaced by constants.
+    assert _all_mutants(SufficientComparisonOperator, 'a < b < c') == \
+        ['(a <= b < c)', '(a != b < c)', '(a < b <= c)',
+         '(a < b != c)']
+    assert _all_mutants(SufficientComparisonOperator, 'a in b') == \
+        ['(a not in b)']
+    assert _all_mutants(SufficientComparisonOperator, 'a is b') == \
+        ['(a is not b)']
+
+
+def test_sufficient_binary_mutants():
+    assert _all_mutants(SufficientBinaryOperator, 'a + b') == \
+        ['(a - b)', '(a % b)']
+    assert len(_all_mutants(MutateBinaryOperator, 'a + b')) > 2
+
+
+def test_sufficient_operator_set():
+    full = operator_names('full')
+    sufficient = operator_names('sufficient')
+
+    assert 'mutate_comparison_operator' in full
+    assert 'mutate_comparison_operator_sufficient' not in full
+    assert 'mutate_comparison_operator' not in sufficient
+    assert 'mutate_comparison_operator_sufficient' in sufficient
+    assert 'mutate_binary_operator_sufficient' in sufficient
+    assert 'number_replacer' in sufficient
+    assert len(full) == len(sufficient)
+    assert set(operator_names()) == set(full) | set(sufficient)
+
+
 @pytest.mark.parametrize('operator,code', OPERATOR_SAMPLES)
 def test_mutation_changes_ast(operator, code):
     node = ast.parse(code)
@@ -0,0 +1,21 @@
+"""Tests for making ASTs.
+"""
+import ast
+import sys
+
+import pytest
+
+from cosmic_ray.parsing import literal
+
+
+@pytest.mark.parametrize('version_info', [(3, 5), sys.version_info])
+@pytest.mark.parametrize('value', [
+    'mutate_comparison_operator/3',
+    ('module.py', 3, 4, None, None),
+    -1.5,
+    True,
+])
+def test_literal_compiles_to_value(monkeypatch, version_info, value):
+    monkeypatch.setattr(sys, 'version_info', version_info)
+    node = ast.fix_missing_locations(ast.Expression(body=literal(value)))
+    assert eval(compile(node, '<literal>', 'eval')) == value
@@ -0,0 +1,123 @@
+"""Tests for the reload execution engine.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.execution.reload import ReloadExecutionEngine
+from cosmic_ray.reload_server import ImportGraph
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+from conftest import LESS
+from path_utils import excursion
+
+MODULE_NAME = 'reloaded'
+
+# The tests only see the module under test through this one.
+HELPERS = {'helper': '''\
+from reloaded import less
+
+
+def greater(a, b):
+    return less(b, a)
+'''}
+
+TESTS = '''\
+import unittest
+
+import helper
+
+
+class ReloadedTest(unittest.TestCase):
+    def test_greater(self):
+        self.assertTrue(helper.greater(2, 1))
+        self.assertFalse(helper.greater(1, 1))
+'''
+
+CONFIG = {
+    'module': 'reloaded',
+    'test-runner': {'name': 'unittest', 'args': 'tests'},
+    'execution-engine': {'name': 'reload', 'num-workers': 2},
+}
+
+
+def test_import_graph_finds_indirect_dependents(project):
+    project.join('top.py').write('import helper\n')
+    try:
+        with ImportGraph() as graph:
+            __import__('top')
+    finally:
+        sys.modules.pop('top', None)
+
+    assert graph.dependents('reloaded') == {'helper', 'top'}
+    assert graph.dependents('helper') == {'top'}
+    assert graph.dependents('top') == set()
+
+
+@pytest.mark.parametrize('stateful_modules', [[], ['helper']])
+@pytest.mark.usefixtures('project')
+def test_mutants_reach_dependents(stateful_modules, make_work_item):
+    config = dict(CONFIG, **{
+        'execution-engine': dict(CONFIG['execution-engine'],
+                                 **{'stateful-modules': stateful_modules})})
+    engine = ReloadExecutionEngine()
+    work_items = [make_work_item('killed-{}'.format(occurrence), occurrence)
+                  for occurrence in (0, 2, 3)]
+    work_items.append(make_work_item('survived', 6))
+    work_items.append(make_work_item('no-test', 1000))
+    results = {r.job_id: r for r in engine(10, work_items, config)}
+
+    # "a == b", "a <= b" and "a > b" are all caught by the test, but
+    # "a is not b" holds for its inputs.
+    for occurrence in (0, 2, 3):
+        result = results['killed-{}'.format(occurrence)]
+        assert result.worker_outcome == WorkerOutcome.NORMAL
+        assert result.test_outcome == TestOutcome.KILLED
+    assert results['survived'].test_outcome == TestOutcome.SURVIVED
+    assert results['no-test'].worker_outcome == WorkerOutcome.NO_TEST
+    assert all(r.command_line.startswith('cosmic-ray worker reloaded')
+               for r in results.values())
+
+
+PACKAGE_TESTS = '''\
+import unittest
+
+from reloaded_pkg import sub
+
+
+class SubTest(unittest.TestCase):
+    def test_less(self):
+        self.assertTrue(sub.less(1, 2))
+        self.assertFalse(sub.less(2, 1))
+        self.assertFalse(sub.less(1, 1))
+'''
+
+
+@pytest.fixture
+def package_project(tmpdir):
+    package = tmpdir.mkdir('reloaded_pkg')
+    package.join('__init__.py').write('')
+    package.join('sub.py').write(LESS)
+    tmpdir.mkdir('tests').join('test_sub.py').write(PACKAGE_TESTS)
+    with excursion(tmpdir):
+        yield tmpdir
+
+
+@pytest.mark.usefixtures('package_project')
+def test_mutants_reach_tests_importing_from_package():
+    config = dict(CONFIG, module='reloaded_pkg.sub')
+    work_items = [
+        WorkItem(job_id=str(occurrence),
+                 module='reloaded_pkg.sub',
+                 operator='mutate_comparison_operator',
+                 occurrence=occurrence)
+        for occurrence in range(5)]
+    results = {r.job_id: r
+               for r in ReloadExecutionEngine()(10, work_items, config)}
+
+    assert len(results) == 5
+    for result in results.values():
+        assert result.worker_outcome == WorkerOutcome.NORMAL
+        assert result.test_outcome == TestOutcome.KILLED
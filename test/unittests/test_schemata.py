@@ -0,0 +1,79 @@
+"""Tests for mutant schemata.
+"""
+import ast
+
+import pytest
+
+from cosmic_ray.counting import _CountingCore
+from cosmic_ray.mutating import MutatingCore
+from cosmic_ray.plugins import get_operator, operator_names
+from cosmic_ray.schemata import (activate, build_meta_module,
+                                 compile_meta_module, mutant_key)
+
+from sample_utils import SAMPLE, run_sample
+
+# Some comparison mutants compare with literals using "is".
+pytestmark = pytest.mark.filterwarnings('ignore::SyntaxWarning')
+
+def _mutants():
+    "Generate the (operator name, occurrence) of each mutant of SAMPLE."
+    for op_name in operator_names():
+        core = _CountingCore()
+        get_operator(op_name)(core).visit(ast.parse(SAMPLE))
+        for occurrence in range(core.count):
+            yield op_name, occurrence
+
+
+def _mutant_code(op_name, occurrence):
+    "Compile SAMPLE with a single mutation, the usual way."
+    core = MutatingCore(occurrence)
+    tree = get_operator(op_name)(core).visit(ast.parse(SAMPLE))
+    return compile(ast.fix_missing_locations(tree), 'sample', 'exec')
+
+
+@pytest.fixture
+def meta_module():
+    operators = {op_name: get_operator(op_name)
+                 for op_name in operator_names()}
+    tree, keys = build_meta_module(ast.parse(SAMPLE), operators)
+    yield compile(tree, 'sample', 'exec'), keys
+    activate(None)
+
+
+def test_meta_module_has_every_expression_and_statement_mutant(meta_module):
+    _, keys = meta_module
+    expected = {mutant_key(op_name, occurrence)
+                for op_name, occurrence in _mutants()
+                if op_name != 'exception_replacer'}
+    assert expected
+    assert keys == expected
+
+
+def test_meta_module_without_active_mutant_is_unmutated(meta_module):
+    code, _ = meta_module
+    activate(None)
+    assert run_sample(code) == run_sample(compile(SAMPLE, 'sample', 'exec'))
+
+
+def test_active_mutant_behaves_like_mutated_module(meta_module):
+    code, keys = meta_module
+    for op_name, occurrence in _mutants():
+        key = mutant_key(op_name, occurrence)
+        if key not in keys:
+            continue
+        activate(key)
+        assert run_sample(code) == \
+            run_sample(_mutant_code(op_name, occurrence)), key
+
+
+def test_compile_meta_module_reads_source_file(tmpdir):
+    source_file = tmpdir.join('sample.py')
+    source_file.write(SAMPLE)
+    operators = {'number_replacer': get_operator('number_replacer')}
+
+    code, keys = compile_meta_module(str(source_file), operators)
+
+    assert code.co_filename == str(source_file)
+    assert keys == {mutant_key('number_replacer', occurrence)
+                    for op_name, occurrence in _mutants()
+                    if op_name == 'number_replacer'}
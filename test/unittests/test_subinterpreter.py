@@ -0,0 +1,77 @@
+"""Tests for the sub-interpreter execution engine.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.execution.subinterpreter import SubinterpreterExecutionEngine
+from cosmic_ray.subinterpreters import InterpreterError, get_runner
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.worker import WorkerOutcome
+
+MODULE_NAME = 'subinterpreted'
+
+TESTS = '''\
+import os
+import unittest
+
+if os.environ.get('SUBINTERPRETED_REFUSE'):
+    import readline
+
+import subinterpreted
+
+
+class LessTest(unittest.TestCase):
+    def test_less(self):
+        self.assertTrue(subinterpreted.less(1, 2))
+'''
+
+CONFIG = {
+    'module': 'subinterpreted',
+    'test-runner': {'name': 'unittest', 'args': 'tests'},
+    'execution-engine': {'name': 'subinterpreter', 'num-workers': 2},
+}
+
+needs_subinterpreters = pytest.mark.skipif(
+    get_runner() is None,
+    reason='Sub-interpreters with their own GIL are not supported')
+
+
+def test_no_runner_before_python_3_12():
+    if sys.version_info < (3, 12):
+        assert get_runner() is None
+
+
+@needs_subinterpreters
+def test_runner_isolates_modules():
+    run = get_runner()
+    run('import sys\n'
+        'assert "cosmic_ray.subinterpreters" not in sys.modules\n')
+    with pytest.raises(InterpreterError):
+        run('raise ValueError()')
+
+
+@pytest.mark.parametrize('refuse', [False, True])
+@pytest.mark.usefixtures('project')
+def test_jobs_are_run(monkeypatch, refuse, make_work_item):
+    # Whether or not the jobs can be run in sub-interpreters, the results are
+    # the same.
+    if refuse:
+        monkeypatch.setenv('SUBINTERPRETED_REFUSE', '1')
+
+    engine = SubinterpreterExecutionEngine()
+    work_items = [make_work_item(job_id, occurrence)
+                  for job_id, occurrence in [('killed', 0),
+                                             ('survived', 1),
+                                             ('no-test', 1000)]]
+    results = {r.job_id: r for r in engine(10, work_items, CONFIG)}
+
+    assert results['killed'].worker_outcome == WorkerOutcome.NORMAL
+    assert results['killed'].test_outcome == TestOutcome.KILLED
+    assert results['killed'].killed_by == \
+        'test_subinterpreted.LessTest.test_less'
+    # "a != b" holds for the test's inputs
+    assert results['survived'].test_outcome == TestOutcome.SURVIVED
+    assert results['no-test'].worker_outcome == WorkerOutcome.NO_TEST
+    assert all(r.command_line.startswith('cosmic-ray worker subinterpreted')
+               for r in results.values())
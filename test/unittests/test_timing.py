@@ -0,0 +1,36 @@
+"""Tests for baseline timings and the timeouts derived from them.
+"""
+import cosmic_ray.timing
+
+
+def test_test_timer_accumulates_durations(monkeypatch):
+    now = iter([1.0, 1.5, 2.0, 4.0, 10.0, 10.25])
+    monkeypatch.setattr(cosmic_ray.timing.time, 'perf_counter',
+                        lambda: next(now))
+
+    timer = cosmic_ray.timing.TestTimer()
+    for test_id in ('t1', 't2', 't1'):
+        timer.start_test(test_id)
+        timer.stop_test(test_id)
+
+    assert timer.durations == {'t1': 0.75, 't2': 2.0}
+
+
+def test_timeouts_cover_only_tests_which_run():
+    timeouts = cosmic_ray.timing.Timeouts(
+        durations={'t1': 1.0, 't2': 2.0, 't3': 30.0},
+        overhead=0.5,
+        multiplier=2,
+        floor=0.1)
+
+    assert timeouts(['t1']) == 3.0
+    assert timeouts(['t1', 't2']) == 7.0
+    assert timeouts() == 67.0
+    assert timeouts([]) == 1.0
+
+
+def test_timeouts_floor():
+    timeouts = cosmic_ray.timing.Timeouts(
+        durations={'t1': 0.001}, overhead=0.01, multiplier=2, floor=1.5)
+
+    assert timeouts(['t1']) == 1.5
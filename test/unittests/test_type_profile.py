@@ -0,0 +1,159 @@
+"""Tests for profiling the types of operands.
+"""
+import sys
+
+import pytest
+
+from cosmic_ray.commands.init import _prune_type_errors
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.testing.unittest_runner import UnittestRunner
+from cosmic_ray.type_profile import (_BINARY_OPERATORS, TypeProfiler,
+                                     replacement_operator,
+                                     supported_operators,
+                                     type_profile_from_json)
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import excursion, extend_path
+
+MODULE = '''\
+def join(a, b):
+    return a + b
+
+
+def negate(x):
+    return -x
+
+
+def unused(x):
+    return x * 2
+
+
+def offset(a, b):
+    return -a + b
+'''
+
+TESTS = '''\
+import unittest
+
+import profiled
+
+
+class JoinTest(unittest.TestCase):
+    def test_join(self):
+        self.assertEqual(profiled.join('a', 'b'), 'ab')
+        self.assertEqual(profiled.join([1], [2]), [1, 2])
+        self.assertEqual(profiled.negate(1), -1)
+        self.assertEqual(profiled.offset(1, 2), 1)
+'''
+
+
+@pytest.fixture
+def project(tmpdir):
+    tmpdir.join('profiled.py').write(MODULE)
+    tmpdir.mkdir('tests').join('test_profiled.py').write(TESTS)
+    with excursion(tmpdir), extend_path(tmpdir):
+        yield tmpdir
+    for name in ('profiled', 'test_profiled'):
+        sys.modules.pop(name, None)
+
+
+def test_profiler_records_supported_operators(project):
+    runner = UnittestRunner('tests')
+    with TypeProfiler([str(project.join('profiled.py'))]) as profiler:
+        work_item = runner()
+    assert work_item.test_outcome == TestOutcome.SURVIVED
+
+    profile = type_profile_from_json(profiler.to_json())
+    assert list(profile) == [str(project.join('profiled.py'))]
+    sites = profile[str(project.join('profiled.py'))]
+
+    # Both str and list support "+", and str supports "%" too.
+    assert sites[(2, 11, 2, 16)] == {'Add', 'Mod'}
+    assert sites[(6, 11, 6, 13)] == {'UAdd', 'USub', 'Invert', 'Not'}
+    assert (10, 11, 10, 16) not in sites
+    # `-a` starts where `-a + b` does, but they're told apart.
+    assert sites[(14, 11, 14, 13)] == {'UAdd', 'USub', 'Invert', 'Not'}
+    assert sites[(14, 11, 14, 17)] == set(_BINARY_OPERATORS) - {'MatMult'}
+    # The instrumented code isn't cached.
+    assert not project.join('__pycache__').check()
+
+
+def test_supported_operators():
+    assert supported_operators([(int, int)]) == \
+        set(_BINARY_OPERATORS) - {'MatMult'}
+    assert supported_operators([(str, int)]) == {'Mult', 'Mod'}
+    # `3 * 'a'` works by way of str's `__rmul__`.
+    assert supported_operators([(int, str)]) == {'Mult'}
+    assert supported_operators([(float, float)]) == \
+        {'Add', 'Sub', 'Mult', 'Div', 'FloorDiv', 'Mod', 'Pow'}
+    assert supported_operators([(str,)]) == {'Not'}
+    assert supported_operators([(str, str), (list, list)]) == {'Add', 'Mod'}
+
+
+def test_supported_operators_of_other_types():
+    class Vector:
+        def __add__(self, other):
+            raise TypeError('Not really')
+
+    # Only the special methods are checked for these.
+    assert supported_operators([(Vector, Vector)]) == {'Add'}
+    assert supported_operators([(Vector, int)]) == \
+        set(_BINARY_OPERATORS) - {'MatMult'}
+
+
+@pytest.mark.parametrize('node_type,replacement,expected', [
+    ('BinOp', '(a - b)', 'Sub'),
+    ('BinOp', '((a + b) * c)', 'Mult'),
+    ('UnaryOp', '(~ x)', 'Invert'),
+    ('UnaryOp', 'x', None),
+    ('UnaryOp', '(- (- x))', None),
+    ('Compare', '(a < b)', None),
+    ('BinOp', None, None),
+])
+def test_replacement_operator(node_type, replacement, expected):
+    assert replacement_operator(node_type, replacement) == expected
+
+
+def test_profile_merges_sites_on_collision(tmpdir):
+    profiler = TypeProfiler([str(tmpdir)])
+    # Two names for the same file.
+    profiler.types[(str(tmpdir.join('mod.py')), 2, 11, 2, 16)] = {(str, str)}
+    profiler.types[(str(tmpdir.join('sub', '..', 'mod.py')),
+                    2, 11, 2, 16)] = {(int, int)}
+
+    profile = type_profile_from_json(profiler.to_json())
+    assert profile[str(tmpdir.join('mod.py'))] == {
+        (2, 11, 2, 16): set(_BINARY_OPERATORS) - {'MatMult'}}
+
+
+def test_prune_type_errors():
+    def work_item(replacement, line_number=2):
+        return WorkItem(line_number=line_number, col_offset=11,
+                        end_line_number=line_number, end_col_offset=16,
+                        node_type='BinOp', replacement=replacement)
+
+    site_types = {(2, 11, 2, 16): {'Add', 'Mult', 'Mod'}}
+
+    pruned = _prune_type_errors(work_item('(a - b)'), site_types)
+    assert pruned.worker_outcome == WorkerOutcome.SKIPPED
+    assert pruned.test_outcome == TestOutcome.INCOMPETENT
+
+    kept = _prune_type_errors(work_item('(a * b)'), site_types)
+    assert kept.worker_outcome is None
+
+    # Nothing is known about operations which weren't executed.
+    unexecuted = _prune_type_errors(work_item('(a - b)', 10), site_types)
+    assert unexecuted.worker_outcome is None
+
+
+def test_prune_type_errors_of_nested_operations():
+    # The sites of `-a + b`, for ints.
+    site_types = {
+        (2, 11, 2, 17): {'Add', 'Sub', 'Mult'},
+        (2, 11, 2, 13): {'UAdd', 'USub', 'Invert', 'Not'},
+    }
+    unary = WorkItem(line_number=2, col_offset=11, end_line_number=2,
+                     end_col_offset=13, node_type='UnaryOp',
+                     replacement='(~ a)')
+    assert _prune_type_errors(unary, site_types).worker_outcome is None
@@ -0,0 +1,169 @@
+"""Tests for the SQLite-backed WorkDB.
+"""
+import pytest
+
+from cosmic_ray.work_db import use_db, SessionFormatError, WorkDB
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+
+@pytest.fixture
+def db_path(tmpdir):
+    return str(tmpdir.join('session.json'))
+
+
+def _work_items(count):
+    return [WorkItem(job_id=str(i),
+                     module='mod',
+                     operator='op',
+                     occurrence=i)
+            for i in range(count)]
+
+
+def test_open_missing_file_raises_FileNotFoundError(db_path):
+    with pytest.raises(FileNotFoundError):
+        WorkDB(db_path, WorkDB.Mode.open)
+
+
+@pytest.mark.parametrize('mode', list(WorkDB.Mode))
+def test_open_legacy_json_session_raises_SessionFormatError(db_path, mode):
+    # Sessions used to be TinyDB files, i.e. JSON.
+    with open(db_path, 'w') as handle:
+        handle.write('{"work-items": {}, "config": {}}')
+
+    with pytest.raises(SessionFormatError) as exc_info:
+        WorkDB(db_path, mode)
+
+    assert 'cosmic-ray init' in str(exc_info.value)
+
+
+def test_get_config_without_config_raises_ValueError(db_path):
+    with use_db(db_path) as db:
+        with pytest.raises(ValueError):
+            db.get_config()
+
+
+def test_config_round_trip(db_path):
+    config = {'module': 'foo', 'test-runner': {'name': 'unittest'}}
+    with use_db(db_path) as db:
+        db.set_config(config, 1.5)
+        db.set_config(config, 2.5)
+
+    with use_db(db_path, WorkDB.Mode.open) as db:
+        assert db.get_config() == (config, 2.5)
+
+
+def test_coverage_round_trip(db_path):
+    coverage = {'a.b': {1: [None], 3: ['t1', 't2']},
+                'a.c': {7: ['t2']}}
+    with use_db(db_path) as db:
+        assert db.get_coverage() == {}
+        db.set_coverage({'x': {1: ['t3']}})
+        db.set_coverage(coverage)
+
+    with use_db(db_path, WorkDB.Mode.open) as db:
+        assert db.get_coverage() == coverage
+
+
+def test_work_items_round_trip(db_path):
+    items = _work_items(10)
+    with use_db(db_path) as db:
+        db.add_work_items(items)
+
+    with use_db(db_path, WorkDB.Mode.open) as db:
+        assert db.num_work_items == 10
+        assert list(db.work_items) == items
+
+
+def test_clear_work_items(db_path):
+    with use_db(db_path) as db:
+        db.add_work_items(_work_items(10))
+        db.clear_work_items()
+        assert db.num_work_items == 0
+
+
+def test_update_work_item(db_path):
+    with use_db(db_path) as db:
+        db.add_work_items(_work_items(10))
+        assert db.num_pending_work_items == 10
+
+        item = next(db.pending_work_items)
+        item.worker_outcome = WorkerOutcome.NORMAL
+        item.data = ['some', 'output']
+        item.diff = ['a diff']
+        db.update_work_item(item)
+
+        assert db.num_pending_work_items == 9
+        assert item not in db.pending_work_items
+        assert item in db.work_items
+
+
+def test_duplicates_get_results_of_their_work_item(db_path):
+    items = _work_items(3)
+    items[2].duplicate_of = items[0].job_id
+    items[2].diff = ['its own diff']
+    with use_db(db_path) as db:
+        db.add_work_items(items)
+        assert db.num_pending_work_items == 2
+        assert [item.job_id for item in db.pending_work_items] == ['0', '1']
+
+        item = next(db.pending_work_items)
+        item.worker_outcome = WorkerOutcome.NORMAL
+        item.data = ['some', 'output']
+        item.diff = ['the diff of item 0']
+        db.update_work_item(item)
+
+        assert db.num_pending_work_items == 1
+        duplicate = [item for item in db.work_items if item.job_id == '2'][0]
+        assert duplicate.worker_outcome == WorkerOutcome.NORMAL
+        assert duplicate.data == ['some', 'output']
+        assert duplicate.diff == ['its own diff']
+        assert duplicate.occurrence == 2
+
+
+def test_updates_survive_reopening(db_path):
+    with use_db(db_path) as db:
+        db.add_work_items(_work_items(10))
+        for item in db.pending_work_items:
+            item.worker_outcome = WorkerOutcome.TIMEOUT
+            item.data = 1.0
+            db.update_work_item(item)
+
+    with use_db(db_path, WorkDB.Mode.open) as db:
+        assert db.num_pending_work_items == 0
+        assert all(item.data == 1.0 for item in db.work_items)
+
+
+def test_update_unknown_work_item_raises_KeyError(db_path):
+    with use_db(db_path) as db:
+        db.add_work_items(_work_items(1))
+        with pytest.raises(KeyError):
+            db.update_work_item(WorkItem(job_id='unknown'))
+
+
+def test_iter_work_items_projects_fields(db_path):
+    items = _work_items(3)
+    with use_db(db_path) as db:
+        db.add_work_items(items)
+
+        projected = list(db.iter_work_items(['job_id', 'occurrence']))
+
+    assert [(item.job_id, item.occurrence) for item in projected] == \
+        [(item.job_id, item.occurrence) for item in items]
+    assert all(item.module is None for item in projected)
+
+
+def test_iter_work_items_with_unknown_field_raises_ValueError(db_path):
+    with use_db(db_path) as db:
+        with pytest.raises(ValueError):
+            list(db.iter_work_items(['job_id', 'llama']))
+
+
+def test_pending_work_items_are_most_uncertain_first(db_path):
+    items = _work_items(4)
+    for item, probability in zip(items, (0.9, None, 0.45, 0.2)):
+        item.kill_probability = probability
+    with use_db(db_path) as db:
+        db.add_work_items(items)
+        assert [item.job_id for item in db.pending_work_items] == \
+            ['1', '2', '3', '0']
@@ -0,0 +1,90 @@
+"""Tests for the lean worker entry point.
+"""
+import json
+import subprocess
+import sys
+
+import cosmic_ray.plugins
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import DATA_DIR
+
+# Modules which the worker entry point must not import. These are either
+# expensive to import or only needed by the full command line tool.
+FORBIDDEN_MODULES = (
+    'docopt',
+    'docopt_subcommands',
+    'stevedore',
+    'yaml',
+    'qprompt',
+    'cosmic_ray.cli',
+    'cosmic_ray.commands',
+    'cosmic_ray.counting',
+    'cosmic_ray.modules',
+)
+
+# The maximum cumulative time, in microseconds, that importing the worker entry
+# point may take. This is deliberately generous; the point is to catch
+# regressions which drag in big chunks of the world, not to benchmark.
+IMPORT_TIME_BUDGET = 200000
+
+
+def _import_times(module):
+    """Import `module` in a fresh interpreter with `-X importtime`, returning a
+    dict mapping each imported module name to its cumulative import time in
+    microseconds.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         'import {}'.format(module)],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            # The header line
+            pass
+    return times
+
+
+def test_worker_main_does_not_import_heavy_modules():
+    imported = _import_times('cosmic_ray.worker_main')
+    assert 'cosmic_ray.worker_main' in imported
+    for module in FORBIDDEN_MODULES:
+        assert module not in imported
+
+
+def test_worker_main_import_time_is_within_budget():
+    # Take the best of a few runs to smooth over cold caches.
+    best = min(_import_times('cosmic_ray.worker_main')['cosmic_ray.worker_main']
+               for _ in range(3))
+    assert best < IMPORT_TIME_BUDGET
+
+
+def test_worker_main_runs_job():
+    job = {
+        'config': {'test-runner': {'name': 'unittest', 'args': '.'}},
+        'work_item': {'module': 'a.b',
+                      'operator': 'zero_iteration_loop',
+                      'occurrence': 100},
+        'operator': cosmic_ray.plugins.operator_path('zero_iteration_loop'),
+        'test_runner': cosmic_ray.plugins.test_runner_path('unittest'),
+    }
+
+    proc = subprocess.run(
+        [sys.executable, '-m', 'cosmic_ray.worker_main'],
+        input=json.dumps(job),
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        cwd=str(DATA_DIR),
+        check=True)
+
+    result = json.loads(proc.stdout)
+    assert result['worker_outcome'] == WorkerOutcome.NO_TEST